@@ -7,6 +7,9 @@ import api
 import config
 import globalPluginHandler
 import gui
+import ui
+import wx
+from logHandler import log
 from NVDAObjects import NVDAObject
 from scriptHandler import script
 
@@ -16,11 +19,75 @@ from .viewerFrame import ObjectViewerFrame
 # Translators: The name of a category of NVDA commands.
 # Script category for Object Viewer commands.
 SCRCAT_OBJECTS_VIEWER = _("Object Viewer")
+# The variables the NVDA Python console takes a snapshot of, and the object selected in the viewer.
+SNAPSHOT_VARS = (
+	"obj",
+	"focus",
+	"focusAncestors",
+	"fdl",
+	"fg",
+	"nav",
+	"caretObj",
+	"caretPos",
+	"review",
+	"mouse",
+	"brlRegions",
+)
 
 confspec = {
 	"nvdaReviewMode": "boolean(default=True)",
 	"simpleReviewMode": "boolean(default=False)",
 	"addTreeNodesMode": 'string(default="children")',
+	# Filters applied while the children of an object are enumerated, before they reach the tree.
+	"hideInvisible": "boolean(default=False)",
+	"hideOffscreen": "boolean(default=False)",
+	"hideZeroSize": "boolean(default=False)",
+	"hidePresentational": "boolean(default=False)",
+	# Role names, e.g. "button", as in controlTypes.Role.
+	"roleAllowList": "string_list(default=list())",
+	"roleDenyList": "string_list(default=list())",
+	# A regular expression searched in the names of the objects.
+	"namePattern": 'string(default="")',
+	# Show an object whose ancestors only have a single child in place of the topmost one.
+	"collapseSingleChildChains": "boolean(default=False)",
+	# Show the children of the selected object in a list with the columns below.
+	"columnView": "boolean(default=False)",
+	# Identifiers of the columns, see columnView.COLUMNS.
+	"columns": 'string_list(default=list("role", "name", "states", "childCount"))',
+	# Fetch the children of the selected and visible items while the user is idle.
+	"prefetch": "boolean(default=True)",
+	# Number of levels fetched below each prefetched item.
+	"prefetchDepth": "integer(default=1, min=1, max=3)",
+	# Number of objects fetched before waiting for the next navigation.
+	"prefetchNodeBudget": "integer(default=500, min=1)",
+	# Milliseconds per object above which the target application is considered busy.
+	"prefetchLatencyThreshold": "integer(default=50, min=1)",
+	# Limits of the subtree statistics walk.
+	"statsMaxNodes": "integer(default=20000, min=1)",
+	"statsTimeLimit": "integer(default=30, min=1)",
+	# Milliseconds between the starts of two captures of the history.
+	"historyInterval": "integer(default=1000, min=100)",
+	"historyMaxCaptures": "integer(default=300, min=2)",
+	# Kilobytes of captured nodes kept by the history, shared nodes being counted once.
+	"historyMemoryBudget": "integer(default=16384, min=64)",
+	# Objects per capture above which the capture is truncated.
+	"historyMaxNodes": "integer(default=10000, min=1)",
+	# Serve the object tree to local tools, see ipcServer.
+	"ipcServer": "boolean(default=False)",
+	# A named pipe or Unix socket path, empty for the default one.
+	"ipcAddress": 'string(default="")',
+	# The key clients have to present. When empty, a key is generated for the session
+	# and written to objectViewer-ipc.key in the user configuration directory.
+	"ipcAuthKey": 'string(default="")',
+	"ipcWorkers": "integer(default=4, min=1, max=16)",
+	# Unload the branches that are not on the path to the selected object when the viewer is hidden.
+	"trimOnHide": "boolean(default=True)",
+	# Number of live NVDA objects kept by the tree while the viewer is hidden.
+	"liveObjectsOnHide": "integer(default=8, min=0)",
+	# Number of application icons above which the icons are dropped when the viewer is hidden.
+	"iconBudget": "integer(default=32, min=0)",
+	# Seconds after which a hidden viewer is destroyed, 0 to keep it.
+	"releaseTimeout": "integer(default=300, min=0)",
 }
 
 config.conf.spec["objectViewer"] = confspec
@@ -44,6 +111,9 @@ class ObjectViewerTool:
 
 	def init(self):
 		self._frame = None
+		self._releaseTimer: wx.CallLater | None = None
+		# The object selected when the viewer was released, to select it again on the next show.
+		self._restoreObj: NVDAObject | None = None
 
 		import pythonConsole
 
@@ -53,12 +123,23 @@ class ObjectViewerTool:
 
 		self.initialized = True
 
+	@property
+	def frame(self) -> ObjectViewerFrame | None:
+		"""The viewer frame, shown or hidden, or None if it has not been created or has been released."""
+		return self._frame if self.initialized else None
+
 	def show(self, selectObj: NVDAObject = None, refreshTree: bool = False):
 		if not self.initialized:
 			self.init()
 
+		if self._releaseTimer:
+			self._releaseTimer.Stop()
+			self._releaseTimer = None
 		if not self._frame:
-			self._frame = ObjectViewerFrame(gui.mainFrame, namespace=self._namespace)
+			# The shell gets its own copy of the console namespace, so that it can be cleared on hide.
+			self._frame = ObjectViewerFrame(gui.mainFrame, namespace=dict(self._namespace))
+			selectObj = selectObj or self._restoreObj
+			self._restoreObj = None
 
 		import pythonConsole
 
@@ -74,10 +155,69 @@ class ObjectViewerTool:
 		self._frame.Show()
 		self._frame.Raise()
 
+	def onHide(self):
+		"""Release what the hidden viewer does not need to be shown again quickly."""
+		frame = self._frame
+		conf = config.conf["objectViewer"]
+		shellLocals: dict[str, object] = frame.crust.shell.interp.locals
+		for name in SNAPSHOT_VARS:
+			shellLocals.pop(name, None)
+		frame.obj = None
+		frame.columnView.clear()
+		for childFrame in (frame.historyFrame, frame.eventRecorderFrame):
+			if childFrame:
+				# Their timers stop while they are hidden.
+				childFrame.Hide()
+		if conf["trimOnHide"]:
+			frame.objectTree.trimToSelection()
+		frame.objectTree.nodeStore.trim(conf["liveObjectsOnHide"])
+		frame.objectTree.trimIcons(conf["iconBudget"])
+		frame.objectTree.stopTimers()
+		frame.objectTree.pathResolver.forget()
+		if conf["releaseTimeout"]:
+			self._releaseTimer = wx.CallLater(conf["releaseTimeout"] * 1000, self.release)
+
+	def release(self):
+		"""Destroy the hidden viewer, remembering the selected object to restore it on the next show."""
+		self._releaseTimer = None
+		frame = self._frame
+		if not frame or frame.IsShown():
+			return
+		item = frame.objectTree.GetSelection()
+		self._restoreObj = frame.objectTree.getItemObject(item) if item.IsOk() else None
+		frame.eventRecorder.uninstall()
+		# Timers firing into a destroyed window would crash.
+		frame.objectTree.stopTimers()
+		frame.columnView.clear()
+		frame.Destroy()
+		self._frame = None
+		from .diagnostics import stopTracing
+
+		stopTracing()
+
 
 class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 	def __init__(self):
 		super().__init__()
+		if config.conf["objectViewer"]["ipcServer"]:
+			from . import ipcServer
+
+			try:
+				ipcServer.startServer()
+			except OSError:
+				log.error("Object Viewer: could not start the IPC server", exc_info=True)
+
+	def terminate(self):
+		from . import ipcServer
+
+		ipcServer.stopServer()
+		super().terminate()
+
+	def event_locationChange(self, obj: NVDAObject, nextHandler):
+		frame = ObjectViewerTool().frame
+		if frame and frame.objectTree.hoverInspector.enabled:
+			frame.objectTree.hoverInspector.onLocationChange(obj)
+		nextHandler()
 
 	@script(
 		# Translators: Description of the script to activate the Objects Viewer.
@@ -110,3 +250,14 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 	)
 	def script_activateObjectViewerFromNavigator(self, gesture):
 		ObjectViewerTool().show(selectObj=api.getNavigatorObject())
+
+	@script(
+		# Translators: Description of the script to report the memory usage of the Object Viewer.
+		description=_("Report the memory usage of the Object Viewer"),
+		category=SCRCAT_OBJECTS_VIEWER,
+	)
+	def script_reportObjectViewerMemoryUsage(self, gesture):
+		from .diagnostics import getDiagnosticsReport
+
+		# Translators: The title of the Object Viewer memory usage report.
+		ui.browseableMessage(getDiagnosticsReport(ObjectViewerTool()), _("Object Viewer memory usage"))
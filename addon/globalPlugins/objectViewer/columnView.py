@@ -0,0 +1,269 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+
+import config
+import wx
+from logHandler import log
+from NVDAObjects import NVDAObject
+
+from .filters import ChildEnumerator, EnumeratedChild, NodeFilter
+from .nodeStore import NodeStore, TreeNode
+from .objectTree import NVDAObjectTree
+from .prefetch import iterChildren
+from .virtualList import VirtualListCtrl
+
+
+def _getStates(obj: NVDAObject) -> str:
+	return ", ".join(sorted(state.displayString for state in obj.states))
+
+
+def _getLocation(obj: NVDAObject) -> str:
+	location = obj.location
+	return f"{location.left}, {location.top}, {location.width}, {location.height}" if location else ""
+
+
+# Column identifiers, as stored in the configuration, with their label and how to fetch them.
+COLUMNS: dict[str, tuple[str, Callable[[NVDAObject], object]]] = {
+	# Translators: A column of the children columns view, the role of the object.
+	"role": (_("Role"), lambda obj: obj.role.displayString),
+	# Translators: A column of the children columns view, the name of the object.
+	"name": (_("Name"), lambda obj: obj.name or ""),
+	# Translators: A column of the children columns view, the states of the object.
+	"states": (_("States"), _getStates),
+	# Translators: A column of the children columns view, the window class name of the object.
+	"windowClassName": (_("Window class"), lambda obj: obj.windowClassName),
+	# Translators: A column of the children columns view, the UI Automation ID of the object.
+	"automationId": (_("Automation ID"), lambda obj: getattr(obj, "UIAAutomationId", "")),
+	# Translators: A column of the children columns view, the left, top, width and height of the object.
+	"location": (_("Location"), _getLocation),
+	# Translators: A column of the children columns view, the number of children of the object.
+	"childCount": (_("Child count"), lambda obj: obj.childCount),
+}
+
+
+class Row:
+	"""A child shown in the columns view, with the column values fetched so far."""
+
+	__slots__ = ("node", "values")
+
+	def __init__(self, node: TreeNode):
+		self.node = node
+		# Role and name are already known from the node.
+		self.values: dict[str, object] = {"role": node.role.displayString, "name": node.name or ""}
+
+
+class ChildColumnsView(VirtualListCtrl):
+	"""
+	Lists the children of the selected tree item with configurable columns.
+	Children are enumerated, and column values fetched, on the main thread in short slices:
+	values are only fetched for the visible rows, or for every row of a column being sorted,
+	and are kept for the last few parents shown.
+	Rows only hold the nodes of the children, whose objects are resolved through a node store.
+	"""
+
+	TICK_INTERVAL = 30
+	SLICE_DURATION = 0.02
+	# The number of parents whose rows are kept.
+	MAX_CACHED_PARENTS = 8
+	# Shown in a cell whose value has not been fetched yet.
+	PENDING_TEXT = "…"
+	# The number of children objects kept alive, about a page of rows.
+	MAX_LIVE_OBJECTS = 64
+
+	def __init__(self, parent: wx.Window, objectTree: NVDAObjectTree):
+		super().__init__(parent, self.getCellText, style=wx.LC_SINGLE_SEL | wx.LC_HRULES | wx.LC_VRULES)
+		self.objectTree = objectTree
+		self.columns: list[str] = []
+		self.parentNode: TreeNode | None = None
+		self.rows: list[Row] = []
+		self.nodeStore = NodeStore(self.MAX_LIVE_OBJECTS)
+		self._cache: OrderedDict[TreeNode, list[Row]] = OrderedDict()
+		self._children: Iterator[EnumeratedChild] | None = None
+		# The column whose values are being fetched for every row before sorting, and the sort order.
+		self._sortColumn: str | None = None
+		self._lastSortColumn: str | None = None
+		self._sortAscending = True
+		self._fetchVisible = False
+		self.timer = wx.Timer(self)
+		self.Bind(wx.EVT_TIMER, self.onTick, self.timer)
+		self.Bind(wx.EVT_LIST_COL_CLICK, self.onColumnClick)
+		self.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.onItemActivated)
+		self.setColumns(config.conf["objectViewer"]["columns"])
+
+	def setColumns(self, columns: list[str]):
+		self.columns = [column for column in columns if column in COLUMNS] or ["role", "name"]
+		self.DeleteAllColumns()
+		for index, column in enumerate(self.columns):
+			self.InsertColumn(index, COLUMNS[column][0])
+		self.Refresh()
+
+	def showChildren(self, item: wx.TreeItemId):
+		"""Show the children of `item`, reusing the rows of a parent shown recently."""
+		node: TreeNode = self.objectTree.GetItemData(item)
+		if node is self.parentNode:
+			return
+		if self._children is not None and self.parentNode is not None:
+			# Don't keep the rows of a parent whose children were not all enumerated.
+			self._releaseRows(self._cache.pop(self.parentNode, []))
+		self._children = None
+		self._sortColumn = None
+		self.parentNode = node
+		rows = self._cache.get(node)
+		if rows is not None:
+			self._cache.move_to_end(node)
+		else:
+			rows = []
+			obj = self.objectTree.getItemObject(item) if node.childCountHint else None
+			if obj is not None:
+				simpleReviewMode = self.objectTree.simpleReviewMode
+				enumerator = ChildEnumerator(NodeFilter.fromConfig(), simpleReviewMode)
+				mode: str = config.conf["objectViewer"]["addTreeNodesMode"]
+				self._children = enumerator.enumerate(iterChildren(obj, mode, simpleReviewMode))
+				self._cache[node] = rows
+				while len(self._cache) > self.MAX_CACHED_PARENTS:
+					self._releaseRows(self._cache.popitem(last=False)[1])
+		self.rows = rows
+		self.SetItemCount(len(rows))
+		self.Refresh()
+		self._schedule()
+
+	def _releaseRows(self, rows: list[Row]):
+		for row in rows:
+			self.nodeStore.release(row.node)
+
+	def clear(self):
+		self.timer.Stop()
+		self._cache.clear()
+		self.nodeStore.clear()
+		self._children = None
+		self._sortColumn = None
+		self.parentNode = None
+		self.rows = []
+		self.SetItemCount(0)
+
+	def _schedule(self, fetchVisible: bool = False):
+		self._fetchVisible |= fetchVisible
+		if not self.timer.IsRunning():
+			self.timer.Start(self.TICK_INTERVAL)
+
+	def getCellText(self, index: int, column: int) -> str:
+		value = self.rows[index].values.get(self.columns[column])
+		if value is None:
+			# Fetching from here would block painting: fetch the visible rows from the next tick.
+			self._schedule(fetchVisible=True)
+			return self.PENDING_TEXT
+		return str(value)
+
+	def _getParentObject(self) -> NVDAObject | None:
+		item: wx.TreeItemId = self.objectTree.GetSelection()
+		if not item.IsOk() or self.objectTree.GetItemData(item) is not self.parentNode:
+			return None
+		return self.objectTree.getItemObject(item)
+
+	def _fetch(self, row: Row, column: str):
+		try:
+			obj = self.nodeStore.resolve(row.node, self._getParentObject, self.objectTree.simpleReviewMode)
+			value = None if obj is None else COLUMNS[column][1](obj)
+		except Exception:
+			log.debugWarning(f"Error fetching the {column} column", exc_info=True)
+			value = None
+		row.values[column] = "" if value is None else value
+
+	def _enumerateSlice(self, deadline: float) -> bool:
+		"""Add the next children to the rows, returning True once all of them are there."""
+		children = self._children
+		assert children is not None
+		count = len(self.rows)
+		for child in children:
+			node = TreeNode.fromObject(child.obj, child.index, child.hasChildren, child.chainLength)
+			self.rows.append(Row(self.nodeStore.add(node, child.obj)))
+			if time.monotonic() >= deadline:
+				break
+		else:
+			self._children = None
+		if len(self.rows) != count:
+			self.SetItemCount(len(self.rows))
+		return self._children is None
+
+	def _fetchVisibleSlice(self, deadline: float) -> bool:
+		"""Fetch the missing values of the visible rows, returning True once all of them are there."""
+		first = self.GetTopItem()
+		last = min(first + self.GetCountPerPage() + 1, len(self.rows))
+		for index in range(first, last):
+			row = self.rows[index]
+			for column in self.columns:
+				if column not in row.values:
+					if time.monotonic() >= deadline:
+						self.RefreshItems(first, last - 1)
+						return False
+					self._fetch(row, column)
+		if last > first:
+			self.RefreshItems(first, last - 1)
+		return True
+
+	def _fetchSortColumnSlice(self, deadline: float) -> bool:
+		"""Fetch the sort column for every row, returning True once they are sorted."""
+		column = self._sortColumn
+		assert column is not None
+		for row in self.rows:
+			if column not in row.values:
+				if time.monotonic() >= deadline:
+					return False
+				self._fetch(row, column)
+		self.rows.sort(key=lambda row: _sortKey(row.values[column]), reverse=not self._sortAscending)
+		self._sortColumn = None
+		self.Refresh()
+		return True
+
+	def onTick(self, event: wx.TimerEvent):
+		deadline = time.monotonic() + self.SLICE_DURATION
+		# The visible rows come first, so that they fill in while thousands of siblings are enumerated.
+		if self._fetchVisible:
+			self._fetchVisible = False
+			if not self._fetchVisibleSlice(deadline):
+				self._fetchVisible = True
+				return
+		if self._children is not None and not self._enumerateSlice(deadline):
+			return
+		if self._sortColumn is not None and not self._fetchSortColumnSlice(deadline):
+			return
+		self.timer.Stop()
+
+	def onColumnClick(self, event: wx.ListEvent):
+		column = self.columns[event.GetColumn()]
+		self._sortAscending = not self._sortAscending if column == self._lastSortColumn else True
+		self._lastSortColumn = column
+		self._sortColumn = column
+		self._schedule()
+
+	def onItemActivated(self, event: wx.ListEvent):
+		"""Select the activated child in the tree."""
+		row = self.rows[event.GetIndex()]
+		tree = self.objectTree
+		parentItem: wx.TreeItemId = tree.GetSelection()
+		if not parentItem.IsOk() or tree.GetItemData(parentItem) is not self.parentNode:
+			return
+		tree.Expand(parentItem)
+		item, cookie = tree.GetFirstChild(parentItem)
+		while item.IsOk():
+			# The tree enumerates the children with the same filters, so the child has the same position.
+			node: TreeNode = tree.GetItemData(item)
+			samePosition = node.index == row.node.index and node.chainLength == row.node.chainLength
+			if samePosition and node.key == row.node.key:
+				tree.EnsureVisible(item)
+				tree.SelectItem(item)
+				return
+			item, cookie = tree.GetNextChild(parentItem, cookie)
+
+
+def _sortKey(value: object) -> tuple[int, object]:
+	# Numbers sort before texts, so that mixed columns can still be compared.
+	if isinstance(value, (int, float)):
+		return 0, value
+	return 1, str(value).lower()
@@ -0,0 +1,86 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+import gc
+import os
+import tracemalloc
+from typing import TYPE_CHECKING
+
+from NVDAObjects import NVDAObject
+
+if TYPE_CHECKING:
+	from . import ObjectViewerTool
+
+ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
+TOP_STATISTICS = 15
+# Whether tracemalloc was started by the memory usage report rather than by the user.
+_startedTracing = False
+
+
+def getRetainedObjects(tool: "ObjectViewerTool") -> dict[str, object]:
+	"""Return the counts of the objects retained by the viewer."""
+	frame = tool.frame
+	retained: dict[str, object] = {"viewerAlive": bool(frame)}
+	if frame:
+		tree = frame.objectTree
+		retained.update(tree.nodeStore.stats)
+		retained.update(tree.pathResolver.stats)
+		retained["icons"] = tree.il.GetImageCount()
+		retained["shellLocals"] = len(frame.crust.shell.interp.locals)
+		retained["shellNVDAObjects"] = sum(
+			isinstance(value, NVDAObject) for value in frame.crust.shell.interp.locals.values()
+		)
+		retained["recordedEvents"] = len(frame.eventRecorder)
+	retained["restoreObject"] = getattr(tool, "_restoreObj", None) is not None
+	return retained
+
+
+def countNVDAObjectsInProcess() -> int:
+	"""Count the NVDA objects alive in NVDA. This walks every object tracked by the garbage collector."""
+	return sum(isinstance(o, NVDAObject) for o in gc.get_objects())
+
+
+def stopTracing():
+	"""Stop tracemalloc if the memory usage report started it."""
+	global _startedTracing
+	if _startedTracing:
+		_startedTracing = False
+		tracemalloc.stop()
+
+
+def getTracemallocReport() -> str:
+	global _startedTracing
+	if not tracemalloc.is_tracing():
+		tracemalloc.start()
+		_startedTracing = True
+		# Translators: Part of the Object Viewer memory usage report.
+		return _(
+			"tracemalloc was not tracing; tracing has been started, run the report again to get statistics."
+		)
+	snapshot = tracemalloc.take_snapshot().filter_traces(
+		(tracemalloc.Filter(True, os.path.join(ADDON_DIR, "*")),)
+	)
+	# Tracing slows down every allocation in NVDA, so it only lasts until the statistics are taken.
+	stopTracing()
+	statistics = snapshot.statistics("lineno")
+	# Translators: Part of the Object Viewer memory usage report.
+	lines = [
+		_("Total: {size} bytes in {count} lines").format(
+			size=sum(stat.size for stat in statistics), count=len(statistics)
+		)
+	]
+	lines.extend(str(stat) for stat in statistics[:TOP_STATISTICS])
+	return "\n".join(lines)
+
+
+def getDiagnosticsReport(tool: "ObjectViewerTool") -> str:
+	# Translators: Part of the Object Viewer memory usage report.
+	lines = [_("Retained objects:")]
+	lines.extend(f"{name}: {value}" for name, value in getRetainedObjects(tool).items())
+	lines.append("")
+	# Translators: Part of the Object Viewer memory usage report.
+	lines.append(_("tracemalloc statistics for the add-on:"))
+	lines.append(getTracemallocReport())
+	return "\n".join(lines)
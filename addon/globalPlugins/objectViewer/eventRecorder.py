@@ -0,0 +1,225 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+import time
+from array import array
+from collections import deque
+from collections.abc import Callable, Container, Hashable, Iterator
+from heapq import merge
+from itertools import takewhile
+from typing import NamedTuple
+
+from NVDAObjects import NVDAObject
+
+from .objectKey import getObjectKey, isUniqueKey
+
+
+class EventRecord(NamedTuple):
+	seq: int
+	eventName: str
+	key: Hashable
+	windowHandle: int
+	timestamp: float
+	role: int = 0
+
+
+class EventRecorder:
+	"""
+	Records NVDA events into a preallocated ring buffer.
+	Each slot only holds the event name, the object key, the window handle, the role and a timestamp,
+	so memory stays constant however many events are recorded.
+	"""
+
+	# The most recent objects whose key is yet to be computed.
+	MAX_PENDING_KEYS = 4096
+
+	def __init__(self, capacity: int = 65536):
+		self.capacity = capacity
+		self._names: list[str | None] = [None] * capacity
+		self._keys: list[Hashable] = [None] * capacity
+		self._windowHandles = array("Q", bytes(8 * capacity))
+		self._roles = array("i", bytes(4 * capacity))
+		self._timestamps = array("d", bytes(8 * capacity))
+		# Objects of recorded events with their sequence number, until `resolveKeys` computes their keys.
+		self._pendingKeys: deque[tuple[int, NVDAObject]] = deque(maxlen=self.MAX_PENDING_KEYS)
+		# Sequence number of the next event to be recorded.
+		self._seq = 0
+		# Sequence numbers of the buffered events, per event type.
+		self._typeIndex: dict[str, deque[int]] = {}
+		self._typeTotals: dict[str, int] = {}
+		self._lastRates: tuple[float, dict[str, int]] = (time.perf_counter(), {})
+		self._originalExecuteEvent: Callable[..., None] | None = None
+
+	@property
+	def recording(self) -> bool:
+		return self._originalExecuteEvent is not None
+
+	def __len__(self) -> int:
+		return min(self._seq, self.capacity)
+
+	@property
+	def nextSeq(self) -> int:
+		"""The sequence number of the next event to be recorded."""
+		return self._seq
+
+	def install(self):
+		"""Hook NVDA's event dispatch so that every executed event is recorded."""
+		if self._originalExecuteEvent:
+			return
+		import eventHandler
+
+		original = self._originalExecuteEvent = eventHandler.executeEvent
+
+		def executeEvent(eventName: str, obj: NVDAObject, **kwargs):
+			self.record(eventName, obj)
+			return original(eventName, obj, **kwargs)
+
+		eventHandler.executeEvent = executeEvent
+
+	def uninstall(self):
+		if not self._originalExecuteEvent:
+			return
+		import eventHandler
+
+		eventHandler.executeEvent = self._originalExecuteEvent
+		self._originalExecuteEvent = None
+
+	def record(self, eventName: str, obj: NVDAObject):
+		"""
+		Record an event for `obj`. Also the entry point for injecting synthetic events.
+		This runs on NVDA's event path, so only cheap properties are fetched: the key is computed later.
+		"""
+		try:
+			windowHandle = obj.windowHandle or 0
+			role = int(obj.role)
+		except Exception:
+			windowHandle, role = 0, 0
+		seq = self.recordKey(eventName, None, windowHandle, role=role)
+		self._pendingKeys.append((seq, obj))
+
+	def recordKey(
+		self,
+		eventName: str,
+		key: Hashable,
+		windowHandle: int = 0,
+		timestamp: float | None = None,
+		role: int = 0,
+	) -> int:
+		"""Record an event for the object with `key`, returning its sequence number."""
+		seq = self._seq
+		slot = seq % self.capacity
+		self._names[slot] = eventName
+		self._keys[slot] = key
+		self._windowHandles[slot] = windowHandle & 0xFFFFFFFFFFFFFFFF
+		self._roles[slot] = role
+		self._timestamps[slot] = time.perf_counter() if timestamp is None else timestamp
+		self._seq = seq + 1
+
+		index = self._typeIndex.get(eventName)
+		if index is None:
+			index = self._typeIndex[eventName] = deque()
+			self._typeTotals[eventName] = 0
+		index.append(seq)
+		oldest = seq - self.capacity
+		while index[0] <= oldest:
+			index.popleft()
+		self._typeTotals[eventName] += 1
+		return seq
+
+	def resolveKeys(self):
+		"""Compute the keys of the objects of the events recorded since the previous call."""
+		oldest = self._seq - self.capacity
+		while self._pendingKeys:
+			seq, obj = self._pendingKeys.popleft()
+			if seq < oldest:
+				continue
+			try:
+				self._keys[seq % self.capacity] = getObjectKey(obj)
+			except Exception:
+				pass
+
+	def clear(self):
+		self._names = [None] * self.capacity
+		self._keys = [None] * self.capacity
+		self._pendingKeys.clear()
+		self._seq = 0
+		self._typeIndex.clear()
+		self._typeTotals.clear()
+		self._lastRates = (time.perf_counter(), {})
+
+	@property
+	def eventTypes(self) -> list[str]:
+		return sorted(self._typeTotals)
+
+	def _get(self, seq: int) -> EventRecord:
+		slot = seq % self.capacity
+		return EventRecord(
+			seq,
+			self._names[slot],  # type: ignore
+			self._keys[slot],
+			self._windowHandles[slot],
+			self._timestamps[slot],
+			self._roles[slot],
+		)
+
+	def _seqsForTypes(self, eventTypes: Container[str] | None, since: int) -> Iterator[int]:
+		# The sequence number of the oldest buffered event.
+		oldest = self._seq - self.capacity
+		start = max(oldest, since, 0)
+		if eventTypes is None:
+			return iter(range(start, self._seq))
+		indexes: list[list[int]] = []
+		for eventName, index in self._typeIndex.items():
+			if eventName not in eventTypes:
+				continue
+			while index and index[0] < oldest:
+				index.popleft()
+			# Only walk back over the new events, copying them since recording may continue meanwhile.
+			seqs = list(takewhile(lambda seq: seq >= start, reversed(index)))
+			seqs.reverse()
+			indexes.append(seqs)
+		return merge(*indexes)
+
+	def events(
+		self,
+		eventTypes: Container[str] | None = None,
+		keys: Container[Hashable] | None = None,
+		windowFilter: Callable[[int], bool] | None = None,
+		since: int = 0,
+	) -> Iterator[EventRecord]:
+		"""
+		Iterate over the buffered events, oldest first.
+		:param eventTypes: Only yield events with these names, using the per-type index.
+		:param keys: Yield events whose object key is in `keys`, if no other object shares the key...
+		:param windowFilter: ...or whose window handle satisfies this predicate.
+		:param since: Only yield events from this sequence number on, such as a previous `nextSeq`.
+		"""
+		self.resolveKeys()
+		for seq in self._seqsForTypes(eventTypes, since):
+			slot = seq % self.capacity
+			if keys is not None or windowFilter is not None:
+				key = self._keys[slot]
+				if not (
+					(keys is not None and key in keys and isUniqueKey(key))
+					or (windowFilter is not None and windowFilter(self._windowHandles[slot]))
+				):
+					continue
+			yield self._get(seq)
+
+	def rates(self) -> dict[str, float]:
+		"""Events per second for each event type since the previous call."""
+		now = time.perf_counter()
+		lastTime, lastTotals = self._lastRates
+		elapsed = max(now - lastTime, 1e-6)
+		rates = {
+			eventName: (total - lastTotals.get(eventName, 0)) / elapsed
+			for eventName, total in self._typeTotals.items()
+		}
+		self._lastRates = (now, dict(self._typeTotals))
+		return rates
+
+	@property
+	def totals(self) -> dict[str, int]:
+		return dict(self._typeTotals)
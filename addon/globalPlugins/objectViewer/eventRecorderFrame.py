@@ -0,0 +1,192 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+from collections.abc import Callable, Hashable
+
+import gui.guiHelper
+import winUser
+import wx
+from controlTypes import Role
+from gui.dpiScalingHelper import DpiScalingHelperMixinWithoutInit
+from NVDAObjects import NVDAObject
+
+from .eventRecorder import EventRecord, EventRecorder
+from .objectTree import NVDAObjectTree
+from .virtualList import VirtualListCtrl
+
+
+class EventRecorderFrame(DpiScalingHelperMixinWithoutInit, wx.Frame):
+	REFRESH_INTERVAL = 500
+	# The most recent events shown in the list; older ones stay in the recorder.
+	MAX_SHOWN_EVENTS = 5000
+
+	def __init__(self, parent: wx.Window, recorder: EventRecorder, objectTree: NVDAObjectTree):
+		super().__init__(
+			parent,
+			wx.ID_ANY,
+			# Translators: The title of the Event Recorder frame.
+			_("Event Recorder"),
+		)
+		self.recorder = recorder
+		self.objectTree = objectTree
+		self.shownEvents: list[EventRecord] = []
+		# The filters the shown events were selected with, and the sequence number of the next event to show.
+		self._shownFilters: tuple | None = None
+		self._subtreeFilter: tuple[set[Hashable] | None, Callable[[int], bool] | None] = (None, None)
+		self._nextSeq = 0
+
+		self.panel: wx.Panel = wx.Panel(self)
+		sHelper = gui.guiHelper.BoxSizerHelper(self.panel, orientation=wx.VERTICAL)
+
+		buttonHelper = gui.guiHelper.ButtonHelper(wx.HORIZONTAL)
+		self.recordButton: wx.ToggleButton = wx.ToggleButton(self.panel, label=_("&Record"))
+		self.recordButton.SetValue(recorder.recording)
+		buttonHelper.sizer.Add(self.recordButton)
+		self.clearButton: wx.Button = buttonHelper.addButton(self.panel, label=_("C&lear"))
+		sHelper.addItem(buttonHelper)
+
+		self.subtreeCheckBox: wx.CheckBox = sHelper.addItem(
+			wx.CheckBox(self.panel, label=_("Only events in the &selected subtree"))
+		)
+		self.eventTypesList: wx.CheckListBox = sHelper.addLabeledControl(
+			_("Event &types (none checked shows all):"), wx.CheckListBox
+		)
+
+		self.eventList: VirtualListCtrl = sHelper.addItem(
+			VirtualListCtrl(self.panel, self.getEventItemText, style=wx.LC_SINGLE_SEL),
+			proportion=1,
+			flag=wx.EXPAND,
+		)
+		self.eventList.InsertColumn(0, _("Time"))
+		self.eventList.InsertColumn(1, _("Event"))
+		self.eventList.InsertColumn(2, _("Object"))
+
+		self.ratesList: wx.ListCtrl = sHelper.addItem(
+			wx.ListCtrl(self.panel, style=wx.LC_REPORT | wx.LC_SINGLE_SEL),
+			proportion=1,
+			flag=wx.EXPAND,
+		)
+		self.ratesList.InsertColumn(0, _("Event"))
+		self.ratesList.InsertColumn(1, _("Events/s"))
+		self.ratesList.InsertColumn(2, _("Total"))
+
+		self.panel.SetSizer(sHelper.sizer)
+
+		self.Bind(wx.EVT_TOGGLEBUTTON, self.onRecord, self.recordButton)
+		self.Bind(wx.EVT_BUTTON, self.onClear, self.clearButton)
+		self.Bind(wx.EVT_CLOSE, self.onClose)
+		self.Bind(wx.EVT_SHOW, self.onShow)
+		self.refreshTimer = wx.Timer(self)
+		self.Bind(wx.EVT_TIMER, self.onRefresh, self.refreshTimer)
+
+		self.SetSize(self.scaleSize((600, 500)))
+
+	def getEventItemText(self, index: int, column: int) -> str:
+		record = self.shownEvents[index]
+		if column == 0:
+			return f"{record.timestamp:.3f}"
+		if column == 1:
+			return record.eventName
+		if record.key is None:
+			# The object went away before its key was computed.
+			return Role(record.role).displayString
+		return str(record.key)
+
+	def getSubtreeFilter(self) -> tuple[set[Hashable] | None, Callable[[int], bool] | None]:
+		"""Build the key set and window predicate for the subtree of the selected tree node."""
+		if not self.subtreeCheckBox.IsChecked():
+			return None, None
+		item: wx.TreeItemId = self.objectTree.GetSelection()
+		if not item.IsOk():
+			return None, None
+		keys = self.objectTree.getLoadedSubtreeKeys(item)
+		obj: NVDAObject | None = self.objectTree.getItemObject(item)
+		if obj is None:
+			return keys, None
+		parent: NVDAObject | None = obj.parent
+		windowHandle: int = obj.windowHandle or 0
+		if not windowHandle or (parent and parent.windowHandle == windowHandle):
+			# The object does not own its window, so windows can't tell its subtree apart.
+			return keys, None
+		descendantCache: dict[int, bool] = {}
+
+		def windowFilter(childHandle: int) -> bool:
+			isDescendant = descendantCache.get(childHandle)
+			if isDescendant is None:
+				isDescendant = descendantCache[childHandle] = childHandle == windowHandle or bool(
+					winUser.isDescendantWindow(windowHandle, childHandle)
+				)
+			return isDescendant
+
+		return keys, windowFilter
+
+	def onRefresh(self, event: wx.TimerEvent):
+		eventTypes = self.recorder.eventTypes
+		if eventTypes != list(self.eventTypesList.GetItems()):
+			checked = set(self.eventTypesList.GetCheckedStrings())
+			self.eventTypesList.Set(eventTypes)
+			self.eventTypesList.SetCheckedStrings([t for t in eventTypes if t in checked])
+		checkedTypes = frozenset(self.eventTypesList.GetCheckedStrings()) or None
+		subtree = self.subtreeCheckBox.IsChecked()
+		selection: wx.TreeItemId = self.objectTree.GetSelection()
+		selectedNode = self.objectTree.GetItemData(selection) if subtree and selection.IsOk() else None
+		filters = (checkedTypes, subtree, selectedNode)
+		if filters != self._shownFilters or self.recorder.nextSeq < self._nextSeq:
+			# Select the shown events again, from the oldest buffered one.
+			self._shownFilters = filters
+			self._subtreeFilter = self.getSubtreeFilter()
+			self.shownEvents = []
+			self._nextSeq = 0
+		if self.recorder.nextSeq != self._nextSeq:
+			# Only the events recorded since the previous refresh are filtered and appended.
+			keys, windowFilter = self._subtreeFilter
+			if keys is not None:
+				# Take the items loaded in the subtree since the filters changed into account.
+				keys = self.objectTree.getLoadedSubtreeKeys(selection)
+				self._subtreeFilter = (keys, windowFilter)
+			self.shownEvents.extend(
+				self.recorder.events(checkedTypes, keys, windowFilter, since=self._nextSeq)
+			)
+			self._nextSeq = self.recorder.nextSeq
+			if len(self.shownEvents) > self.MAX_SHOWN_EVENTS:
+				del self.shownEvents[: len(self.shownEvents) - self.MAX_SHOWN_EVENTS]
+			self.eventList.SetItemCount(len(self.shownEvents))
+			self.eventList.Refresh()
+
+		rates = self.recorder.rates()
+		totals = self.recorder.totals
+		self.ratesList.Freeze()
+		self.ratesList.DeleteAllItems()
+		for index, (eventName, rate) in enumerate(sorted(rates.items(), key=lambda i: -i[1])):
+			self.ratesList.InsertItem(index, eventName)
+			self.ratesList.SetItem(index, 1, f"{rate:.1f}")
+			self.ratesList.SetItem(index, 2, str(totals[eventName]))
+		self.ratesList.Thaw()
+
+	def onRecord(self, event: wx.CommandEvent):
+		if self.recordButton.GetValue():
+			self.recorder.install()
+		else:
+			self.recorder.uninstall()
+		event.Skip()
+
+	def onClear(self, event: wx.CommandEvent):
+		self.recorder.clear()
+		self.onRefresh(None)
+		event.Skip()
+
+	def onShow(self, event: wx.ShowEvent):
+		# The recorder keeps recording while the frame is hidden, only the list stops being refreshed.
+		if event.IsShown():
+			self.refreshTimer.Start(self.REFRESH_INTERVAL)
+			self.onRefresh(None)
+		else:
+			self.refreshTimer.Stop()
+		event.Skip()
+
+	def onClose(self, event: wx.CloseEvent):
+		self.refreshTimer.Stop()
+		self.recorder.uninstall()
+		event.Skip()
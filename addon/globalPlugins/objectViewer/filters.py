@@ -0,0 +1,138 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+import re
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple
+
+import config
+from controlTypes import Role, State
+from NVDAObjects import NVDAObject
+
+
+class EnumeratedChild(NamedTuple):
+	obj: NVDAObject
+	# The position among the parent's children of the object shown in the tree, or of the top of its chain.
+	index: int
+	hasChildren: bool
+	# The number of single-child levels collapsed above `obj`.
+	chainLength: int
+
+
+def parseRoles(names: Iterable[str]) -> frozenset[Role]:
+	roles: set[Role] = set()
+	for name in names:
+		name = name.strip().upper()
+		if name in Role.__members__:
+			roles.add(Role[name])
+	return frozenset(roles)
+
+
+class NodeFilter:
+	"""
+	Decides which objects are shown in the tree, evaluating the cheapest criteria first.
+	The role allow list and the name pattern only apply to objects without children,
+	so that the containers leading to matching objects stay shown.
+	"""
+
+	def __init__(
+		self,
+		hideInvisible: bool = False,
+		hideOffscreen: bool = False,
+		hideZeroSize: bool = False,
+		hidePresentational: bool = False,
+		roleAllowList: Iterable[str] = (),
+		roleDenyList: Iterable[str] = (),
+		namePattern: str = "",
+		collapseSingleChildChains: bool = False,
+	):
+		self.hiddenStates = frozenset(
+			state
+			for state, hide in ((State.INVISIBLE, hideInvisible), (State.OFFSCREEN, hideOffscreen))
+			if hide
+		)
+		self.hideZeroSize = hideZeroSize
+		self.hidePresentational = hidePresentational
+		self.allowedRoles = parseRoles(roleAllowList)
+		self.deniedRoles = parseRoles(roleDenyList)
+		self.namePattern = re.compile(namePattern, re.IGNORECASE) if namePattern else None
+		self.collapseSingleChildChains = collapseSingleChildChains
+
+	@classmethod
+	def fromConfig(cls) -> "NodeFilter":
+		conf = config.conf["objectViewer"]
+		return cls(
+			hideInvisible=conf["hideInvisible"],
+			hideOffscreen=conf["hideOffscreen"],
+			hideZeroSize=conf["hideZeroSize"],
+			hidePresentational=conf["hidePresentational"],
+			roleAllowList=conf["roleAllowList"],
+			roleDenyList=conf["roleDenyList"],
+			namePattern=conf["namePattern"],
+			collapseSingleChildChains=conf["collapseSingleChildChains"],
+		)
+
+	@property
+	def active(self) -> bool:
+		return bool(
+			self.hiddenStates
+			or self.hideZeroSize
+			or self.hidePresentational
+			or self.allowedRoles
+			or self.deniedRoles
+			or self.namePattern
+		)
+
+	def accepts(self, obj: NVDAObject, hasChildren: bool = False) -> bool:
+		allowedRoles = self.allowedRoles if not hasChildren else None
+		if allowedRoles or self.deniedRoles:
+			role = obj.role
+			if allowedRoles and role not in allowedRoles:
+				return False
+			if role in self.deniedRoles:
+				return False
+		if self.hidePresentational and obj.presentationType == obj.presType_layout:
+			return False
+		if self.hiddenStates and not self.hiddenStates.isdisjoint(obj.states):
+			return False
+		if self.hideZeroSize:
+			location = obj.location
+			if not location or not location.width or not location.height:
+				return False
+		if self.namePattern and not hasChildren and not self.namePattern.search(obj.name or ""):
+			return False
+		return True
+
+
+class ChildEnumerator:
+	"""Applies a `NodeFilter` to the children of an object while they are enumerated, counting hidden ones."""
+
+	def __init__(self, nodeFilter: NodeFilter, simpleReviewMode: bool = False):
+		self.nodeFilter = nodeFilter
+		self.simpleReviewMode = simpleReviewMode
+		self.hidden = 0
+
+	def _collapseChain(self, obj: NVDAObject) -> tuple[NVDAObject, bool, int]:
+		chainLength = 0
+		while True:
+			child = obj.simpleFirstChild if self.simpleReviewMode else obj.firstChild
+			if child is None:
+				return obj, False, chainLength
+			if (child.simpleNext if self.simpleReviewMode else child.next) is not None:
+				return obj, True, chainLength
+			obj = child
+			chainLength += 1
+
+	def enumerate(self, children: Iterable[tuple[NVDAObject, bool]]) -> Iterator[EnumeratedChild]:
+		nodeFilter = self.nodeFilter
+		filtering = nodeFilter.active
+		for index, (obj, hasChildren) in enumerate(children):
+			if filtering and not nodeFilter.accepts(obj, hasChildren):
+				self.hidden += 1
+				continue
+			chainLength = 0
+			if hasChildren and nodeFilter.collapseSingleChildChains:
+				obj, hasChildren, chainLength = self._collapseChain(obj)
+			yield EnumeratedChild(obj, index, hasChildren, chainLength)
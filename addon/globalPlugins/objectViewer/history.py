@@ -0,0 +1,269 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+import itertools
+import sys
+import time
+from collections import deque
+from collections.abc import Hashable, Iterator
+from typing import NamedTuple
+
+from controlTypes import Role, State
+from logHandler import log
+from NVDAObjects import NVDAObject
+
+from .NVDAObjectIterator import ObjectIterator
+from .objectKey import getObjectKey
+
+
+class SnapshotNode:
+	"""
+	An immutable node of a captured subtree.
+	Subtrees which did not change between two captures are the same `SnapshotNode` objects in both.
+	"""
+
+	__slots__ = ("key", "role", "name", "states", "children", "generation")
+
+	def __init__(
+		self,
+		key: Hashable,
+		role: Role,
+		name: str | None,
+		states: frozenset[State],
+		children: tuple["SnapshotNode", ...],
+		generation: int,
+	):
+		self.key = key
+		self.role = role
+		self.name = name
+		self.states = states
+		self.children = children
+		# The number of the capture which created this node.
+		self.generation = generation
+
+	def sameAs(self, key: Hashable, role: Role, name: str | None, states: frozenset[State]) -> bool:
+		return self.key == key and self.role == role and self.name == name and self.states is states
+
+	def sizeOf(self) -> int:
+		return (
+			sys.getsizeof(self)
+			+ sys.getsizeof(self.children)
+			+ (sys.getsizeof(self.name) if self.name else 0)
+		)
+
+
+class Capture(NamedTuple):
+	generation: int
+	# The wall clock time the capture started at.
+	timestamp: float
+	root: SnapshotNode
+	nodeCount: int
+	# Nodes created by this capture rather than shared with the previous one.
+	newNodes: int
+	# The estimated memory used by the new nodes, in bytes.
+	newBytes: int
+	# Whether the node limit stopped the capture before the whole subtree was walked.
+	truncated: bool
+
+
+class _Frame:
+	"""A node being captured, waiting for its children."""
+
+	__slots__ = ("obj", "key", "role", "name", "states", "previous", "children", "iterator")
+
+	def __init__(self, obj: NVDAObject, previous: SnapshotNode | None, simpleReviewMode: bool, states):
+		self.obj = obj
+		self.key = getObjectKey(obj)
+		self.role = obj.role
+		self.name = obj.name
+		self.states = states
+		# The node at the same place in the previous capture, whose unchanged children are reused.
+		self.previous = previous
+		self.children: list[SnapshotNode] = []
+		self.iterator: Iterator[NVDAObject] = ObjectIterator(obj, "children", simpleReviewMode)
+
+
+class CaptureWalk:
+	"""Captures the subtree of an object in slices, sharing unchanged subtrees with the previous capture."""
+
+	def __init__(
+		self,
+		root: NVDAObject,
+		previous: SnapshotNode | None,
+		generation: int,
+		maxNodes: int,
+		simpleReviewMode: bool = False,
+		stateSets: dict[frozenset[State], frozenset[State]] | None = None,
+	):
+		self.generation = generation
+		self.maxNodes = maxNodes
+		self.simpleReviewMode = simpleReviewMode
+		# Equal state sets are interned, so that nodes can be compared and share them cheaply.
+		self._stateSets = stateSets if stateSets is not None else {}
+		self.timestamp = time.time()
+		self.nodeCount = 0
+		self.newNodes = 0
+		self.newBytes = 0
+		self.truncated = False
+		self.result: SnapshotNode | None = None
+		self._stack: list[_Frame] = [self._enter(root, previous)]
+
+	def _internStates(self, states: set[State]) -> frozenset[State]:
+		frozen = frozenset(states)
+		return self._stateSets.setdefault(frozen, frozen)
+
+	def _enter(self, obj: NVDAObject, previous: SnapshotNode | None) -> _Frame:
+		self.nodeCount += 1
+		return _Frame(obj, previous, self.simpleReviewMode, self._internStates(obj.states))
+
+	@staticmethod
+	def _findPrevious(parent: _Frame, key: Hashable, index: int) -> SnapshotNode | None:
+		previous = parent.previous
+		if previous is None:
+			return None
+		children = previous.children
+		# Children mostly stay in place; look them up by key otherwise.
+		if index < len(children) and children[index].key == key:
+			return children[index]
+		for child in children:
+			if child.key == key:
+				return child
+		return None
+
+	def _leave(self, frame: _Frame) -> SnapshotNode:
+		children = tuple(frame.children)
+		previous = frame.previous
+		if (
+			previous is not None
+			and previous.sameAs(frame.key, frame.role, frame.name, frame.states)
+			and len(previous.children) == len(children)
+			and all(a is b for a, b in zip(previous.children, children))
+		):
+			return previous
+		node = SnapshotNode(frame.key, frame.role, frame.name, frame.states, children, self.generation)
+		self.newNodes += 1
+		self.newBytes += node.sizeOf()
+		return node
+
+	def run(self, until: float) -> bool:
+		"""Walk until the capture is done or `until` (a monotonic time) is reached."""
+		stack = self._stack
+		while stack:
+			if time.monotonic() >= until:
+				return False
+			frame = stack[-1]
+			child = None if self.nodeCount >= self.maxNodes else next(frame.iterator, None)
+			if child is None:
+				if self.nodeCount >= self.maxNodes:
+					self.truncated = True
+				stack.pop()
+				node = self._leave(frame)
+				if stack:
+					stack[-1].children.append(node)
+				else:
+					self.result = node
+				continue
+			previous = self._findPrevious(frame, getObjectKey(child), len(frame.children))
+			stack.append(self._enter(child, previous))
+		return True
+
+	def toCapture(self) -> Capture:
+		assert self.result is not None
+		return Capture(
+			self.generation,
+			self.timestamp,
+			self.result,
+			self.nodeCount,
+			self.newNodes,
+			self.newBytes,
+			self.truncated,
+		)
+
+
+class HistoryRecorder:
+	"""
+	Captures the subtree of an object periodically, keeping a bounded ring of captures.
+	Captures are taken on the main thread in short slices; the oldest ones are dropped
+	when there are too many or when the memory of the nodes they created exceeds the budget.
+	"""
+
+	def __init__(self, maxCaptures: int = 300, memoryBudget: int = 16 * 1024 * 1024, maxNodes: int = 10000):
+		self.maxCaptures = maxCaptures
+		self.memoryBudget = memoryBudget
+		self.maxNodes = maxNodes
+		self.captures: deque[Capture] = deque()
+		self.usedBytes = 0
+		self.root: NVDAObject | None = None
+		self.simpleReviewMode = False
+		self._walk: CaptureWalk | None = None
+		self._generations = itertools.count(1)
+		self._stateSets: dict[frozenset[State], frozenset[State]] = {}
+		self._nextCapture = 0.0
+
+	def start(self, root: NVDAObject, simpleReviewMode: bool = False):
+		self.clear()
+		self.root = root
+		self.simpleReviewMode = simpleReviewMode
+		self._nextCapture = 0.0
+
+	def stop(self):
+		self.root = None
+		self._walk = None
+
+	def clear(self):
+		self.captures.clear()
+		self.usedBytes = 0
+		self._stateSets.clear()
+		self._walk = None
+
+	@property
+	def recording(self) -> bool:
+		return self.root is not None
+
+	def runSlice(self, duration: float, interval: float) -> Capture | None:
+		"""Advance the current capture for at most `duration` seconds, returning it once complete."""
+		if self.root is None:
+			return None
+		now = time.monotonic()
+		if self._walk is None:
+			if now < self._nextCapture:
+				return None
+			self._nextCapture = now + interval
+			previous = self.captures[-1].root if self.captures else None
+			try:
+				self._walk = CaptureWalk(
+					self.root,
+					previous,
+					next(self._generations),
+					self.maxNodes,
+					self.simpleReviewMode,
+					self._stateSets,
+				)
+			except Exception:
+				log.debugWarning(
+					"Object Viewer history: the root object is no longer available", exc_info=True
+				)
+				self.stop()
+				return None
+		try:
+			if not self._walk.run(now + duration):
+				return None
+		except Exception:
+			log.debugWarning("Object Viewer history: capture failed", exc_info=True)
+			self._walk = None
+			return None
+		capture = self._walk.toCapture()
+		self._walk = None
+		self._add(capture)
+		return capture
+
+	def _add(self, capture: Capture):
+		self.captures.append(capture)
+		self.usedBytes += capture.newBytes
+		while len(self.captures) > 1 and (
+			len(self.captures) > self.maxCaptures or self.usedBytes > self.memoryBudget
+		):
+			# Nodes of the dropped capture which later captures share stay alive, so this is an estimate.
+			self.usedBytes -= self.captures.popleft().newBytes
@@ -0,0 +1,190 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+import time
+
+import config
+import gui.guiHelper
+import wx
+from gui.dpiScalingHelper import DpiScalingHelperMixinWithoutInit
+
+from .history import Capture, HistoryRecorder, SnapshotNode
+from .objectTree import NVDAObjectTree
+
+
+class HistoryFrame(DpiScalingHelperMixinWithoutInit, wx.Frame):
+	TICK_INTERVAL = 50
+	# Time spent capturing per tick, in seconds, so that NVDA stays responsive while recording.
+	SLICE_DURATION = 0.01
+
+	def __init__(self, parent: wx.Window, objectTree: NVDAObjectTree):
+		super().__init__(
+			parent,
+			wx.ID_ANY,
+			# Translators: The title of the History frame.
+			_("History"),
+		)
+		self.objectTree = objectTree
+		self.recorder = HistoryRecorder()
+		# The capture shown in the tree.
+		self.shownCapture: Capture | None = None
+
+		self.panel: wx.Panel = wx.Panel(self)
+		sHelper = gui.guiHelper.BoxSizerHelper(self.panel, orientation=wx.VERTICAL)
+
+		buttonHelper = gui.guiHelper.ButtonHelper(wx.HORIZONTAL)
+		self.recordButton: wx.ToggleButton = wx.ToggleButton(
+			self.panel, label=_("&Record the selected subtree")
+		)
+		buttonHelper.sizer.Add(self.recordButton)
+		self.clearButton: wx.Button = buttonHelper.addButton(self.panel, label=_("C&lear"))
+		sHelper.addItem(buttonHelper)
+
+		self.slider: wx.Slider = sHelper.addLabeledControl(
+			_("&Capture:"), wx.Slider, minValue=0, maxValue=1, style=wx.SL_HORIZONTAL
+		)
+		self.slider.Enable(False)
+		self.captureLabel: wx.StaticText = sHelper.addItem(wx.StaticText(self.panel, label=""))
+
+		self.snapshotTree: wx.TreeCtrl = sHelper.addItem(
+			wx.TreeCtrl(self.panel, style=wx.TR_DEFAULT_STYLE),
+			proportion=1,
+			flag=wx.EXPAND,
+		)
+
+		self.panel.SetSizer(sHelper.sizer)
+
+		self.Bind(wx.EVT_TOGGLEBUTTON, self.onRecord, self.recordButton)
+		self.Bind(wx.EVT_BUTTON, self.onClear, self.clearButton)
+		self.Bind(wx.EVT_SLIDER, self.onSlider, self.slider)
+		self.Bind(wx.EVT_TREE_ITEM_EXPANDING, self.onItemExpanding, self.snapshotTree)
+		self.Bind(wx.EVT_TREE_ITEM_COLLAPSED, self.onItemCollapsed, self.snapshotTree)
+		self.Bind(wx.EVT_CLOSE, self.onClose)
+		self.Bind(wx.EVT_SHOW, self.onShow)
+		self.timer = wx.Timer(self)
+		self.Bind(wx.EVT_TIMER, self.onTick, self.timer)
+
+		self.SetSize(self.scaleSize((600, 500)))
+
+	def onRecord(self, event: wx.CommandEvent):
+		if self.recordButton.GetValue():
+			item: wx.TreeItemId = self.objectTree.GetSelection()
+			obj = self.objectTree.getItemObject(item) if item.IsOk() else None
+			if obj is None:
+				self.recordButton.SetValue(False)
+				return
+			conf = config.conf["objectViewer"]
+			self.recorder.maxCaptures = conf["historyMaxCaptures"]
+			self.recorder.memoryBudget = conf["historyMemoryBudget"] * 1024
+			self.recorder.maxNodes = conf["historyMaxNodes"]
+			self.recorder.start(obj, self.objectTree.simpleReviewMode)
+			self.timer.Start(self.TICK_INTERVAL)
+		else:
+			self.recorder.stop()
+			self.timer.Stop()
+		event.Skip()
+
+	def onClear(self, event: wx.CommandEvent):
+		self.recorder.clear()
+		self.updateSlider(followLatest=True)
+		event.Skip()
+
+	def onTick(self, event: wx.TimerEvent):
+		interval = config.conf["objectViewer"]["historyInterval"] / 1000
+		if not self.recorder.recording:
+			# The root object went away.
+			self.timer.Stop()
+			self.recordButton.SetValue(False)
+			return
+		captures = self.recorder.captures
+		# Follow the latest capture unless an older one is being looked at.
+		followLatest = self.shownCapture is None or (bool(captures) and self.shownCapture is captures[-1])
+		if self.recorder.runSlice(self.SLICE_DURATION, interval) is not None:
+			self.updateSlider(followLatest)
+
+	def updateSlider(self, followLatest: bool):
+		captures = self.recorder.captures
+		if not captures:
+			self.slider.Enable(False)
+			self.showCapture(None)
+			return
+		# There is nothing to move between until there are two captures.
+		self.slider.Enable(len(captures) > 1)
+		self.slider.SetRange(0, max(len(captures) - 1, 1))
+		if followLatest:
+			self.slider.SetValue(len(captures) - 1)
+		elif self.shownCapture is not None:
+			# Keep showing the same capture while older ones are dropped.
+			generations = [capture.generation for capture in captures]
+			if self.shownCapture.generation in generations:
+				self.slider.SetValue(generations.index(self.shownCapture.generation))
+		self.showCapture(captures[min(self.slider.GetValue(), len(captures) - 1)])
+
+	def onSlider(self, event: wx.CommandEvent):
+		captures = self.recorder.captures
+		if captures:
+			self.showCapture(captures[min(self.slider.GetValue(), len(captures) - 1)])
+		event.Skip()
+
+	def showCapture(self, capture: Capture | None):
+		if capture is self.shownCapture:
+			return
+		self.shownCapture = capture
+		self.snapshotTree.DeleteAllItems()
+		if capture is None:
+			self.captureLabel.SetLabel("")
+			return
+		self.captureLabel.SetLabel(
+			# Translators: Describes the capture shown in the History frame.
+			_("{time}: {nodes} objects, {changed} changed since the previous capture{truncated}").format(
+				time=time.strftime("%H:%M:%S", time.localtime(capture.timestamp)),
+				nodes=capture.nodeCount,
+				changed=capture.newNodes,
+				# Translators: Appended to the capture description when the node limit was reached.
+				truncated=_(" (truncated)") if capture.truncated else "",
+			)
+		)
+		root = self.snapshotTree.AddRoot(self.getNodeDisplayText(capture.root), data=capture.root)
+		self.highlightItem(root, capture.root)
+		self.snapshotTree.SetItemHasChildren(root, bool(capture.root.children))
+		self.snapshotTree.Expand(root)
+
+	def getNodeDisplayText(self, node: SnapshotNode) -> str:
+		return f'{node.role.displayString} "{node.name}"'
+
+	def highlightItem(self, item: wx.TreeItemId, node: SnapshotNode):
+		"""Show the objects created or changed by the shown capture in bold."""
+		assert self.shownCapture is not None
+		self.snapshotTree.SetItemBold(item, node.generation == self.shownCapture.generation)
+
+	def onItemExpanding(self, event: wx.TreeEvent):
+		item: wx.TreeItemId = event.GetItem()
+		node: SnapshotNode = self.snapshotTree.GetItemData(item)
+		if not self.snapshotTree.GetChildrenCount(item, recursively=False):
+			self.snapshotTree.Freeze()
+			for child in node.children:
+				childItem = self.snapshotTree.AppendItem(item, self.getNodeDisplayText(child), data=child)
+				self.highlightItem(childItem, child)
+				self.snapshotTree.SetItemHasChildren(childItem, bool(child.children))
+			self.snapshotTree.Thaw()
+		event.Skip()
+
+	def onItemCollapsed(self, event: wx.TreeEvent):
+		self.snapshotTree.DeleteChildren(event.GetItem())
+		event.Skip()
+
+	def onShow(self, event: wx.ShowEvent):
+		# Captures are paused while the frame is hidden.
+		if not event.IsShown():
+			self.timer.Stop()
+		elif self.recorder.recording:
+			self.timer.Start(self.TICK_INTERVAL)
+		event.Skip()
+
+	def onClose(self, event: wx.CloseEvent):
+		self.timer.Stop()
+		self.recorder.stop()
+		self.recorder.clear()
+		event.Skip()
@@ -0,0 +1,228 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+import time
+from collections import deque
+from collections.abc import Hashable
+from typing import TYPE_CHECKING
+
+import winUser
+import wx
+from logHandler import log
+from NVDAObjects import NVDAObject
+
+from .nodeStore import TreeNode
+from .objectKey import getObjectKey
+from .spatialIndex import GridIndex
+
+if TYPE_CHECKING:
+	from .objectTree import NVDAObjectTree
+
+
+class HoverInspector:
+	"""
+	Selects the tree item under the mouse while the mouse moves.
+	The locations of the loaded and prefetched objects are kept in a spatial index,
+	so that pointing resolves to a node without querying the accessibility API.
+	The object under the mouse is only hit-tested live when the pointer rests where the index has nothing
+	better than a collapsed container.
+	"""
+
+	TICK_INTERVAL = 50
+	# Time spent indexing the items loaded before hover inspection was enabled, per tick, in seconds.
+	SLICE_DURATION = 0.02
+	# Seconds between two live hit-tests.
+	LIVE_HIT_TEST_INTERVAL = 0.5
+
+	def __init__(self, tree: "NVDAObjectTree"):
+		self.tree = tree
+		self.enabled = False
+		self.index: GridIndex[TreeNode] = GridIndex()
+		# The tree item of each indexed node, None for prefetched nodes which aren't in the tree yet.
+		self._items: dict[TreeNode, wx.TreeItemId | None] = {}
+		# The parent of each prefetched node, to expand it when the node is pointed at.
+		self._prefetchParents: dict[TreeNode, TreeNode] = {}
+		self._depths: dict[TreeNode, int] = {}
+		# Indexed nodes by object key, to move them when their object reports a location change.
+		self._nodesByKey: dict[Hashable, list[TreeNode]] = {}
+		# Items loaded before hover inspection was enabled, indexed in slices.
+		self._pending: deque[tuple[TreeNode, wx.TreeItemId]] = deque()
+		self._pendingNodes: set[TreeNode] = set()
+		self._lastPoint: tuple[int, int] | None = None
+		self._lastLiveHitTest = 0.0
+		self._liveHitTestPoint: tuple[int, int] | None = None
+		self.hits = 0
+		self.liveHitTests = 0
+		self.timer = wx.Timer(tree)
+		tree.Bind(wx.EVT_TIMER, self.onTick, self.timer)
+
+	def enable(self):
+		self.enabled = True
+		displays = [wx.Display(index).GetGeometry() for index in range(wx.Display.GetCount())]
+		self.index.bounds = (
+			min(rect.GetLeft() for rect in displays),
+			min(rect.GetTop() for rect in displays),
+			max(rect.GetRight() + 1 for rect in displays),
+			max(rect.GetBottom() + 1 for rect in displays),
+		)
+		for item in self.tree.iterLoadedItems(self.tree.GetRootItem()):
+			node: TreeNode = self.tree.GetItemData(item)
+			self._pending.append((node, item))
+			self._pendingNodes.add(node)
+		self.timer.Start(self.TICK_INTERVAL)
+
+	def disable(self):
+		self.enabled = False
+		self.timer.Stop()
+		self.index.clear()
+		self._items.clear()
+		self._prefetchParents.clear()
+		self._depths.clear()
+		self._nodesByKey.clear()
+		self._pending.clear()
+		self._pendingNodes.clear()
+		self._lastPoint = self._liveHitTestPoint = None
+
+	def _getItemDepth(self, item: wx.TreeItemId) -> int:
+		depth = 0
+		item = self.tree.GetItemParent(item)
+		while item.IsOk():
+			depth += 1
+			item = self.tree.GetItemParent(item)
+		return depth
+
+	def _insert(self, node: TreeNode, obj: NVDAObject, depth: int):
+		try:
+			location = obj.location
+		except Exception:
+			log.debugWarning("Error getting the location of an object", exc_info=True)
+			location = None
+		if not location:
+			return
+		if node not in self._depths:
+			self._nodesByKey.setdefault(node.key, []).append(node)
+		self._depths[node] = depth
+		window = winUser.getAncestor(obj.windowHandle, winUser.GA_ROOT) if obj.windowHandle else 0
+		self.index.insert(
+			node, location.left, location.top, location.width, location.height, depth, window or 0
+		)
+
+	def addItem(self, item: wx.TreeItemId, node: TreeNode, obj: NVDAObject):
+		"""Index a tree item whose object has just been fetched."""
+		self._items[node] = item
+		self._prefetchParents.pop(node, None)
+		self._insert(node, obj, self._getItemDepth(item))
+
+	def addPrefetched(self, parentNode: TreeNode, node: TreeNode, obj: NVDAObject):
+		"""Index a prefetched child of `parentNode`, which is either in the tree or prefetched itself."""
+		parentDepth = self._depths.get(parentNode)
+		if parentDepth is None:
+			return
+		self._items[node] = None
+		self._prefetchParents[node] = parentNode
+		self._insert(node, obj, parentDepth + 1)
+
+	def onItemAppended(self, item: wx.TreeItemId, node: TreeNode):
+		"""Attach a prefetched node to the tree item it was rendered as."""
+		if node in self._items:
+			self._items[node] = item
+			self._prefetchParents.pop(node, None)
+
+	def removeNode(self, node: TreeNode):
+		self._pendingNodes.discard(node)
+		self._items.pop(node, None)
+		self._prefetchParents.pop(node, None)
+		if self._depths.pop(node, None) is None:
+			return
+		self.index.remove(node)
+		nodes = self._nodesByKey[node.key]
+		nodes.remove(node)
+		if not nodes:
+			del self._nodesByKey[node.key]
+
+	def onLocationChange(self, obj: NVDAObject):
+		nodes = self._nodesByKey.get(getObjectKey(obj))
+		if not nodes:
+			return
+		for node in list(nodes):
+			self._insert(node, obj, self._depths[node])
+
+	def _indexPending(self, deadline: float):
+		while self._pending and time.monotonic() < deadline:
+			node, item = self._pending.popleft()
+			if node not in self._pendingNodes:
+				# The item has been deleted since.
+				continue
+			self._pendingNodes.discard(node)
+			obj = self.tree.getItemObject(item)
+			if obj is not None:
+				self.addItem(item, node, obj)
+
+	def _getItem(self, node: TreeNode) -> wx.TreeItemId | None:
+		"""Return the item of `node`, expanding its prefetched ancestors to render it if needed."""
+		item = self._items.get(node)
+		if item is not None:
+			return item
+		parentNode = self._prefetchParents.get(node)
+		if parentNode is None:
+			return None
+		parentItem = self._getItem(parentNode)
+		if parentItem is None:
+			return None
+		# Expanding renders the prefetched children, which attaches them through onItemAppended.
+		self.tree.Expand(parentItem)
+		return self._items.get(node)
+
+	def onTick(self, event: wx.TimerEvent):
+		now = time.monotonic()
+		if self._pending:
+			self._indexPending(now + self.SLICE_DURATION)
+		cursorPos = winUser.getCursorPos()
+		point = (cursorPos.x, cursorPos.y)
+		moved = point != self._lastPoint
+		self._lastPoint = point
+		if self.tree.GetTopLevelParent().GetScreenRect().Contains(*point):
+			return
+		node = None
+		if moved:
+			# Only the objects of the window on top at the point can be under the mouse.
+			topWindow = winUser.getAncestor(winUser.user32.WindowFromPoint(cursorPos), winUser.GA_ROOT)
+			node = self.index.query(*point, topWindow or None)
+		if node is not None:
+			item = self._getItem(node)
+			if item is None:
+				self.removeNode(node)
+			else:
+				self.hits += 1
+				if item != self.tree.GetSelection():
+					self.tree.EnsureVisible(item)
+					self.tree.SelectItem(item)
+				if not node.childCountHint or self.tree.IsExpanded(item):
+					self._liveHitTestPoint = point
+				return
+		if moved or point == self._liveHitTestPoint:
+			# Wait for the pointer to rest before querying the application.
+			return
+		if now - self._lastLiveHitTest < self.LIVE_HIT_TEST_INTERVAL:
+			return
+		self._lastLiveHitTest = now
+		self._liveHitTestPoint = point
+		self.liveHitTests += 1
+		try:
+			obj = NVDAObject.objectFromPoint(*point)
+		except Exception:
+			log.debugWarning("Error hit-testing the object under the mouse", exc_info=True)
+			return
+		if obj is not None:
+			# Collapsing the tree would delete the indexed items.
+			self.tree.selectObject(obj, collapse=False, speak=False)
+
+	@property
+	def stats(self) -> dict[str, object]:
+		return {
+			"hoverIndexedNodes": len(self.index),
+			"hoverHits": self.hits,
+			"hoverLiveHitTests": self.liveHitTests,
+		}
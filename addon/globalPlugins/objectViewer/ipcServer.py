@@ -0,0 +1,696 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+"""
+A local JSON-RPC 2.0 server exposing the object tree to external tools, such as test automation.
+
+Messages are JSON documents sent as `multiprocessing.connection` messages over a named pipe on Windows,
+or a Unix socket elsewhere. Nodes are referred to by integer ids handed out by the server.
+Methods, with their parameters:
+
+- ``root(start="desktop")``: the id of the desktop, or of the "focus", "navigator" or "mouse" object.
+- ``children(ids)``: ``[{"id": id, "children": [ids]}]`` for each of the given nodes.
+- ``properties(ids, names)``: ``[{"id": id, "properties": {name: value}}]`` for each of the given nodes.
+- ``ancestors(ids)``: ``[{"id": id, "ancestors": [ids from the root]}]`` for each of the given nodes.
+- ``subtree(id, names, maxDepth=None, chunkSize=200)``: streamed, see below.
+
+A batch (a JSON array of requests) is answered with one array of responses.
+Requests sent on one connection without waiting for their responses are served concurrently,
+so responses may come in any order.
+A ``subtree`` request is answered with several responses sharing its id: each one has a ``partial``
+member set to true and a chunk of ``{"id", "parent", "depth", "properties"}`` nodes as result,
+and the last one has ``{"done": true, "count": number of nodes}`` as result.
+
+Clients authenticate with a key: the configured one, or else a key generated for the NVDA session
+and written to `objectViewer-ipc.key`, in hexadecimal, in NVDA's user configuration directory.
+
+Only the NVDA provider depends on NVDA, so that the server and client can run anywhere
+against another `ObjectProvider`, such as `DictObjectProvider`.
+"""
+
+import enum
+import inspect
+import itertools
+import json
+import os
+import secrets
+import sys
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Callable, Hashable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, TypeVar
+
+NodeId = int
+Result = TypeVar("Result")
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+UNKNOWN_NODE = -32001
+
+
+def getDefaultAddress() -> str:
+	if sys.platform == "win32":
+		return r"\\.\pipe\objectViewer"
+	return os.path.join(tempfile.gettempdir(), f"objectViewer-{os.getuid()}.sock")
+
+
+def getKeyFilePath() -> str:
+	"""The file holding the key generated for the session, in NVDA's user configuration directory."""
+	import globalVars
+
+	return os.path.join(globalVars.appArgs.configPath, "objectViewer-ipc.key")
+
+
+def writeKeyFile(path: str, authkey: bytes):
+	"""Write `authkey` in hexadecimal to a new file only the current user can read."""
+	if os.path.exists(path):
+		os.unlink(path)
+	# On Windows the mode is ignored, but NVDA's user configuration directory is private to the user.
+	fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+	with open(fd, "w", encoding="ascii") as f:
+		f.write(authkey.hex())
+
+
+def readKeyFile(path: str) -> bytes:
+	with open(path, encoding="ascii") as f:
+		return bytes.fromhex(f.read().strip())
+
+
+class RPCError(Exception):
+	def __init__(self, code: int, message: str):
+		super().__init__(message)
+		self.code = code
+		self.message = message
+
+
+class UnknownNodeError(RPCError):
+	def __init__(self, nodeId: object):
+		super().__init__(UNKNOWN_NODE, f"Unknown node: {nodeId!r}")
+
+
+def toJSON(value: object) -> object:
+	"""Convert a property value to something JSON can represent."""
+	if isinstance(value, enum.Enum):
+		# A role or a state, which are integer enumerations.
+		return value.name
+	if value is None or isinstance(value, (bool, int, float, str)):
+		return value
+	if isinstance(value, (set, frozenset)):
+		return sorted(toJSON(item) for item in value)
+	if isinstance(value, (list, tuple)):
+		return [toJSON(item) for item in value]
+	if isinstance(value, dict):
+		return {str(key): toJSON(item) for key, item in value.items()}
+	return str(value)
+
+
+class ObjectProvider:
+	"""
+	The objects served by an `InspectionServer`.
+	Methods take several nodes at once, so that a provider can fetch them in one go,
+	and may be called from several threads at the same time.
+	"""
+
+	def root(self, start: str = "desktop") -> NodeId:
+		raise NotImplementedError
+
+	def children(self, ids: list[NodeId]) -> list[list[NodeId]]:
+		raise NotImplementedError
+
+	def properties(self, ids: list[NodeId], names: list[str]) -> list[dict[str, object]]:
+		raise NotImplementedError
+
+	def ancestors(self, ids: list[NodeId]) -> list[list[NodeId]]:
+		raise NotImplementedError
+
+	def iterSubtree(
+		self,
+		nodeId: NodeId,
+		names: list[str],
+		maxDepth: int | None = None,
+		chunkSize: int = 200,
+	) -> Iterator[list[dict[str, object]]]:
+		"""Yield the nodes below `nodeId` breadth first, in chunks fetched with one call per method."""
+		if chunkSize < 1:
+			raise ValueError(f"Invalid chunk size: {chunkSize}")
+		pending: deque[tuple[NodeId, NodeId | None, int]] = deque([(nodeId, None, 0)])
+		while pending:
+			chunk = [pending.popleft() for _i in range(min(chunkSize, len(pending)))]
+			ids = [entry[0] for entry in chunk]
+			properties = self.properties(ids, names)
+			expand = [entry for entry in chunk if maxDepth is None or entry[2] < maxDepth]
+			children = self.children([entry[0] for entry in expand]) if expand else []
+			for (parentId, _parent, depth), childIds in zip(expand, children):
+				pending.extend((childId, parentId, depth + 1) for childId in childIds)
+			yield [
+				{"id": childId, "parent": parentId, "depth": depth, "properties": childProperties}
+				for (childId, parentId, depth), childProperties in zip(chunk, properties)
+			]
+
+
+class DictObjectProvider(ObjectProvider):
+	"""
+	Serves a tree of dictionaries, whose "children" item holds the child dictionaries
+	and whose other items are the properties. Used to exercise the server without NVDA.
+	"""
+
+	def __init__(self, tree: dict[str, Any]):
+		self._nodes: list[dict[str, Any]] = []
+		self._parents: list[NodeId | None] = []
+		self._childIds: list[list[NodeId]] = []
+		stack: list[tuple[dict[str, Any], NodeId | None]] = [(tree, None)]
+		while stack:
+			node, parentId = stack.pop()
+			nodeId = len(self._nodes)
+			self._nodes.append(node)
+			self._parents.append(parentId)
+			self._childIds.append([])
+			if parentId is not None:
+				self._childIds[parentId].append(nodeId)
+			stack.extend((child, nodeId) for child in reversed(node.get("children", ())))
+
+	def _check(self, nodeId: NodeId):
+		if not isinstance(nodeId, int) or not 0 <= nodeId < len(self._nodes):
+			raise UnknownNodeError(nodeId)
+
+	def root(self, start: str = "desktop") -> NodeId:
+		return 0
+
+	def children(self, ids: list[NodeId]) -> list[list[NodeId]]:
+		for nodeId in ids:
+			self._check(nodeId)
+		return [list(self._childIds[nodeId]) for nodeId in ids]
+
+	def properties(self, ids: list[NodeId], names: list[str]) -> list[dict[str, object]]:
+		for nodeId in ids:
+			self._check(nodeId)
+		return [{name: toJSON(self._nodes[nodeId].get(name)) for name in names} for nodeId in ids]
+
+	def ancestors(self, ids: list[NodeId]) -> list[list[NodeId]]:
+		results: list[list[NodeId]] = []
+		for nodeId in ids:
+			self._check(nodeId)
+			path: list[NodeId] = []
+			parentId = self._parents[nodeId]
+			while parentId is not None:
+				path.append(parentId)
+				parentId = self._parents[parentId]
+			results.append(path[::-1])
+		return results
+
+
+class NVDAObjectProvider(ObjectProvider):
+	"""
+	Serves NVDA objects. Every call runs on NVDA's main thread, since most NVDA objects
+	can't be used from other threads; ids are kept for the most recently served objects only.
+	An object served again keeps its id.
+	"""
+
+	MAX_NODES = 4096
+	# Seconds to wait for the main thread before failing a call.
+	TIMEOUT = 10.0
+	# The properties clients can get: public, non-callable properties of NVDA objects.
+	PROPERTIES = frozenset(
+		(
+			"name",
+			"role",
+			"roleText",
+			"states",
+			"value",
+			"description",
+			"keyboardShortcut",
+			"location",
+			"childCount",
+			"indexInParent",
+			"positionInfo",
+			"processID",
+			"windowHandle",
+			"windowClassName",
+			"windowControlID",
+			"windowText",
+			"isFocusable",
+			"hasFocus",
+			"presentationType",
+			"UIAAutomationId",
+			"UIAClassName",
+			"IA2UniqueID",
+			"IAccessibleChildID",
+			"IAccessibleRole",
+		)
+	)
+
+	def __init__(self):
+		from .pathResolver import ObjectPathResolver
+
+		self._objects: OrderedDict[NodeId, Any] = OrderedDict()
+		self._keys: dict[NodeId, Hashable] = {}
+		self._idsByKey: dict[Hashable, list[NodeId]] = {}
+		self._nextId = itertools.count(1)
+		self._pathResolver = ObjectPathResolver()
+
+	def _onMainThread(self, func: Callable[[], Result]) -> Result:
+		if threading.current_thread() is threading.main_thread():
+			return func()
+		import wx
+
+		done = threading.Event()
+		outcome: list = []
+
+		def run():
+			try:
+				outcome.append((True, func()))
+			except BaseException as e:
+				outcome.append((False, e))
+			finally:
+				done.set()
+
+		wx.CallAfter(run)
+		if not done.wait(self.TIMEOUT):
+			raise RPCError(INTERNAL_ERROR, "NVDA did not answer in time")
+		succeeded, value = outcome[0]
+		if not succeeded:
+			raise value
+		return value
+
+	def _add(self, obj) -> NodeId:
+		from .objectKey import getObjectKey, isUniqueKey
+
+		key = getObjectKey(obj)
+		unique = isUniqueKey(key)
+		for nodeId in self._idsByKey.get(key, ()):
+			# Objects sharing a key which doesn't identify them are compared.
+			if unique or self._objects[nodeId] == obj:
+				self._objects[nodeId] = obj
+				self._objects.move_to_end(nodeId)
+				return nodeId
+		nodeId = next(self._nextId)
+		self._objects[nodeId] = obj
+		self._keys[nodeId] = key
+		self._idsByKey.setdefault(key, []).append(nodeId)
+		while len(self._objects) > self.MAX_NODES:
+			oldId, _oldObj = self._objects.popitem(last=False)
+			oldKey = self._keys.pop(oldId)
+			ids = self._idsByKey[oldKey]
+			ids.remove(oldId)
+			if not ids:
+				del self._idsByKey[oldKey]
+		return nodeId
+
+	def _get(self, nodeId: NodeId):
+		obj = self._objects.get(nodeId)
+		if obj is None:
+			raise UnknownNodeError(nodeId)
+		self._objects.move_to_end(nodeId)
+		return obj
+
+	@property
+	def _simpleReviewMode(self) -> bool:
+		import config
+
+		return config.conf["objectViewer"]["simpleReviewMode"]
+
+	def root(self, start: str = "desktop") -> NodeId:
+		import api
+
+		getters = {
+			"desktop": api.getDesktopObject,
+			"focus": api.getFocusObject,
+			"navigator": api.getNavigatorObject,
+			"mouse": api.getMouseObject,
+		}
+		if start not in getters:
+			raise RPCError(INVALID_PARAMS, f"Unknown start: {start!r}")
+		return self._onMainThread(lambda: self._add(getters[start]()))
+
+	def children(self, ids: list[NodeId]) -> list[list[NodeId]]:
+		from .NVDAObjectIterator import ObjectIterator
+
+		def fetch() -> list[list[NodeId]]:
+			simpleReviewMode = self._simpleReviewMode
+			return [
+				[
+					self._add(child)
+					for child in ObjectIterator(self._get(nodeId), "children", simpleReviewMode)
+				]
+				for nodeId in ids
+			]
+
+		return self._onMainThread(fetch)
+
+	def properties(self, ids: list[NodeId], names: list[str]) -> list[dict[str, object]]:
+		for name in names:
+			if name not in self.PROPERTIES:
+				raise RPCError(INVALID_PARAMS, f"Unknown property: {name!r}")
+
+		def getProperty(obj, name: str) -> object:
+			try:
+				value = getattr(obj, name)
+			except Exception as e:
+				return {"error": str(e)}
+			return None if callable(value) else toJSON(value)
+
+		def fetch() -> list[dict[str, object]]:
+			objects = [self._get(nodeId) for nodeId in ids]
+			return [{name: getProperty(obj, name) for name in names} for obj in objects]
+
+		return self._onMainThread(fetch)
+
+	def ancestors(self, ids: list[NodeId]) -> list[list[NodeId]]:
+		def fetch() -> list[list[NodeId]]:
+			results: list[list[NodeId]] = []
+			for nodeId in ids:
+				path = self._pathResolver.resolve(self._get(nodeId), self._simpleReviewMode)
+				results.append([self._add(obj) for obj in path[:-1]])
+			return results
+
+		return self._onMainThread(fetch)
+
+
+class InspectionServer:
+	"""
+	Serves an `ObjectProvider` to local clients, handling their requests on a thread pool.
+	Clients must authenticate with `authkey`.
+	"""
+
+	def __init__(
+		self,
+		provider: ObjectProvider,
+		address: str | None,
+		authkey: bytes,
+		workers: int = 4,
+	):
+		if not authkey:
+			raise ValueError("An authentication key is required")
+		self.provider = provider
+		self.address = address or getDefaultAddress()
+		self.authkey = authkey
+		self.workers = workers
+		self._listener: Listener | None = None
+		self._executor: ThreadPoolExecutor | None = None
+		self._connections: set[Connection] = set()
+		self._lock = threading.Lock()
+		self._stopping = threading.Event()
+		self._methods: dict[str, Callable[..., object]] = {
+			"root": provider.root,
+			"children": provider.children,
+			"properties": provider.properties,
+			"ancestors": provider.ancestors,
+		}
+
+	@property
+	def running(self) -> bool:
+		return self._listener is not None
+
+	def start(self):
+		if self._listener:
+			return
+		if sys.platform != "win32" and os.path.exists(self.address):
+			# A socket left behind by a previous session.
+			os.unlink(self.address)
+		self._stopping.clear()
+		self._listener = Listener(self.address, authkey=self.authkey)
+		self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="objectViewerIPC")
+		threading.Thread(target=self._acceptLoop, name="objectViewerIPCListener", daemon=True).start()
+
+	def stop(self):
+		if not self._listener:
+			return
+		self._stopping.set()
+		try:
+			# Wake the listener thread up from accept. Without a key, this doesn't wait for the handshake,
+			# which no one answers if the listener thread has already seen the stop.
+			Client(self.address).close()
+		except Exception:
+			pass
+		self._listener.close()
+		self._listener = None
+		with self._lock:
+			connections = list(self._connections)
+		for connection in connections:
+			connection.close()
+		if self._executor:
+			self._executor.shutdown(wait=False, cancel_futures=True)
+			self._executor = None
+
+	def _acceptLoop(self):
+		listener = self._listener
+		while not self._stopping.is_set():
+			try:
+				connection = listener.accept()
+			except Exception:
+				if self._stopping.is_set():
+					return
+				# A client failing authentication; keep serving the others.
+				continue
+			if self._stopping.is_set():
+				connection.close()
+				return
+			with self._lock:
+				self._connections.add(connection)
+			threading.Thread(
+				target=self._serveConnection,
+				args=(connection,),
+				name="objectViewerIPCConnection",
+				daemon=True,
+			).start()
+
+	def _serveConnection(self, connection: Connection):
+		sendLock = threading.Lock()
+
+		def send(message: object):
+			data = json.dumps(message, separators=(",", ":")).encode("utf-8")
+			with sendLock:
+				connection.send_bytes(data)
+
+		try:
+			while not self._stopping.is_set():
+				try:
+					data = connection.recv_bytes()
+				except (EOFError, OSError):
+					return
+				executor = self._executor
+				if executor is None:
+					return
+				executor.submit(self._handleMessage, data, send)
+		finally:
+			with self._lock:
+				self._connections.discard(connection)
+			connection.close()
+
+	def _handleMessage(self, data: bytes, send: Callable[[object], None]):
+		try:
+			try:
+				message = json.loads(data)
+			except ValueError as e:
+				send(_errorResponse(None, PARSE_ERROR, f"Parse error: {e}"))
+				return
+			if isinstance(message, list):
+				if not message:
+					send(_errorResponse(None, INVALID_REQUEST, "Empty batch"))
+					return
+				responses = [self._handleRequest(request, send) for request in message]
+				responses = [response for response in responses if response is not None]
+				if responses:
+					send(responses)
+			else:
+				response = self._handleRequest(message, send)
+				if response is not None:
+					send(response)
+		except (EOFError, OSError):
+			# The client went away.
+			pass
+
+	def _handleRequest(self, request: object, send: Callable[[object], None]) -> dict | None:
+		"""Return the response to `request`, or None for notifications and streamed requests."""
+		if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+			return _errorResponse(None, INVALID_REQUEST, "Invalid request")
+		requestId = request.get("id")
+		method: str = request["method"]
+		params = request.get("params", {})
+		if not isinstance(params, dict):
+			return _errorResponse(requestId, INVALID_PARAMS, "Parameters must be named")
+		# Notifications, requests without an id, get no response, not even an error.
+		isNotification = "id" not in request
+		try:
+			if method == "subtree":
+				self._streamSubtree(requestId, params, send)
+				return None
+			func = self._methods.get(method)
+			if func is None:
+				raise RPCError(METHOD_NOT_FOUND, f"Method not found: {method}")
+			try:
+				inspect.signature(func).bind(**params)
+			except TypeError as e:
+				raise RPCError(INVALID_PARAMS, str(e))
+			result = func(**params)
+		except RPCError as e:
+			return None if isNotification else _errorResponse(requestId, e.code, e.message)
+		except (EOFError, OSError):
+			raise
+		except Exception as e:
+			if isNotification:
+				return None
+			return _errorResponse(requestId, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+		if isNotification:
+			return None
+		if method in ("children", "properties", "ancestors"):
+			result = [{"id": nodeId, method: value} for nodeId, value in zip(params.get("ids", ()), result)]
+		return {"jsonrpc": "2.0", "id": requestId, "result": result}
+
+	def _streamSubtree(self, requestId: object, params: dict, send: Callable[[object], None]):
+		if "id" not in params:
+			raise RPCError(INVALID_PARAMS, "Missing parameter: 'id'")
+		maxDepth = params.get("maxDepth")
+		chunkSize = params.get("chunkSize", 200)
+		if maxDepth is not None and (not _isInt(maxDepth) or maxDepth < 0):
+			raise RPCError(INVALID_PARAMS, f"Invalid maxDepth: {maxDepth!r}")
+		# An empty chunk would never make progress.
+		if not _isInt(chunkSize) or chunkSize < 1:
+			raise RPCError(INVALID_PARAMS, f"Invalid chunkSize: {chunkSize!r}")
+		chunks = self.provider.iterSubtree(
+			params["id"], params.get("names", ["role", "name"]), maxDepth, chunkSize
+		)
+		count = 0
+		for chunk in chunks:
+			if self._stopping.is_set():
+				return
+			count += len(chunk)
+			send({"jsonrpc": "2.0", "id": requestId, "partial": True, "result": chunk})
+		send({"jsonrpc": "2.0", "id": requestId, "result": {"done": True, "count": count}})
+
+
+def _isInt(value: object) -> bool:
+	return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _errorResponse(requestId: object, code: int, message: str) -> dict:
+	return {"jsonrpc": "2.0", "id": requestId, "error": {"code": code, "message": message}}
+
+
+class InspectionClient:
+	"""A blocking client for `InspectionServer`, to be used from one thread."""
+
+	def __init__(self, address: str | None = None, authkey: bytes | None = None):
+		self._connection = Client(address or getDefaultAddress(), authkey=authkey)
+		self._ids = itertools.count(1)
+
+	def close(self):
+		self._connection.close()
+
+	def __enter__(self) -> "InspectionClient":
+		return self
+
+	def __exit__(self, *excInfo):
+		self.close()
+
+	def _send(self, message: object):
+		self._connection.send_bytes(json.dumps(message, separators=(",", ":")).encode("utf-8"))
+
+	def _receive(self) -> Any:
+		return json.loads(self._connection.recv_bytes())
+
+	def _request(self, method: str, params: dict) -> dict:
+		return {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+
+	@staticmethod
+	def _result(response: dict) -> Any:
+		if "error" in response:
+			raise RPCError(response["error"]["code"], response["error"]["message"])
+		return response["result"]
+
+	def call(self, method: str, **params) -> Any:
+		self._send(self._request(method, params))
+		return self._result(self._receive())
+
+	def batch(self, calls: list[tuple[str, dict]]) -> list[Any]:
+		"""Send several calls in one round trip, returning their results in order."""
+		requests = [self._request(method, params) for method, params in calls]
+		self._send(requests)
+		received = self._receive()
+		if isinstance(received, dict):
+			# The batch as a whole was rejected.
+			received = [received]
+		responses = {response.get("id"): response for response in received}
+		# Requests the server could not read are answered with a null id.
+		unidentified = responses.get(None)
+		results: list[Any] = []
+		for request in requests:
+			response = responses.get(request["id"], unidentified)
+			if response is None:
+				raise RPCError(INTERNAL_ERROR, f"No response to request {request['id']}")
+			results.append(self._result(response))
+		return results
+
+	def stream(self, method: str, **params) -> Iterator[Any]:
+		"""Yield the chunks of a streamed call, such as "subtree", returning its final result."""
+		self._send(self._request(method, params))
+		while True:
+			response = self._receive()
+			result = self._result(response)
+			if not response.get("partial"):
+				return result
+			yield result
+
+
+_server: InspectionServer | None = None
+
+
+def getServer() -> InspectionServer | None:
+	return _server
+
+
+_keyFile: str | None = None
+
+
+def startServer(provider: ObjectProvider | None = None):
+	"""
+	Start serving NVDA objects, or the objects of `provider`, as configured.
+	Without a configured key, one is generated and written to the key file.
+	"""
+	import config
+
+	global _server, _keyFile
+	if _server:
+		return
+	conf = config.conf["objectViewer"]
+	authkey = conf["ipcAuthKey"].encode("utf-8")
+	keyFile = None
+	if not authkey:
+		authkey = secrets.token_bytes(32)
+		keyFile = getKeyFilePath()
+		writeKeyFile(keyFile, authkey)
+	server = InspectionServer(
+		provider or NVDAObjectProvider(),
+		conf["ipcAddress"] or None,
+		authkey,
+		conf["ipcWorkers"],
+	)
+	try:
+		server.start()
+	except Exception:
+		if keyFile:
+			os.unlink(keyFile)
+		raise
+	_server = server
+	_keyFile = keyFile
+
+
+def stopServer():
+	global _server, _keyFile
+	if _server:
+		_server.stop()
+		_server = None
+	if _keyFile:
+		try:
+			os.unlink(_keyFile)
+		except OSError:
+			pass
+		_keyFile = None
@@ -0,0 +1,204 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+import sys
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+from controlTypes import Role
+from NVDAObjects import NVDAObject
+
+from .NVDAObjectIterator import ObjectIterator
+from .objectKey import getObjectKey
+
+
+class TreeNode:
+	"""The compact record stored as the data of each tree item, instead of the NVDA object itself."""
+
+	__slots__ = ("key", "role", "name", "index", "childCountHint", "processID", "chainLength")
+
+	def __init__(
+		self,
+		key: Hashable,
+		role: Role,
+		name: str | None,
+		index: int,
+		childCountHint: int,
+		processID: int,
+		chainLength: int = 0,
+	):
+		self.key = key
+		self.role = role
+		self.name = name
+		# The position of the object among its parent's children, used to find it again.
+		self.index = index
+		# 0 if the object has no children, 1 if it has at least one.
+		self.childCountHint = childCountHint
+		self.processID = processID
+		# The number of single-child levels between the object at `index` and this object.
+		self.chainLength = chainLength
+
+	@classmethod
+	def fromObject(
+		cls,
+		obj: NVDAObject,
+		index: int = 0,
+		hasChildren: bool | None = None,
+		chainLength: int = 0,
+	) -> "TreeNode":
+		if hasChildren is None:
+			hasChildren = bool(obj.firstChild)
+		role = obj.role
+		return cls(
+			getObjectKey(obj, role), role, obj.name, index, int(hasChildren), obj.processID, chainLength
+		)
+
+	def sizeOf(self) -> int:
+		size = sys.getsizeof(self) + sys.getsizeof(self.key)
+		if isinstance(self.key, tuple):
+			size += sum(sys.getsizeof(part) for part in self.key)
+		if self.name:
+			size += sys.getsizeof(self.name)
+		return size
+
+
+class NodeStore:
+	"""
+	Keeps track of the nodes in the tree and of the live NVDA objects behind them.
+	Live objects are held strongly only by a bounded LRU cache;
+	evicted objects stay reachable through a weak reference for as long as NVDA itself keeps them.
+	"""
+
+	def __init__(self, maxLiveObjects: int = 64):
+		self.maxLiveObjects = maxLiveObjects
+		self._liveObjects: OrderedDict[TreeNode, NVDAObject] = OrderedDict()
+		# Slotted nodes can't be weakly referenced, so weak references to the objects are keyed by node id.
+		self._weakObjects: dict[int, weakref.ref[NVDAObject]] = {}
+		self.nodeCount = 0
+		self.nodeBytes = 0
+		self.resolveCount = 0
+		self.indexMisses = 0
+
+	def add(self, node: TreeNode, obj: NVDAObject | None = None) -> TreeNode:
+		self.nodeCount += 1
+		self.nodeBytes += node.sizeOf()
+		if obj is not None:
+			self.cache(node, obj)
+		return node
+
+	def release(self, node: TreeNode):
+		self.nodeCount -= 1
+		self.nodeBytes -= node.sizeOf()
+		self._liveObjects.pop(node, None)
+		self._weakObjects.pop(id(node), None)
+
+	def clear(self):
+		self._liveObjects.clear()
+		self._weakObjects.clear()
+		self.nodeCount = 0
+		self.nodeBytes = 0
+
+	def trim(self, maxLiveObjects: int = 0):
+		"""Drop the least recently used live objects so that at most `maxLiveObjects` remain."""
+		while len(self._liveObjects) > maxLiveObjects:
+			self._liveObjects.popitem(last=False)
+
+	def cache(self, node: TreeNode, obj: NVDAObject):
+		self._liveObjects[node] = obj
+		self._liveObjects.move_to_end(node)
+		try:
+			self._weakObjects[id(node)] = weakref.ref(obj)
+		except TypeError:
+			pass
+		self.trim(self.maxLiveObjects)
+
+	def getCached(self, node: TreeNode) -> NVDAObject | None:
+		obj = self._liveObjects.get(node)
+		if obj is not None:
+			self._liveObjects.move_to_end(node)
+			return obj
+		ref = self._weakObjects.get(id(node))
+		obj = ref() if ref else None
+		if obj is not None:
+			self.cache(node, obj)
+		return obj
+
+	def resolve(
+		self,
+		node: TreeNode,
+		getParentObject: Callable[[], NVDAObject | None],
+		simpleReviewMode: bool = False,
+	) -> NVDAObject | None:
+		"""Return the live object for `node`, finding it again among its parent's children if needed."""
+		obj = self.getCached(node)
+		if obj is not None:
+			return obj
+		parentObj = getParentObject()
+		if parentObj is None:
+			return None
+		self.resolveCount += 1
+		if not simpleReviewMode:
+			# `index` is the position among the children, not among the simple review mode ones.
+			obj = self._getChildAt(parentObj, node)
+			if obj is not None:
+				self.cache(node, obj)
+				return obj
+		# The children changed since the node was added: look for the key among all of them.
+		self.indexMisses += 1
+		fallback: NVDAObject | None = None
+		for index, child in enumerate(ObjectIterator(parentObj, "children", simpleReviewMode)):
+			if node.chainLength:
+				# The object is the end of a collapsed chain starting at `index`.
+				if index < node.index:
+					continue
+				child = self._followChain(child, node.chainLength, simpleReviewMode)
+				if child is not None and getObjectKey(child) == node.key:
+					fallback = child
+				break
+			if getObjectKey(child) != node.key:
+				continue
+			if index == node.index:
+				fallback = child
+				break
+			if fallback is None:
+				fallback = child
+		if fallback is not None:
+			self.cache(node, fallback)
+		return fallback
+
+	@staticmethod
+	def _followChain(obj: NVDAObject | None, chainLength: int, simpleReviewMode: bool) -> NVDAObject | None:
+		for _level in range(chainLength):
+			if obj is None:
+				break
+			obj = obj.simpleFirstChild if simpleReviewMode else obj.firstChild
+		return obj
+
+	def _getChildAt(self, parentObj: NVDAObject, node: TreeNode) -> NVDAObject | None:
+		"""Return the object of `node` if it is still at its recorded position, without scanning the children."""
+		try:
+			child = parentObj.getChild(node.index)
+		except Exception:
+			return None
+		child = self._followChain(child, node.chainLength, False)
+		if child is None or getObjectKey(child) != node.key:
+			return None
+		return child
+
+	@property
+	def liveObjectCount(self) -> int:
+		return len(self._liveObjects)
+
+	@property
+	def stats(self) -> dict[str, int]:
+		return {
+			"nodes": self.nodeCount,
+			"nodeBytes": self.nodeBytes,
+			"bytesPerNode": self.nodeBytes // self.nodeCount if self.nodeCount else 0,
+			"liveObjects": self.liveObjectCount,
+			"resolves": self.resolveCount,
+			"indexMisses": self.indexMisses,
+		}
@@ -0,0 +1,46 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+from collections.abc import Hashable
+
+from controlTypes import Role
+from NVDAObjects import NVDAObject
+
+
+def getObjectKey(obj: NVDAObject, role: Role | None = None) -> Hashable:
+	"""
+	Return a compact, hashable identity key for `obj`.
+	The key is best effort: it is stable for the same underlying accessible element
+	across NVDAObject instances, but windowless objects may share a key with their siblings.
+	`role` is the role of `obj` if the caller already fetched it.
+	"""
+	windowHandle: int = obj.windowHandle or 0
+	uniqueID = getattr(obj, "IA2UniqueID", None)
+	if uniqueID is not None:
+		return ("IA2", windowHandle, uniqueID)
+	childID = getattr(obj, "IAccessibleChildID", None)
+	if childID is not None:
+		return ("IA", windowHandle, childID)
+	element = getattr(obj, "UIAElement", None)
+	if element is not None:
+		try:
+			return ("UIA", windowHandle, tuple(element.getRuntimeId()))
+		except Exception:
+			pass
+	return ("obj", windowHandle, int(obj.role if role is None else role))
+
+
+def isUniqueKey(key: Hashable) -> bool:
+	"""
+	Whether `key` identifies a single object.
+	Windowless objects without an IA2 unique ID or a UIA runtime ID, which get an `("IA", hwnd, 0)`
+	or an `("obj", hwnd, role)` key, share their key with other objects of the same window.
+	"""
+	if not isinstance(key, tuple) or not key:
+		return False
+	kind = key[0]
+	if kind == "IA":
+		return key[2] != 0
+	return kind in ("IA2", "UIA")
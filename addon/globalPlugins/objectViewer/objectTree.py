@@ -3,13 +3,21 @@
 # See the file COPYING.txt for more details.
 # Copyright (C) 2024-2025 hwf1324 <1398969445@qq.com>
 
+from collections.abc import Hashable, Iterator
+
 import api
 import config
+import ui
 import wx
 from NVDAObjects import NVDAObject
 
+from .filters import ChildEnumerator, EnumeratedChild, NodeFilter
+from .hoverInspector import HoverInspector
 from .icon import createIconFromPath
+from .nodeStore import NodeStore, TreeNode
 from .NVDAObjectIterator import ObjectIterator
+from .pathResolver import KnownPath, ObjectPathResolver
+from .prefetch import ChildrenPrefetcher, PrefetchedChildren
 
 
 class NVDAObjectTree(wx.TreeCtrl):
@@ -22,79 +30,284 @@ class NVDAObjectTree(wx.TreeCtrl):
 	):
 		super().__init__(parent, *args, **kwargs)
 		self.simpleReviewMode = simpleReviewMode
+		self.pathResolver = ObjectPathResolver()
+		self.nodeStore = NodeStore()
+		self.prefetcher = ChildrenPrefetcher(self)
+		self.hoverInspector = HoverInspector(self)
 		rootNVDAObject: NVDAObject = api.getDesktopObject()
 		imageDPISize: int = int(16 * self.GetDPIScaleFactor())
 		il = wx.ImageList(imageDPISize, imageDPISize)
 		self.AssignImageList(il)
 		self.il = il
-		root: wx.TreeItemId = self.AddRoot(self.getObjectDisplayText(rootNVDAObject), data=rootNVDAObject)
+		# Image list indexes of the application icons, by application path.
+		self._iconIndexes: dict[str, int] = {}
+		# Keys of the objects highlighted as hot containers by the subtree statistics.
+		self.hotKeys: set[Hashable] = set()
+		rootNode = self.nodeStore.add(TreeNode.fromObject(rootNVDAObject, hasChildren=True), rootNVDAObject)
+		root: wx.TreeItemId = self.AddRoot(self.getNodeDisplayText(rootNode), data=rootNode)
 		self.SetItemHasChildren(root, True)
 
 		# self.Bind(wx.EVT_TREE_SEL_CHANGING, self.onSelectionChanging)
 		self.Bind(wx.EVT_TREE_ITEM_EXPANDING, self.onItemExpanding)
 		self.Bind(wx.EVT_TREE_ITEM_COLLAPSED, self.onItemCollapsed)
+		self.Bind(wx.EVT_TREE_DELETE_ITEM, self.onDeleteItem)
+		self.Bind(wx.EVT_TREE_ITEM_EXPANDED, self.onNavigation)
+		self.Bind(wx.EVT_TREE_SEL_CHANGED, self.onNavigation)
+		self.Bind(wx.EVT_KEY_DOWN, self.onNavigation)
+
+	def stopTimers(self):
+		"""Stop the work the tree does in the background, dropping the objects it holds for it."""
+		self.prefetcher.clear()
+		self.hoverInspector.disable()
+
+	def getItemObject(self, item: wx.TreeItemId) -> NVDAObject | None:
+		"""Return the live NVDA object of `item`, resolving it again if it is no longer cached."""
+		node: TreeNode = self.GetItemData(item)
+		parentItem: wx.TreeItemId = self.GetItemParent(item)
+		if not parentItem.IsOk():
+			obj = self.nodeStore.getCached(node)
+			if obj is None:
+				obj = api.getDesktopObject()
+				self.nodeStore.cache(node, obj)
+			return obj
+		return self.nodeStore.resolve(
+			node,
+			lambda: self.getItemObject(parentItem),
+			self.simpleReviewMode,
+		)
 
 	def addTreeNodes(self, parentItem: wx.TreeItemId):
-		parentObj: NVDAObject = self.GetItemData(parentItem)
+		if self.prefetcher.enabled:
+			prefetched = self.prefetcher.take(self.GetItemData(parentItem))
+			if prefetched is not None:
+				self._addTreeNodesFromPrefetch(parentItem, prefetched)
+				return
+		parentObj: NVDAObject | None = self.getItemObject(parentItem)
+		if parentObj is None:
+			return
+		enumerator = ChildEnumerator(NodeFilter.fromConfig(), self.simpleReviewMode)
 		if config.conf["objectViewer"]["addTreeNodesMode"] == "children":
-			self._addTreeNodesFromChildren(parentItem, parentObj)
+			self._addTreeNodesFromChildren(parentItem, parentObj, enumerator)
 		elif config.conf["objectViewer"]["addTreeNodesMode"] == "iterator":
-			self._addTreeNodesFromIterator(parentItem, parentObj)
+			self._addTreeNodesFromIterator(parentItem, parentObj, enumerator)
+		self.setHiddenCount(parentItem, enumerator.hidden)
 
-	def appendTreeItem(self, parentItem: wx.TreeItemId, obj: NVDAObject) -> wx.TreeItemId:
-		item = self.AppendItem(parentItem, self.getObjectDisplayText(obj), data=obj)
-		parentObj: NVDAObject = self.GetItemData(parentItem)
-		if obj.appModule.appPath and obj.appModule != parentObj.appModule:
-			icon = createIconFromPath(obj.appModule.appPath)
-			if icon:
-				self.SetItemImage(item, self.il.Add(icon), wx.TreeItemIcon_Normal)
+	def setHiddenCount(self, item: wx.TreeItemId, hidden: int):
+		text = self.getNodeDisplayText(self.GetItemData(item))
+		if hidden:
+			# Translators: Appended to a tree item when some of its children are hidden by the filters.
+			text += " " + _("({count} hidden)").format(count=hidden)
+		self.SetItemText(item, text)
 
+	def appendTreeItem(
+		self,
+		parentItem: wx.TreeItemId,
+		obj: NVDAObject,
+		index: int = 0,
+		hasChildren: bool | None = None,
+		chainLength: int = 0,
+	) -> wx.TreeItemId:
+		node = self.nodeStore.add(TreeNode.fromObject(obj, index, hasChildren, chainLength), obj)
+		parentNode: TreeNode = self.GetItemData(parentItem)
+		appPath = obj.appModule.appPath if node.processID != parentNode.processID else None
+		item = self.appendNodeItem(parentItem, node, appPath)
+		if self.hoverInspector.enabled:
+			self.hoverInspector.addItem(item, node, obj)
 		return item
 
-	def _addTreeNodesFromChildren(self, parentItem: wx.TreeItemId, parentObj: NVDAObject):
-		for obj in parentObj.children:
-			item: wx.TreeItemId = self.appendTreeItem(parentItem, obj)
-			if obj.firstChild:
-				self.SetItemHasChildren(item, True)
-			else:
-				self.SetItemHasChildren(item, False)
-
-	def _addTreeNodesFromIterator(self, parentItem: wx.TreeItemId, parentObj: NVDAObject):
-		for obj in ObjectIterator(parentObj, "children", self.simpleReviewMode):
-			item = self.appendTreeItem(parentItem, obj)
-			if obj.simpleFirstChild if self.simpleReviewMode else obj.firstChild:
-				self.SetItemHasChildren(item, True)
-			else:
-				self.SetItemHasChildren(item, False)
+	def appendNodeItem(self, parentItem: wx.TreeItemId, node: TreeNode, appPath: str | None) -> wx.TreeItemId:
+		item = self.AppendItem(parentItem, self.getNodeDisplayText(node), data=node)
+		if appPath:
+			imageIndex = self.getIconIndex(appPath)
+			if imageIndex is not None:
+				self.SetItemImage(item, imageIndex, wx.TreeItemIcon_Normal)
+		self.SetItemHasChildren(item, bool(node.childCountHint))
+		if node.key in self.hotKeys:
+			self.highlightItem(item)
+		if self.hoverInspector.enabled:
+			self.hoverInspector.onItemAppended(item, node)
+
+		return item
+
+	def highlightItem(self, item: wx.TreeItemId, highlight: bool = True):
+		self.SetItemBold(item, highlight)
+		self.SetItemBackgroundColour(item, wx.YELLOW if highlight else wx.NullColour)
+
+	def setHotKeys(self, keys: set[Hashable]):
+		"""Highlight the loaded and future items whose object key is in `keys`."""
+		self.hotKeys = keys
+		for item in self.iterLoadedItems(self.GetRootItem()):
+			self.highlightItem(item, self.GetItemData(item).key in keys)
+
+	def getIconIndex(self, appPath: str) -> int | None:
+		imageIndex = self._iconIndexes.get(appPath)
+		if imageIndex is None:
+			icon = createIconFromPath(appPath)
+			if not icon:
+				return None
+			imageIndex = self._iconIndexes[appPath] = self.il.Add(icon)
+		return imageIndex
+
+	def trimIcons(self, budget: int):
+		"""Keep at most `budget` application icons, those shown by the loaded items first."""
+		if self.il.GetImageCount() <= budget:
+			return
+		appPaths = {imageIndex: appPath for appPath, imageIndex in self._iconIndexes.items()}
+		items = list(self.iterLoadedItems(self.GetRootItem()))
+		# The new image index of each kept icon, by its current index.
+		kept: dict[int, int] = {}
+		bitmaps: list[wx.Bitmap] = []
+		for item in items:
+			imageIndex = self.GetItemImage(item)
+			if imageIndex >= 0 and imageIndex not in kept and len(kept) < budget:
+				kept[imageIndex] = len(bitmaps)
+				bitmaps.append(self.il.GetBitmap(imageIndex))
+		for item in items:
+			imageIndex = self.GetItemImage(item)
+			if imageIndex >= 0:
+				self.SetItemImage(item, kept.get(imageIndex, -1), wx.TreeItemIcon_Normal)
+		# Image list indexes can't be kept when removing icons, so the kept ones are added again.
+		self.il.RemoveAll()
+		for bitmap in bitmaps:
+			self.il.Add(bitmap)
+		self._iconIndexes = {appPaths[imageIndex]: newIndex for imageIndex, newIndex in kept.items()}
+
+	def _appendEnumeratedChild(self, parentItem: wx.TreeItemId, child: EnumeratedChild):
+		self.appendTreeItem(parentItem, child.obj, child.index, child.hasChildren, child.chainLength)
+
+	def _addTreeNodesFromChildren(
+		self,
+		parentItem: wx.TreeItemId,
+		parentObj: NVDAObject,
+		enumerator: ChildEnumerator,
+	):
+		children = ((obj, bool(obj.firstChild)) for obj in parentObj.children)
+		for child in enumerator.enumerate(children):
+			self._appendEnumeratedChild(parentItem, child)
+
+	def _addTreeNodesFromIterator(
+		self,
+		parentItem: wx.TreeItemId,
+		parentObj: NVDAObject,
+		enumerator: ChildEnumerator,
+	):
+		children = (
+			(obj, bool(obj.simpleFirstChild if self.simpleReviewMode else obj.firstChild))
+			for obj in ObjectIterator(parentObj, "children", self.simpleReviewMode)
+		)
+		for child in enumerator.enumerate(children):
+			self._appendEnumeratedChild(parentItem, child)
+
+	def _addTreeNodesFromPrefetch(self, parentItem: wx.TreeItemId, prefetched: PrefetchedChildren):
+		for child in prefetched.children:
+			self.appendNodeItem(parentItem, self.nodeStore.add(child.node, child.obj), child.appPath)
+		self.setHiddenCount(parentItem, prefetched.hidden)
 
 	def getObjectDisplayText(self, obj: NVDAObject) -> str:
 		return f'{obj.role.displayString} "{obj.name}"'
 
-	def selectObject(self, obj: NVDAObject = api.getNavigatorObject()):
-		config.conf["objectViewer"]["addTreeNodesMode"] = "iterator"
+	def getNodeDisplayText(self, node: TreeNode) -> str:
+		text = f'{node.role.displayString} "{node.name}"'
+		if node.chainLength:
+			# Single-child ancestors collapsed into this item.
+			text = f"{'… ' * min(node.chainLength, 3)}{text}"
+		return text
+
+	def iterLoadedItems(self, item: wx.TreeItemId) -> Iterator[wx.TreeItemId]:
+		"""Iterate over `item` and all of its descendants that are currently loaded in the tree."""
+		stack: list[wx.TreeItemId] = [item] if item.IsOk() else []
+		while stack:
+			item = stack.pop()
+			yield item
+			child, cookie = self.GetFirstChild(item)
+			while child.IsOk():
+				stack.append(child)
+				child, cookie = self.GetNextChild(item, cookie)
+
+	def getLoadedSubtreeKeys(self, item: wx.TreeItemId) -> set[Hashable]:
+		"""Return the keys of `item` and all of its descendants that are currently loaded in the tree."""
+		return {self.GetItemData(item).key for item in self.iterLoadedItems(item)}
+
+	def trimToSelection(self):
+		"""Collapse, and so unload, every branch that is not on the path to the selected item."""
+		selection: wx.TreeItemId = self.GetSelection()
+		if not selection.IsOk():
+			self.CollapseAll()
+			return
+		path: list[wx.TreeItemId] = []
+		item = selection
+		while item.IsOk():
+			path.append(item)
+			item = self.GetItemParent(item)
+		self.Freeze()
+		for parentItem in path:
+			child, cookie = self.GetFirstChild(parentItem)
+			while child.IsOk():
+				if child not in path and self.IsExpanded(child):
+					self.Collapse(child)
+				child, cookie = self.GetNextChild(parentItem, cookie)
+		self.Thaw()
+
+	def getItemObjectPath(self, item: wx.TreeItemId) -> KnownPath:
+		"""Return the objects of the items from the root down to `item`, with their keys."""
+		path = KnownPath([], [])
+		while item.IsOk():
+			obj = self.getItemObject(item)
+			if obj is None:
+				return KnownPath([], [])
+			path.objects.append(obj)
+			path.keys.append(self.GetItemData(item).key)
+			item = self.GetItemParent(item)
+		path.objects.reverse()
+		path.keys.reverse()
+		return path
+
+	def itemMatchesObject(self, item: wx.TreeItemId, obj: NVDAObject, key: Hashable) -> bool:
+		# Compare the cheap keys first, and only resolve the live object when they match.
+		if self.GetItemData(item).key != key:
+			return False
+		return obj == self.getItemObject(item)
+
+	def selectObject(
+		self,
+		obj: NVDAObject = api.getNavigatorObject(),
+		collapse: bool = True,
+		speak: bool = True,
+	):
+		"""
+		Select `obj`, or its closest ancestor shown in the tree.
+		:param speak: When False, as for selections the user did not ask for, nothing is reported
+			and the way tree nodes are added is left as is.
+		"""
+		if speak:
+			config.conf["objectViewer"]["addTreeNodesMode"] = "iterator"
 		parentItem: wx.TreeItemId = self.GetRootItem()
-		self.CollapseAll()
-		item: wx.TreeItemId = None
-		cookie = None
-		objLine = [obj for obj in ObjectIterator(obj, "parent", self.simpleReviewMode)]
-		objLine.reverse()
-
-		for obj in objLine:
-			if obj == self.GetItemData(parentItem):
-				self.Expand(parentItem)
-				item, cookie = self.GetFirstChild(parentItem)
+		selection: wx.TreeItemId = self.GetSelection()
+		treePath = self.getItemObjectPath(selection) if selection.IsOk() else KnownPath([], [])
+		if collapse:
+			self.CollapseAll()
+		objLine = self.pathResolver.resolvePath(obj, self.simpleReviewMode, (treePath,))
+
+		found = False
+		for obj, key in zip(*objLine):
+			if self.itemMatchesObject(parentItem, obj, key):
+				found = True
 				continue
-			while item.IsOk():
-				if obj == self.GetItemData(item):
-					if obj == objLine[-1]:
-						self.EnsureVisible(item)
-						self.SelectItem(item)
-						break
-					self.Expand(item)
-					parentItem = item
-					item, cookie = self.GetFirstChild(parentItem)
-					break
+			self.Expand(parentItem)
+			item, cookie = self.GetFirstChild(parentItem)
+			while item.IsOk() and not self.itemMatchesObject(item, obj, key):
 				item, cookie = self.GetNextChild(parentItem, cookie)
+			# An ancestor which is not found was hidden by the filters or collapsed into a chain,
+			# so its descendants are looked for at the same level.
+			found = item.IsOk()
+			if found:
+				parentItem = item
+		if parentItem != self.GetRootItem():
+			self.EnsureVisible(parentItem)
+			self.SelectItem(parentItem)
+		if not found and speak:
+			# Translators: Reported when the object to select in the Object Viewer is not shown in the tree.
+			ui.message(_("Object not shown in the tree, its closest shown ancestor is selected"))
 
 	def onSelectionChanging(self, event: wx.TreeEvent):
 		if not self.GetItemData(event.GetItem()):
@@ -112,3 +325,16 @@ class NVDAObjectTree(wx.TreeCtrl):
 		self.DeleteChildren(event.GetItem())
 		self.Thaw()
 		event.Skip()
+
+	def onNavigation(self, event: wx.Event):
+		self.prefetcher.onNavigation()
+		event.Skip()
+
+	def onDeleteItem(self, event: wx.TreeEvent):
+		node: TreeNode | None = self.GetItemData(event.GetItem())
+		if node:
+			self.nodeStore.release(node)
+			self.prefetcher.onItemDeleted()
+			if self.hoverInspector.enabled:
+				self.hoverInspector.removeNode(node)
+		event.Skip()
@@ -0,0 +1,138 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+from collections import deque
+from collections.abc import Hashable, Iterable
+from typing import NamedTuple
+
+import api
+from NVDAObjects import NVDAObject
+
+from .objectKey import getObjectKey, isUniqueKey
+
+
+class KnownPath(NamedTuple):
+	"""A chain of objects from the root down, with the key of each object."""
+
+	objects: list[NVDAObject]
+	keys: list[Hashable]
+
+	@classmethod
+	def fromObjects(cls, objects: list[NVDAObject]) -> "KnownPath":
+		return cls(objects, [getObjectKey(obj) for obj in objects])
+
+
+class ObjectPathResolver:
+	"""
+	Resolves the chain of ancestors of an NVDA object, from the root down to the object itself.
+	Chains that are already known (NVDA's focus ancestors, the path loaded in the tree,
+	previously resolved paths) are reused, so `parent` is only queried for the unknown suffix.
+	Objects are matched against the known chains by key, so that they are only compared
+	to the objects sharing their key. The keys of the focus ancestors are computed once per focus change.
+	"""
+
+	MAX_KNOWN_PATHS = 8
+
+	def __init__(self):
+		self._knownPaths: deque[KnownPath] = deque(maxlen=self.MAX_KNOWN_PATHS)
+		self._focusPath: KnownPath | None = None
+		self.resolveCount = 0
+		self.parentCalls = 0
+		self.parentCallsSaved = 0
+		self.objectComparisons = 0
+		# Keys cost cross-process calls as parent calls do.
+		self.keyComputations = 0
+
+	def remember(self, path: KnownPath):
+		if path.objects:
+			self._knownPaths.appendleft(path)
+
+	def forget(self):
+		self._knownPaths.clear()
+		self._focusPath = None
+
+	def _getFocusPath(self) -> KnownPath:
+		focus = api.getFocusObject()
+		if self._focusPath is None or self._focusPath.objects[-1] is not focus:
+			objects = api.getFocusAncestors() + [focus]
+			self.keyComputations += len(objects)
+			self._focusPath = KnownPath.fromObjects(objects)
+		return self._focusPath
+
+	def _candidatePaths(self, simpleReviewMode: bool, extraPaths: Iterable[KnownPath]) -> list[KnownPath]:
+		paths = [path for path in extraPaths if path.objects]
+		if not simpleReviewMode:
+			# Focus ancestors follow the normal `parent` relation, not the simple review one.
+			paths.insert(0, self._getFocusPath())
+		paths.extend(self._knownPaths)
+		return paths
+
+	@staticmethod
+	def _indexByKey(paths: list[KnownPath]) -> dict[Hashable, list[tuple[KnownPath, int]]]:
+		"""Index the objects of the paths by key, the first paths and the deepest objects first."""
+		index: dict[Hashable, list[tuple[KnownPath, int]]] = {}
+		for path in paths:
+			for position in range(len(path.keys) - 1, -1, -1):
+				index.setdefault(path.keys[position], []).append((path, position))
+		return index
+
+	def resolve(
+		self,
+		obj: NVDAObject,
+		simpleReviewMode: bool = False,
+		extraPaths: Iterable[KnownPath] = (),
+	) -> list[NVDAObject]:
+		"""Return the ancestors of `obj` starting from the root, with `obj` as the last item."""
+		return self.resolvePath(obj, simpleReviewMode, extraPaths).objects
+
+	def resolvePath(
+		self,
+		obj: NVDAObject,
+		simpleReviewMode: bool = False,
+		extraPaths: Iterable[KnownPath] = (),
+	) -> KnownPath:
+		"""Like `resolve`, also returning the keys of the objects."""
+		self.resolveCount += 1
+		candidates = self._indexByKey(self._candidatePaths(simpleReviewMode, extraPaths))
+		suffix: list[NVDAObject] = []
+		suffixKeys: list[Hashable] = []
+		current: NVDAObject | None = obj
+		# Walk up by hand rather than with ObjectIterator, which fetches the parent before
+		# the current object could be matched against the known paths.
+		while current is not None:
+			key = getObjectKey(current)
+			self.keyComputations += 1
+			for path, position in candidates.get(key, ()):
+				if not isUniqueKey(key):
+					# Other objects share the key, so only the objects themselves can tell.
+					self.objectComparisons += 1
+					if path.objects[position] != current:
+						continue
+				# Walking up from `current` would have taken one parent call per ancestor,
+				# plus the one returning None at the root.
+				self.parentCallsSaved += position + 1
+				resolved = KnownPath(
+					path.objects[:position] + [current] + suffix[::-1],
+					path.keys[:position] + [key] + suffixKeys[::-1],
+				)
+				self.remember(resolved)
+				return resolved
+			suffix.append(current)
+			suffixKeys.append(key)
+			current = current.simpleParent if simpleReviewMode else current.parent
+			self.parentCalls += 1
+		resolved = KnownPath(suffix[::-1], suffixKeys[::-1])
+		self.remember(resolved)
+		return resolved
+
+	@property
+	def stats(self) -> dict[str, int]:
+		return {
+			"pathResolves": self.resolveCount,
+			"parentCalls": self.parentCalls,
+			"parentCallsSaved": self.parentCallsSaved,
+			"objectComparisons": self.objectComparisons,
+			"keyComputations": self.keyComputations,
+		}
@@ -0,0 +1,235 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+import time
+from collections import OrderedDict, deque
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, NamedTuple
+
+import config
+import wx
+from logHandler import log
+from NVDAObjects import NVDAObject
+
+from .filters import ChildEnumerator, NodeFilter
+from .nodeStore import TreeNode
+from .NVDAObjectIterator import ObjectIterator
+
+if TYPE_CHECKING:
+	from .objectTree import NVDAObjectTree
+
+
+class PrefetchedChild(NamedTuple):
+	node: TreeNode
+	obj: NVDAObject
+	# Only set when the child belongs to another application than its parent, to show its icon.
+	appPath: str | None
+
+
+class PrefetchedChildren(NamedTuple):
+	children: list[PrefetchedChild]
+	# The number of children hidden by the filters.
+	hidden: int
+
+
+class _Target(NamedTuple):
+	node: TreeNode
+	# Resolved from `item` when the target is reached, for the items of the tree.
+	obj: NVDAObject | None
+	depth: int
+	item: wx.TreeItemId | None = None
+
+
+class _Run:
+	"""The prefetch of the children of one target, which may span several ticks."""
+
+	__slots__ = ("target", "enumerator", "pending", "children")
+
+	def __init__(
+		self, target: _Target, obj: NVDAObject, nodeFilter: NodeFilter, mode: str, simpleReviewMode: bool
+	):
+		self.target = target
+		self.enumerator = ChildEnumerator(nodeFilter, simpleReviewMode)
+		self.pending = self.enumerator.enumerate(iterChildren(obj, mode, simpleReviewMode))
+		self.children: list[PrefetchedChild] = []
+
+
+def iterChildren(
+	obj: NVDAObject,
+	addTreeNodesMode: str,
+	simpleReviewMode: bool,
+) -> Iterator[tuple[NVDAObject, bool]]:
+	"""Yield the children of `obj` with whether they have children, as the tree would add them."""
+	if addTreeNodesMode == "children":
+		for child in obj.children:
+			yield child, bool(child.firstChild)
+	else:
+		for child in ObjectIterator(obj, "children", simpleReviewMode):
+			yield child, bool(child.simpleFirstChild if simpleReviewMode else child.firstChild)
+
+
+class ChildrenPrefetcher:
+	"""
+	Fetches the children of the selected and visible expandable tree items while the user is idle,
+	so that expanding them renders from the prefetch store instead of walking the objects again.
+	Work is done on the main thread in short slices, since NVDA objects must not be used from other threads.
+	"""
+
+	TICK_INTERVAL = 50
+	# Time spent prefetching per tick, in seconds.
+	SLICE_DURATION = 0.02
+	# Seconds without navigation before prefetching resumes.
+	PAUSE_AFTER_NAVIGATION = 0.4
+	# Seconds after which prefetched children are considered stale.
+	MAX_AGE = 10.0
+	MAX_ENTRIES = 256
+
+	def __init__(self, tree: "NVDAObjectTree"):
+		self.tree = tree
+		self._store: OrderedDict[TreeNode, tuple[float, PrefetchedChildren]] = OrderedDict()
+		self._nodeFilter = NodeFilter()
+		self._targets: deque[_Target] = deque()
+		self._run: _Run | None = None
+		self._lastNavigation = 0.0
+		self._nodesLeft = 0
+		self.hits = 0
+		self.misses = 0
+		self.timer = wx.Timer(tree)
+		tree.Bind(wx.EVT_TIMER, self.onTick, self.timer)
+
+	@property
+	def enabled(self) -> bool:
+		return config.conf["objectViewer"]["prefetch"]
+
+	@property
+	def hitRate(self) -> float:
+		total = self.hits + self.misses
+		return self.hits / total if total else 0.0
+
+	def take(self, node: TreeNode) -> PrefetchedChildren | None:
+		"""Return and forget the prefetched children of `node`, counting a hit or a miss."""
+		entry = self._store.pop(node, None)
+		if entry is None or time.monotonic() - entry[0] > self.MAX_AGE:
+			self.misses += 1
+			return None
+		self.hits += 1
+		return entry[1]
+
+	def clear(self):
+		self._store.clear()
+		self._stop()
+
+	def _stop(self):
+		self._targets.clear()
+		self._run = None
+		self.timer.Stop()
+
+	def onNavigation(self):
+		"""Pause prefetching while the user navigates and retarget it once they stop."""
+		self._lastNavigation = time.monotonic()
+		self._targets.clear()
+		self._run = None
+		if self.enabled and not self.timer.IsRunning():
+			self.timer.Start(self.TICK_INTERVAL)
+
+	def onItemDeleted(self):
+		"""Forget the targets, which may refer to the deleted tree item."""
+		self._targets.clear()
+
+	def _collectTargets(self):
+		tree = self.tree
+		depth: int = config.conf["objectViewer"]["prefetchDepth"]
+		items: list[wx.TreeItemId] = []
+		selection: wx.TreeItemId = tree.GetSelection()
+		if selection.IsOk():
+			items.append(selection)
+		item: wx.TreeItemId = tree.GetFirstVisibleItem()
+		while item.IsOk() and tree.IsVisible(item):
+			items.append(item)
+			item = tree.GetNextVisible(item)
+		for item in items:
+			node: TreeNode = tree.GetItemData(item)
+			if not node.childCountHint or tree.IsExpanded(item) or node in self._store:
+				continue
+			# The object is resolved when the target is reached, within the time slice of a tick.
+			self._targets.append(_Target(node, None, depth, item))
+		self._nodesLeft = config.conf["objectViewer"]["prefetchNodeBudget"]
+		self._nodeFilter = NodeFilter.fromConfig()
+		# Release the objects of the entries which would not be used anymore.
+		expired = time.monotonic() - self.MAX_AGE
+		for node in [node for node, (fetched, _children) in self._store.items() if fetched < expired]:
+			del self._store[node]
+
+	def _nextRun(self) -> _Run | None:
+		while self._targets:
+			target = self._targets.popleft()
+			obj = target.obj if target.item is None else self.tree.getItemObject(target.item)
+			if obj is not None:
+				mode: str = config.conf["objectViewer"]["addTreeNodesMode"]
+				return _Run(target, obj, self._nodeFilter, mode, self.tree.simpleReviewMode)
+		return None
+
+	def onTick(self, event: wx.TimerEvent):
+		if not self.enabled:
+			self.timer.Stop()
+			return
+		now = time.monotonic()
+		if now - self._lastNavigation < self.PAUSE_AFTER_NAVIGATION:
+			return
+		if self._run is None and not self._targets:
+			self._collectTargets()
+		deadline = now + self.SLICE_DURATION
+		while time.monotonic() < deadline:
+			if self._run is None:
+				self._run = self._nextRun()
+				if self._run is None:
+					self.timer.Stop()
+					return
+			if not self._prefetch(self._run, deadline):
+				# The target application is busy or the budget is spent: wait for the next navigation.
+				self._stop()
+				return
+
+	def _prefetch(self, run: _Run, deadline: float) -> bool:
+		"""
+		Fetch the children of the target of `run` until all of them are fetched or `deadline` is reached,
+		the next tick resuming from there. Returns False when prefetching should stop.
+		"""
+		threshold: float = config.conf["objectViewer"]["prefetchLatencyThreshold"] / 1000
+		target = run.target
+		start = time.monotonic()
+		for child, index, hasChildren, chainLength in run.pending:
+			node = TreeNode.fromObject(child, index, hasChildren, chainLength)
+			appPath = child.appModule.appPath if node.processID != target.node.processID else None
+			run.children.append(PrefetchedChild(node, child, appPath))
+			if self.tree.hoverInspector.enabled:
+				self.tree.hoverInspector.addPrefetched(target.node, node, child)
+			if target.depth > 1 and hasChildren:
+				self._targets.append(_Target(node, child, target.depth - 1))
+			self._nodesLeft -= 1
+			end = time.monotonic()
+			if end - start > threshold:
+				log.debug(f"Object Viewer prefetch stopped, {end - start:.3f}s for one object")
+				return False
+			if self._nodesLeft <= 0:
+				# The children fetched so far are dropped, since the tree can't show only some of them.
+				return False
+			if end >= deadline:
+				return True
+			start = end
+		self._run = None
+		self._store[target.node] = (time.monotonic(), PrefetchedChildren(run.children, run.enumerator.hidden))
+		while len(self._store) > self.MAX_ENTRIES:
+			self._store.popitem(last=False)
+		return True
+
+	@property
+	def stats(self) -> dict[str, object]:
+		return {
+			"prefetchHits": self.hits,
+			"prefetchMisses": self.misses,
+			"prefetchHitRate": f"{self.hitRate:.0%}",
+			"prefetchedParents": len(self._store),
+		}
@@ -0,0 +1,252 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+"""Lazy queries over the NVDA object tree, available as `ov` in the Object Viewer shell."""
+
+import re
+from collections.abc import Callable, Collection, Hashable, Iterable, Iterator
+from itertools import islice
+
+from controlTypes import Role, State
+from NVDAObjects import NVDAObject
+
+from .NVDAObjectIterator import ObjectIterator
+from .objectKey import getObjectKey, isUniqueKey
+
+RoleSpec = Role | str | Collection[Role | str] | None
+NameSpec = str | re.Pattern[str] | None
+StatesSpec = Collection[State | str] | None
+
+
+def _toRole(role: Role | str) -> Role:
+	if isinstance(role, Role):
+		return role
+	try:
+		return Role[role.upper()]
+	except KeyError:
+		raise ValueError(f"Unknown role: {role!r}") from None
+
+
+def _toState(state: State | str) -> State:
+	if isinstance(state, State):
+		return state
+	try:
+		return State[state.upper()]
+	except KeyError:
+		raise ValueError(f"Unknown state: {state!r}") from None
+
+
+def _roleSet(role: RoleSpec) -> frozenset[Role] | None:
+	if role is None:
+		return None
+	if isinstance(role, (Role, str)):
+		return frozenset((_toRole(role),))
+	return frozenset(_toRole(r) for r in role)
+
+
+def makeMatcher(
+	role: RoleSpec = None,
+	name: NameSpec = None,
+	states: StatesSpec = None,
+	predicate: Callable[[NVDAObject], bool] | None = None,
+) -> Callable[[NVDAObject, Role], bool]:
+	"""
+	Build a match function taking the object and its already fetched role.
+	Criteria are checked from the cheapest to the most expensive, so `name` and `states`
+	are only fetched for objects with a matching role.
+	:param name: A regular expression searched in the name; "" only matches empty names.
+	"""
+	roles = _roleSet(role)
+	namePattern: re.Pattern[str] | None = None
+	matchEmptyName = False
+	if isinstance(name, str):
+		if name == "":
+			matchEmptyName = True
+		else:
+			namePattern = re.compile(name)
+	elif name is not None:
+		namePattern = name
+	requiredStates = frozenset(_toState(s) for s in states) if states else None
+
+	def matches(obj: NVDAObject, objRole: Role) -> bool:
+		if roles is not None and objRole not in roles:
+			return False
+		if matchEmptyName or namePattern is not None:
+			objName = obj.name or ""
+			if matchEmptyName and objName:
+				return False
+			if namePattern is not None and not namePattern.search(objName):
+				return False
+		if requiredStates is not None and not requiredStates <= obj.states:
+			return False
+		return predicate is None or predicate(obj)
+
+	return matches
+
+
+def _walk(
+	root: NVDAObject,
+	matches: Callable[[NVDAObject, Role], bool],
+	maxDepth: int | None,
+	prune: Callable[[NVDAObject, Role], bool] | None,
+	simpleReviewMode: bool,
+) -> Iterator[NVDAObject]:
+	"""Depth first search below `root`, which itself is not matched."""
+	if maxDepth is not None and maxDepth < 1:
+		return
+	stack: list[tuple[Iterator[NVDAObject], int]] = [(ObjectIterator(root, "children", simpleReviewMode), 1)]
+	while stack:
+		children, childDepth = stack[-1]
+		obj = next(children, None)
+		if obj is None:
+			stack.pop()
+			continue
+		role = obj.role
+		if matches(obj, role):
+			yield obj
+		if prune is not None and prune(obj, role):
+			continue
+		if maxDepth is None or childDepth < maxDepth:
+			stack.append((ObjectIterator(obj, "children", simpleReviewMode), childDepth + 1))
+
+
+def find(
+	root: NVDAObject,
+	role: RoleSpec = None,
+	name: NameSpec = None,
+	states: StatesSpec = None,
+	maxDepth: int | None = None,
+	*,
+	predicate: Callable[[NVDAObject], bool] | None = None,
+	prune: Callable[[NVDAObject, Role], bool] | None = None,
+	pruneRoles: RoleSpec = None,
+	limit: int | None = None,
+	simpleReviewMode: bool = False,
+) -> Iterator[NVDAObject]:
+	"""
+	Lazily yield the descendants of `root` matching all the given criteria.
+	:param maxDepth: Do not look deeper than this many levels below `root`.
+	:param prune: Called with each object and its role; when it returns True, the object's
+		descendants are skipped.
+	:param pruneRoles: Roles whose descendants are skipped.
+	:param limit: Stop after this many results.
+	"""
+	matches = makeMatcher(role, name, states, predicate)
+	prunedRoles = _roleSet(pruneRoles)
+	if prunedRoles is not None:
+		userPrune = prune
+
+		def pruneByRole(obj: NVDAObject, objRole: Role) -> bool:
+			return objRole in prunedRoles or (userPrune is not None and userPrune(obj, objRole))
+
+		prune = pruneByRole
+	results = _walk(root, matches, maxDepth, prune, simpleReviewMode)
+	return islice(results, limit) if limit is not None else results
+
+
+def findFirst(root: NVDAObject, *args, **kwargs) -> NVDAObject | None:
+	return next(find(root, *args, limit=1, **kwargs), None)
+
+
+_STEP_RE = re.compile(r"(?P<axis>//?)(?P<role>\*|\w+)(?P<predicates>(?:\[[^\]]*\])*)")
+_PREDICATE_RE = re.compile(
+	r"\[\s*(?:(?P<index>\d+)|"
+	r"(?P<attr>name|state)\s*(?P<op>~=|=)\s*(?P<quote>['\"]?)(?P<value>.*?)(?P=quote))\s*\]"
+)
+
+
+class PathStep:
+	__slots__ = ("descendant", "matches", "index")
+
+	def __init__(self, descendant: bool, matches: Callable[[NVDAObject, Role], bool], index: int | None):
+		self.descendant = descendant
+		self.matches = matches
+		self.index = index
+
+
+def parsePath(path: str) -> list[PathStep]:
+	"""
+	Parse a small XPath-like syntax: steps separated by "/" (children) or "//" (descendants),
+	each being a role name or "*" followed by optional predicates:
+	[name='exact'], [name~='regular expression'], [state=focused], or a 1-based index [2].
+	"""
+	if not path.startswith("/"):
+		path = "/" + path
+	steps: list[PathStep] = []
+	position = 0
+	while position < len(path):
+		stepMatch = _STEP_RE.match(path, position)
+		if not stepMatch:
+			raise ValueError(f"Invalid path at position {position}: {path!r}")
+		position = stepMatch.end()
+		role = None if stepMatch["role"] == "*" else stepMatch["role"]
+		name: NameSpec = None
+		states: set[str] = set()
+		index: int | None = None
+		predicates = stepMatch["predicates"]
+		predicatePosition = 0
+		while predicatePosition < len(predicates):
+			predicate = _PREDICATE_RE.match(predicates, predicatePosition)
+			if not predicate:
+				position = stepMatch.start("predicates") + predicatePosition
+				raise ValueError(f"Invalid predicate at position {position}: {path!r}")
+			predicatePosition = predicate.end()
+			if predicate["index"]:
+				index = int(predicate["index"])
+			elif predicate["attr"] == "state":
+				states.add(predicate["value"])
+			elif predicate["op"] == "~=":
+				name = re.compile(predicate["value"])
+			else:
+				name = re.compile(f"^{re.escape(predicate['value'])}$")
+		steps.append(PathStep(stepMatch["axis"] == "//", makeMatcher(role, name, states or None), index))
+	return steps
+
+
+def path(root: NVDAObject, path: str, simpleReviewMode: bool = False) -> Iterator[NVDAObject]:
+	"""Lazily yield the objects below `root` matching the XPath-like `path`, see `parsePath`."""
+	results: Iterable[NVDAObject] = (root,)
+	for stepIndex, step in enumerate(parsePath(path)):
+		results = _applyStep(results, step, simpleReviewMode)
+		if step.descendant and stepIndex > 0:
+			# Contexts nested in one another find the same descendants.
+			results = _unique(results)
+	return iter(results)
+
+
+def _unique(objects: Iterable[NVDAObject]) -> Iterator[NVDAObject]:
+	"""Skip the objects already yielded, only comparing objects which share a key."""
+	seen: dict[Hashable, list[NVDAObject]] = {}
+	for obj in objects:
+		key = getObjectKey(obj)
+		sameKey = seen.setdefault(key, [])
+		if isUniqueKey(key) and sameKey:
+			continue
+		if any(other is obj or other == obj for other in sameKey):
+			continue
+		sameKey.append(obj)
+		yield obj
+
+
+def _applyStep(
+	contexts: Iterable[NVDAObject],
+	step: PathStep,
+	simpleReviewMode: bool,
+) -> Iterator[NVDAObject]:
+	for context in contexts:
+		found = _walk(context, step.matches, None if step.descendant else 1, None, simpleReviewMode)
+		if step.index is not None:
+			obj = next(islice(found, step.index - 1, None), None)
+			if obj is not None:
+				yield obj
+		else:
+			yield from found
+
+
+def select(obj: NVDAObject):
+	"""Select `obj` in the Object Viewer tree."""
+	from . import ObjectViewerTool
+
+	ObjectViewerTool().show(selectObj=obj)
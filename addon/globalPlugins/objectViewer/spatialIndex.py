@@ -0,0 +1,126 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+from collections.abc import Hashable
+from typing import Generic, NamedTuple, TypeVar
+
+EntryKey = TypeVar("EntryKey", bound=Hashable)
+
+
+class Entry(NamedTuple):
+	left: int
+	top: int
+	right: int
+	bottom: int
+	depth: int
+	# The top-level window of the rectangle, 0 if unknown.
+	window: int
+	# Cells covered by the rectangle, to remove it without recomputing them.
+	cells: tuple[tuple[int, int], ...]
+
+
+# A rectangle as stored in a cell: minus its depth and its area first, so that sorting a cell
+# puts the deepest, then smallest, rectangles first.
+CellItem = tuple[int, int, int, int, int, int, int, EntryKey]
+
+
+def _rank(item: CellItem) -> tuple[int, int]:
+	return item[0], item[1]
+
+
+class GridIndex(Generic[EntryKey]):
+	"""
+	A uniform grid over screen rectangles, answering which deepest rectangle contains a point.
+	Each rectangle is registered in every cell it overlaps, and cells are kept sorted from the deepest
+	rectangle, so a lookup stops at the first rectangle of one cell containing the point.
+	Depths are only comparable within a top-level window, so a query can be restricted to the rectangles
+	of the window on top at the point, which hides the windows below it.
+	"""
+
+	def __init__(self, cellSize: int = 32, bounds: tuple[int, int, int, int] | None = None):
+		self.cellSize = cellSize
+		# The left, top, right and bottom of the screen: rectangles are only registered in the cells within.
+		self.bounds = bounds
+		self._entries: dict[EntryKey, Entry] = {}
+		self._cells: dict[tuple[int, int], list[CellItem]] = {}
+		# Cells which have to be sorted again before being queried.
+		self._unsortedCells: set[tuple[int, int]] = set()
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def __contains__(self, key: EntryKey) -> bool:
+		return key in self._entries
+
+	def clear(self):
+		self._entries.clear()
+		self._cells.clear()
+		self._unsortedCells.clear()
+
+	def _coverCells(self, left: int, top: int, right: int, bottom: int) -> tuple[tuple[int, int], ...]:
+		if self.bounds is not None:
+			# Parts outside the screen can't be pointed at, e.g. of huge virtual documents.
+			boundsLeft, boundsTop, boundsRight, boundsBottom = self.bounds
+			left, top = max(left, boundsLeft), max(top, boundsTop)
+			right, bottom = min(right, boundsRight), min(bottom, boundsBottom)
+			if left >= right or top >= bottom:
+				return ()
+		size = self.cellSize
+		firstX, lastX = left // size, (right - 1) // size
+		firstY, lastY = top // size, (bottom - 1) // size
+		return tuple((x, y) for x in range(firstX, lastX + 1) for y in range(firstY, lastY + 1))
+
+	def insert(
+		self,
+		key: EntryKey,
+		left: int,
+		top: int,
+		width: int,
+		height: int,
+		depth: int,
+		window: int = 0,
+	):
+		"""Add or move the rectangle of `key`. Empty rectangles are removed from the index."""
+		self.remove(key)
+		if width <= 0 or height <= 0:
+			return
+		right, bottom = left + width, top + height
+		cells = self._coverCells(left, top, right, bottom)
+		self._entries[key] = Entry(left, top, right, bottom, depth, window, cells)
+		item: CellItem = (-depth, width * height, left, top, right, bottom, window, key)
+		for cell in cells:
+			self._cells.setdefault(cell, []).append(item)
+		self._unsortedCells.update(cells)
+
+	def remove(self, key: EntryKey):
+		entry = self._entries.pop(key, None)
+		if entry is None:
+			return
+		for cell in entry.cells:
+			items = self._cells[cell]
+			for index, item in enumerate(items):
+				if item[7] is key or item[7] == key:
+					del items[index]
+					break
+			if not items:
+				del self._cells[cell]
+				self._unsortedCells.discard(cell)
+
+	def query(self, x: int, y: int, topWindow: int | None = None) -> EntryKey | None:
+		"""
+		Return the deepest, then smallest, rectangle containing the point, if any.
+		If `topWindow` is given, only rectangles of that window or of an unknown window are considered.
+		"""
+		cell = (x // self.cellSize, y // self.cellSize)
+		items = self._cells.get(cell)
+		if not items:
+			return None
+		if cell in self._unsortedCells:
+			items.sort(key=_rank)
+			self._unsortedCells.discard(cell)
+		for _depth, _area, left, top, right, bottom, window, key in items:
+			if left <= x < right and top <= y < bottom and (topWindow is None or window in (0, topWindow)):
+				return key
+		return None
@@ -0,0 +1,325 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+import heapq
+import itertools
+import time
+from collections import Counter
+from collections.abc import Hashable, Iterator
+from typing import NamedTuple
+
+from logHandler import log
+from NVDAObjects import NVDAObject
+
+from .NVDAObjectIterator import ObjectIterator
+from .objectKey import getObjectKey
+
+# The number of widest containers kept in the statistics.
+WIDEST_CONTAINERS = 10
+_tieBreaker = itertools.count()
+
+
+class Container(NamedTuple):
+	childCount: int
+	label: str
+	key: Hashable
+
+
+class SubtreeStatistics:
+	def __init__(self, label: str = "", key: Hashable = None):
+		# The top-level child the statistics were collected for, if any.
+		self.label = label
+		self.key = key
+		self.nodeCount = 0
+		self.maxDepth = 0
+		self.roleCounts: Counter[str] = Counter()
+		self.appCounts: Counter[str] = Counter()
+		# A min-heap of (child count, tie breaker, container), so containers themselves are never compared.
+		self._widest: list[tuple[int, int, Container]] = []
+		self.enumerationTime = 0.0
+		self.errors = 0
+
+	@property
+	def widest(self) -> list[Container]:
+		"""The widest containers, widest first."""
+		return [entry[2] for entry in sorted(self._widest, reverse=True)]
+
+	def addContainer(self, container: Container):
+		entry = (container.childCount, next(_tieBreaker), container)
+		if len(self._widest) < WIDEST_CONTAINERS:
+			heapq.heappush(self._widest, entry)
+		elif entry[0] > self._widest[0][0]:
+			heapq.heapreplace(self._widest, entry)
+
+	def merge(self, other: "SubtreeStatistics"):
+		self.nodeCount += other.nodeCount
+		self.maxDepth = max(self.maxDepth, other.maxDepth)
+		self.roleCounts.update(other.roleCounts)
+		self.appCounts.update(other.appCounts)
+		for container in other.widest:
+			self.addContainer(container)
+		self.enumerationTime += other.enumerationTime
+		self.errors += other.errors
+
+	@property
+	def averageLatency(self) -> float:
+		return self.enumerationTime / self.nodeCount if self.nodeCount else 0.0
+
+
+def getObjectLabel(obj: NVDAObject) -> str:
+	return f'{obj.role.displayString} "{obj.name}"'
+
+
+class NodeBudget:
+	"""A node and time budget shared by the walkers of one statistics run."""
+
+	def __init__(self, maxNodes: int, timeLimit: float):
+		self.nodesLeft = maxNodes
+		self.deadline = time.monotonic() + timeLimit
+		self.cancelled = False
+
+	def take(self) -> bool:
+		if self.exhausted:
+			return False
+		self.nodesLeft -= 1
+		return True
+
+	@property
+	def exhausted(self) -> bool:
+		return self.nodesLeft <= 0 or self.cancelled or time.monotonic() >= self.deadline
+
+
+class SubtreeWalker:
+	"""Walks the subtree of an object depth first, possibly in several slices."""
+
+	def __init__(
+		self,
+		root: NVDAObject,
+		budget: NodeBudget,
+		rootDepth: int = 0,
+		simpleReviewMode: bool = False,
+	):
+		self.root = root
+		self.budget = budget
+		self.rootDepth = rootDepth
+		self.simpleReviewMode = simpleReviewMode
+		self.stats = SubtreeStatistics(getObjectLabel(root), getObjectKey(root))
+		# Each entry holds the children iterator, the depth of the children, the parent and its child count.
+		self._stack: list[list] = []
+		self._started = False
+		self.finished = False
+
+	def reset(self):
+		"""Forget the progress of the walk, so that it starts again on the next run."""
+		self.stats = SubtreeStatistics(self.stats.label, self.stats.key)
+		self._stack = []
+		self._started = False
+		self.finished = False
+
+	def _push(self, obj: NVDAObject, depth: int):
+		iterator: Iterator[NVDAObject] = ObjectIterator(obj, "children", self.simpleReviewMode)
+		self._stack.append([iterator, depth + 1, obj, 0])
+
+	def _visit(self, obj: NVDAObject, depth: int):
+		stats = self.stats
+		stats.nodeCount += 1
+		stats.maxDepth = max(stats.maxDepth, depth)
+		stats.roleCounts[obj.role.displayString] += 1
+		appModule = obj.appModule
+		stats.appCounts[appModule.appName if appModule else ""] += 1
+
+	def run(self, until: float | None = None) -> bool:
+		"""Walk until the subtree is done, the budget is spent or `until` (a monotonic time) is reached."""
+		stats = self.stats
+		if not self._started:
+			self._started = True
+			if not self.budget.take():
+				self.finished = True
+				return True
+			start = time.monotonic()
+			self._visit(self.root, self.rootDepth)
+			self._push(self.root, self.rootDepth)
+			stats.enumerationTime += time.monotonic() - start
+		stack = self._stack
+		while stack:
+			if until is not None and time.monotonic() >= until:
+				return False
+			entry = stack[-1]
+			start = time.monotonic()
+			obj = next(entry[0], None)
+			if obj is None:
+				stack.pop()
+				parent: NVDAObject = entry[2]
+				if entry[3]:
+					stats.addContainer(Container(entry[3], getObjectLabel(parent), getObjectKey(parent)))
+				continue
+			if not self.budget.take():
+				break
+			entry[3] += 1
+			self._visit(obj, entry[1])
+			self._push(obj, entry[1])
+			stats.enumerationTime += time.monotonic() - start
+		self._stack.clear()
+		self.finished = True
+		return True
+
+
+class SubtreeStatisticsRun:
+	"""
+	Collects the statistics of a subtree, walking the subtrees of the top-level children one after the other.
+	NVDA objects must only be used from the main thread, so the walk happens there in slices, through `runSlice`.
+	"""
+
+	def __init__(
+		self,
+		root: NVDAObject,
+		maxNodes: int,
+		timeLimit: float,
+		simpleReviewMode: bool = False,
+	):
+		self.root = root
+		self.simpleReviewMode = simpleReviewMode
+		self.budget = NodeBudget(maxNodes, timeLimit)
+		self.rootStats = SubtreeStatistics(getObjectLabel(root), getObjectKey(root))
+		self.walkers: list[SubtreeWalker] = []
+		self._children: Iterator[NVDAObject] = ObjectIterator(root, "children", simpleReviewMode)
+		self.done = False
+		self._start()
+
+	def _start(self):
+		self.budget.take()
+		self.rootStats.nodeCount = 1
+		self.rootStats.roleCounts[self.root.role.displayString] += 1
+		appModule = self.root.appModule
+		self.rootStats.appCounts[appModule.appName if appModule else ""] += 1
+
+	def _nextWalker(self) -> SubtreeWalker | None:
+		"""Return the walker of the next top-level child, if the budget allows walking it."""
+		child = None if self.budget.exhausted else next(self._children, None)
+		if child is None:
+			return None
+		walker = SubtreeWalker(child, self.budget, 1, self.simpleReviewMode)
+		self.walkers.append(walker)
+		return walker
+
+	def runSlice(self, duration: float = 0.03):
+		"""Continue the walk for at most `duration` seconds."""
+		until = time.monotonic() + duration
+		while not self.done and time.monotonic() < until:
+			walker = (
+				self.walkers[-1] if self.walkers and not self.walkers[-1].finished else self._nextWalker()
+			)
+			if walker is None:
+				if self.walkers:
+					self.rootStats.addContainer(
+						Container(len(self.walkers), self.rootStats.label, self.rootStats.key)
+					)
+				self.done = True
+				return
+			try:
+				if not walker.run(until):
+					return
+			except Exception:
+				log.debugWarning(f"Walking {walker.stats.label} failed", exc_info=True)
+				walker.stats.errors += 1
+				walker.finished = True
+
+	@property
+	def visitedNodes(self) -> int:
+		return self.rootStats.nodeCount + sum(walker.stats.nodeCount for walker in self.walkers)
+
+	def cancel(self):
+		self.budget.cancelled = True
+
+	def result(self) -> tuple[SubtreeStatistics, list[SubtreeStatistics]]:
+		"""Return the merged statistics and the statistics of each top-level child."""
+		total = SubtreeStatistics(self.rootStats.label, self.rootStats.key)
+		total.merge(self.rootStats)
+		children: list[SubtreeStatistics] = []
+		for walker in self.walkers:
+			total.merge(walker.stats)
+			children.append(walker.stats)
+		children.sort(key=lambda stats: stats.nodeCount, reverse=True)
+		return total, children
+
+
+def formatReport(
+	total: SubtreeStatistics,
+	children: list[SubtreeStatistics],
+	truncated: bool,
+	maxItems: int = 10,
+) -> str:
+	# Translators: A line of the subtree statistics report.
+	nodesLine = _("Nodes: {count}").format(count=total.nodeCount)
+	if truncated:
+		# Translators: Appended to the node count of the subtree statistics report when the walk was stopped.
+		nodesLine += " " + _("(budget reached, partial results)")
+	lines = [
+		# Translators: The first line of the subtree statistics report.
+		_("Subtree statistics for {object}").format(object=total.label),
+		nodesLine,
+		# Translators: A line of the subtree statistics report.
+		_("Maximum depth: {depth}").format(depth=total.maxDepth),
+		# Translators: A line of the subtree statistics report.
+		_("Average enumeration latency: {latency:.2f} ms per node").format(
+			latency=total.averageLatency * 1000
+		),
+	]
+	if total.errors:
+		# Translators: A line of the subtree statistics report.
+		lines.append(_("Subtrees which could not be walked: {count}").format(count=total.errors))
+	sections: list[tuple[str, list[str]]] = [
+		(
+			# Translators: A section title of the subtree statistics report.
+			_("Largest top-level subtrees"),
+			[
+				# Translators: A line of the largest top-level subtrees in the subtree statistics report.
+				_("{count} nodes, depth {depth}, {latency:.2f} ms per node: {object}").format(
+					count=stats.nodeCount,
+					depth=stats.maxDepth,
+					latency=stats.averageLatency * 1000,
+					object=stats.label,
+				)
+				for stats in children[:maxItems]
+			],
+		),
+		(
+			# Translators: A section title of the subtree statistics report.
+			_("Widest containers"),
+			[
+				# Translators: A line of the widest containers in the subtree statistics report.
+				_("{count} children: {object}").format(count=container.childCount, object=container.label)
+				for container in total.widest
+			],
+		),
+		(
+			# Translators: A section title of the subtree statistics report.
+			_("Nodes per role"),
+			[f"{count}: {role}" for role, count in total.roleCounts.most_common()],
+		),
+		(
+			# Translators: A section title of the subtree statistics report.
+			_("Nodes per application"),
+			[f"{count}: {app}" for app, count in total.appCounts.most_common()],
+		),
+	]
+	for title, sectionLines in sections:
+		lines.append("")
+		# Translators: The title of a section of the subtree statistics report, followed by its lines.
+		lines.append(_("{title}:").format(title=title))
+		lines.extend(sectionLines)
+	return "\n".join(lines)
+
+
+def getHotKeys(
+	total: SubtreeStatistics,
+	children: list[SubtreeStatistics],
+	share: float = 0.25,
+) -> set[Hashable]:
+	"""Return the keys of the widest containers and of the top-level children holding `share` of the nodes."""
+	keys: set[Hashable] = {container.key for container in total.widest}
+	if total.nodeCount:
+		keys.update(stats.key for stats in children if stats.nodeCount / total.nodeCount >= share)
+	return keys
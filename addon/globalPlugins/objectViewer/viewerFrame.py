@@ -3,7 +3,9 @@
 # See the file COPYING.txt for more details.
 # Copyright (C) 2024-2025 hwf1324 <1398969445@qq.com>
 
+import re
 import sys
+from typing import TYPE_CHECKING
 
 import config
 import gui.guiHelper
@@ -13,8 +15,15 @@ from gui.dpiScalingHelper import DpiScalingHelperMixinWithoutInit
 from gui.nvdaControls import AutoWidthColumnListCtrl
 from NVDAObjects import NVDAObject
 
+from . import query
+from .columnView import COLUMNS, ChildColumnsView
+from .eventRecorder import EventRecorder
+from .nodeStore import TreeNode
 from .objectTree import NVDAObjectTree
 
+if TYPE_CHECKING:
+	from .subtreeStats import SubtreeStatisticsRun
+
 
 class ObjectViewerFrame(DpiScalingHelperMixinWithoutInit, wx.Frame):
 	def __init__(self, parent, namespace):
@@ -29,12 +38,14 @@ class ObjectViewerFrame(DpiScalingHelperMixinWithoutInit, wx.Frame):
 		self.panel: wx.Panel = wx.Panel(self)
 
 		self.objectTree: NVDAObjectTree = NVDAObjectTree(parent=self.panel)
+		self.columnView = ChildColumnsView(self.panel, self.objectTree)
 		self.objectDevInfoList = createDevInfoList(self.panel)
 
 		if not namespace:
 			namespace = {}
 		self.crust = self.createCrust(namespace)
 		self.namespace = self.crust.shell.interp.locals
+		self.namespace["ov"] = query
 
 		self.frameContentsSizer: wx.BoxSizer = wx.BoxSizer(wx.VERTICAL)
 		self.SetSizer(self.frameContentsSizer)
@@ -47,6 +58,8 @@ class ObjectViewerFrame(DpiScalingHelperMixinWithoutInit, wx.Frame):
 		self.treeContentsSizer: wx.BoxSizer = wx.BoxSizer(wx.VERTICAL)
 
 		self.treeContentsSizer.Add(self.objectTree, proportion=1, flag=wx.EXPAND)
+		self.treeContentsSizer.Add(self.columnView, proportion=1, flag=wx.EXPAND)
+		self.treeContentsSizer.Show(self.columnView, config.conf["objectViewer"]["columnView"])
 		self.propertieContentsSizer: gui.guiHelper.BoxSizerHelper = gui.guiHelper.BoxSizerHelper(
 			self.panel, sizer=wx.StaticBoxSizer(wx.VERTICAL, self.panel, _("Object Properties"))
 		)
@@ -63,8 +76,16 @@ class ObjectViewerFrame(DpiScalingHelperMixinWithoutInit, wx.Frame):
 		self.panelContentsSizer.Add(self.crust, proportion=1, flag=wx.EXPAND)
 
 		self.Bind(wx.EVT_TREE_SEL_CHANGED, self.onSelectionChanged, self.objectTree)
+		self.Bind(wx.EVT_TREE_ITEM_MENU, self.onTreeItemMenu, self.objectTree)
+
+		self.eventRecorder: EventRecorder = EventRecorder()
+		self.eventRecorderFrame = None
+		self.historyFrame = None
 
 		self.makeMenuBar()
+		self.CreateStatusBar()
+		self.Bind(wx.EVT_CLOSE, self.onClose)
+		self.Bind(wx.EVT_TREE_ITEM_EXPANDED, self.onItemExpanded, self.objectTree)
 
 		# setting the size must be done after the parent is constructed.
 		self.SetMinSize(self.scaleSize(self.MIN_SIZE))
@@ -80,7 +101,8 @@ class ObjectViewerFrame(DpiScalingHelperMixinWithoutInit, wx.Frame):
 
 		introText = _(
 			f"Python {sys.version.split()[0]} on {sys.platform}, NVDA {buildVersion.version}\n"
-			"NOTE: The 'obj' variable refers to the NVDA object selected in the tree."
+			"NOTE: The 'obj' variable refers to the NVDA object selected in the tree.\n"
+			"The 'ov' module queries the object tree, e.g. ov.find(obj, role='button', name='')."
 		)
 
 		crust = wx.py.crust.Crust(
@@ -126,6 +148,14 @@ class ObjectViewerFrame(DpiScalingHelperMixinWithoutInit, wx.Frame):
 			self.simpleReviewMode.Enable(False)
 		self.Bind(wx.EVT_MENU, self.onToggleReviewMode, self.simpleReviewMode)
 
+		self.prefetchItem: wx.MenuItem = treeMenu.AppendCheckItem(
+			wx.ID_ANY,
+			_("&Prefetch children"),
+			_("Fetch the children of the selected and visible items while idle."),
+		)
+		self.prefetchItem.Check(config.conf["objectViewer"]["prefetch"])
+		self.Bind(wx.EVT_MENU, self.onTogglePrefetch, self.prefetchItem)
+
 		treeMenu.AppendSubMenu(
 			menu_addTreeNodesMode,
 			_("&Add tree nodes mode..."),
@@ -137,11 +167,177 @@ class ObjectViewerFrame(DpiScalingHelperMixinWithoutInit, wx.Frame):
 			_("Configure the way the tree view retrieves NVDA objects."),
 		)
 		self.Bind(wx.EVT_MENU, self.onToggleReviewMode, self.simpleReviewMode)
+		treeMenu.AppendSubMenu(
+			self.makeFiltersMenu(),
+			_("&Filters..."),
+			_("Configure which objects are hidden from the tree view."),
+		)
+		self.columnViewItem: wx.MenuItem = treeMenu.AppendCheckItem(
+			wx.ID_ANY,
+			_("Show children &columns"),
+			_("List the children of the selected object with the chosen columns."),
+		)
+		self.columnViewItem.Check(config.conf["objectViewer"]["columnView"])
+		self.Bind(wx.EVT_MENU, self.onToggleColumnView, self.columnViewItem)
+		treeMenu.AppendSubMenu(
+			self.makeColumnsMenu(),
+			_("C&olumns..."),
+			_("Choose the columns of the children list."),
+		)
+
+		toolsMenu: wx.Menu = wx.Menu()
+		self.eventRecorderItem: wx.MenuItem = toolsMenu.Append(
+			wx.ID_ANY,
+			_("&Event recorder..."),
+			_("Record the NVDA events fired for the objects shown in the tree."),
+		)
+		self.Bind(wx.EVT_MENU, self.onEventRecorder, self.eventRecorderItem)
+		self.historyItem: wx.MenuItem = toolsMenu.Append(
+			wx.ID_ANY,
+			_("&History..."),
+			_("Capture the selected subtree periodically and browse the past captures."),
+		)
+		self.Bind(wx.EVT_MENU, self.onHistory, self.historyItem)
+		self.subtreeStatisticsItem: wx.MenuItem = toolsMenu.Append(
+			wx.ID_ANY,
+			_("Subtree &statistics..."),
+			_("Count the objects below the selected tree node and find the largest containers."),
+		)
+		self.Bind(wx.EVT_MENU, self.onSubtreeStatistics, self.subtreeStatisticsItem)
+		self.hoverInspectItem: wx.MenuItem = toolsMenu.AppendCheckItem(
+			wx.ID_ANY,
+			_("&Hover inspect"),
+			_("Select the tree node of the object under the mouse while the mouse moves."),
+		)
+		self.Bind(wx.EVT_MENU, self.onToggleHoverInspect, self.hoverInspectItem)
+		self.ipcServerItem: wx.MenuItem = toolsMenu.AppendCheckItem(
+			wx.ID_ANY,
+			_("&Inspection server"),
+			_("Serve the object tree to local tools, such as test automation, over a named pipe."),
+		)
+		self.ipcServerItem.Check(config.conf["objectViewer"]["ipcServer"])
+		self.Bind(wx.EVT_MENU, self.onToggleIPCServer, self.ipcServerItem)
+		self.diagnosticsItem: wx.MenuItem = toolsMenu.Append(
+			wx.ID_ANY,
+			_("&Memory usage..."),
+			_("Report the objects retained by the Object Viewer and its memory allocations."),
+		)
+		self.Bind(wx.EVT_MENU, self.onDiagnostics, self.diagnosticsItem)
+		self.countObjectsItem: wx.MenuItem = toolsMenu.Append(
+			wx.ID_ANY,
+			# Translators: An item of the Tools menu of the Object Viewer.
+			_("&Count NVDA objects in NVDA"),
+			# Translators: The help text of the Count NVDA objects in NVDA menu item.
+			_("Count the NVDA objects alive in NVDA. This scans all Python objects and may take a while."),
+		)
+		self.Bind(wx.EVT_MENU, self.onCountObjects, self.countObjectsItem)
 
 		self.menuBar: wx.MenuBar = wx.MenuBar()
 		self.menuBar.Append(treeMenu, _("Objects &tree"))
+		self.menuBar.Append(toolsMenu, _("T&ools"))
 		self.SetMenuBar(self.menuBar)
 
+	def makeFiltersMenu(self) -> wx.Menu:
+		menu_filters: wx.Menu = wx.Menu()
+		self.filterItems: dict[int, str] = {}
+		for key, label in (
+			("hideInvisible", _("Hide &invisible objects")),
+			("hideOffscreen", _("Hide &offscreen objects")),
+			("hideZeroSize", _("Hide &zero-size objects")),
+			("hidePresentational", _("Hide &presentational objects")),
+			("collapseSingleChildChains", _("&Collapse single-child chains")),
+		):
+			item: wx.MenuItem = menu_filters.AppendCheckItem(wx.ID_ANY, label)
+			item.Check(config.conf["objectViewer"][key])
+			self.filterItems[item.GetId()] = key
+			self.Bind(wx.EVT_MENU, self.onToggleFilter, item)
+		menu_filters.AppendSeparator()
+		for key, label in (
+			("roleAllowList", _("&Only show roles...")),
+			("roleDenyList", _("&Hide roles...")),
+			("namePattern", _("&Name pattern...")),
+		):
+			item = menu_filters.Append(wx.ID_ANY, label)
+			self.filterItems[item.GetId()] = key
+			self.Bind(wx.EVT_MENU, self.onEditFilter, item)
+		return menu_filters
+
+	def makeColumnsMenu(self) -> wx.Menu:
+		menu_columns: wx.Menu = wx.Menu()
+		self.columnItems: dict[int, str] = {}
+		for column, (label, _getter) in COLUMNS.items():
+			item: wx.MenuItem = menu_columns.AppendCheckItem(wx.ID_ANY, label)
+			item.Check(column in config.conf["objectViewer"]["columns"])
+			self.columnItems[item.GetId()] = column
+			self.Bind(wx.EVT_MENU, self.onToggleColumn, item)
+		return menu_columns
+
+	def onToggleColumn(self, event: wx.CommandEvent):
+		column = self.columnItems[event.GetId()]
+		columns: list[str] = [c for c in config.conf["objectViewer"]["columns"] if c != column]
+		if event.IsChecked():
+			columns.append(column)
+		config.conf["objectViewer"]["columns"] = columns
+		self.columnView.setColumns(columns)
+		event.Skip()
+
+	def onToggleColumnView(self, event: wx.CommandEvent):
+		config.conf["objectViewer"]["columnView"] = event.IsChecked()
+		self.treeContentsSizer.Show(self.columnView, event.IsChecked())
+		self.panel.Layout()
+		if event.IsChecked():
+			item: wx.TreeItemId = self.objectTree.GetSelection()
+			if item.IsOk():
+				self.columnView.showChildren(item)
+		else:
+			self.columnView.clear()
+		event.Skip()
+
+	def onFiltersChanged(self):
+		self.columnView.clear()
+		self.objectTree.prefetcher.clear()
+		self.objectTree.pathResolver.forget()
+		self.objectTree.CollapseAll()
+
+	def onToggleFilter(self, event: wx.CommandEvent):
+		config.conf["objectViewer"][self.filterItems[event.GetId()]] = event.IsChecked()
+		self.onFiltersChanged()
+		event.Skip()
+
+	def onEditFilter(self, event: wx.CommandEvent):
+		key = self.filterItems[event.GetId()]
+		value = config.conf["objectViewer"][key]
+		isList = key != "namePattern"
+		with wx.TextEntryDialog(
+			self,
+			# Translators: The prompt of the dialog editing a filter of the Object Viewer tree.
+			_("Comma separated role names, e.g. button, link:")
+			if isList
+			else _("Regular expression searched in object names:"),
+			_("Filters"),
+			", ".join(value) if isList else value,
+		) as dialog:
+			if dialog.ShowModal() != wx.ID_OK:
+				return
+			text: str = dialog.GetValue().strip()
+		if isList:
+			config.conf["objectViewer"][key] = [name.strip() for name in text.split(",") if name.strip()]
+		else:
+			try:
+				re.compile(text)
+			except re.error as e:
+				gui.messageBox(
+					# Translators: Reported when the name pattern filter is not a valid regular expression.
+					_("Invalid regular expression: {error}").format(error=e),
+					_("Filters"),
+					wx.OK | wx.ICON_ERROR,
+					self,
+				)
+				return
+			config.conf["objectViewer"][key] = text
+		self.onFiltersChanged()
+		event.Skip()
+
 	def onToggleAddTreeNodesMode(self, event: wx.CommandEvent):
 		if event.GetId() == self.addTreeNodesChildrenMode.GetId():
 			config.conf["objectViewer"]["addTreeNodesMode"] = "children"
@@ -159,25 +355,197 @@ class ObjectViewerFrame(DpiScalingHelperMixinWithoutInit, wx.Frame):
 			self.simpleReviewMode.Enable(True)
 
 		config.conf["objectViewer"]["addTreeNodesMode"] = "iterator"
+		self.objectTree.pathResolver.forget()
 		self.objectTree.CollapseAll()
 		event.Skip()
 
 	def onToggleReviewMode(self, event: wx.CommandEvent):
 		config.conf["objectViewer"]["simpleReviewMode"] = event.IsChecked()
+		self.objectTree.pathResolver.forget()
 		self.objectTree.CollapseAll()
 		event.Skip()
 
+	def onTogglePrefetch(self, event: wx.CommandEvent):
+		config.conf["objectViewer"]["prefetch"] = event.IsChecked()
+		self.objectTree.prefetcher.clear()
+		event.Skip()
+
+	def onToggleHoverInspect(self, event: wx.CommandEvent):
+		if event.IsChecked():
+			self.objectTree.hoverInspector.enable()
+		else:
+			self.objectTree.hoverInspector.disable()
+		event.Skip()
+
+	def onToggleIPCServer(self, event: wx.CommandEvent):
+		from . import ipcServer
+
+		if event.IsChecked():
+			try:
+				ipcServer.startServer()
+			except OSError as e:
+				ipcServer.stopServer()
+				self.ipcServerItem.Check(False)
+				gui.messageBox(
+					# Translators: Reported when the inspection server of the Object Viewer can't be started.
+					_("Could not start the inspection server: {error}").format(error=e),
+					_("Inspection server"),
+					wx.OK | wx.ICON_ERROR,
+					self,
+				)
+				return
+		else:
+			ipcServer.stopServer()
+		config.conf["objectViewer"]["ipcServer"] = event.IsChecked()
+		event.Skip()
+
+	def onEventRecorder(self, event: wx.CommandEvent):
+		from .eventRecorderFrame import EventRecorderFrame
+
+		if not self.eventRecorderFrame:
+			self.eventRecorderFrame = EventRecorderFrame(self, self.eventRecorder, self.objectTree)
+		self.eventRecorderFrame.Show()
+		self.eventRecorderFrame.Raise()
+		event.Skip()
+
+	def onHistory(self, event: wx.CommandEvent):
+		from .historyFrame import HistoryFrame
+
+		if not self.historyFrame:
+			self.historyFrame = HistoryFrame(self, self.objectTree)
+		self.historyFrame.Show()
+		self.historyFrame.Raise()
+		event.Skip()
+
+	def onTreeItemMenu(self, event: wx.TreeEvent):
+		self.objectTree.SelectItem(event.GetItem())
+		menu = wx.Menu()
+		item: wx.MenuItem = menu.Append(wx.ID_ANY, _("Subtree &statistics..."))
+		self.Bind(wx.EVT_MENU, self.onSubtreeStatistics, item)
+		self.objectTree.PopupMenu(menu)
+		self.Unbind(wx.EVT_MENU, item, handler=self.onSubtreeStatistics)
+		menu.Destroy()
+
+	def onSubtreeStatistics(self, event: wx.CommandEvent):
+		from .subtreeStats import SubtreeStatisticsRun
+
+		item: wx.TreeItemId = self.objectTree.GetSelection()
+		obj = self.objectTree.getItemObject(item) if item.IsOk() else None
+		if obj is None:
+			return
+		conf = config.conf["objectViewer"]
+		run = SubtreeStatisticsRun(
+			obj,
+			maxNodes=conf["statsMaxNodes"],
+			timeLimit=conf["statsTimeLimit"],
+			simpleReviewMode=self.objectTree.simpleReviewMode,
+		)
+		progress = wx.ProgressDialog(
+			# Translators: The title of the progress dialog of the subtree statistics.
+			_("Subtree statistics"),
+			_("Walking the subtree..."),
+			maximum=conf["statsMaxNodes"],
+			parent=self,
+			style=wx.PD_CAN_ABORT | wx.PD_APP_MODAL | wx.PD_ELAPSED_TIME | wx.PD_AUTO_HIDE,
+		)
+		timer = wx.Timer(self)
+
+		def onTimer(timerEvent: wx.TimerEvent):
+			run.runSlice()
+			visited = run.visitedNodes
+			keepGoing, _skip = progress.Update(
+				min(visited, conf["statsMaxNodes"] - 1),
+				# Translators: Progress of the subtree statistics.
+				_("{count} objects").format(count=visited),
+			)
+			if not keepGoing:
+				run.cancel()
+			if run.done:
+				timer.Stop()
+				self.Unbind(wx.EVT_TIMER, timer, handler=onTimer)
+				progress.Destroy()
+				self.showSubtreeStatistics(run)
+
+		self.Bind(wx.EVT_TIMER, onTimer, timer)
+		timer.Start(50)
+		event.Skip()
+
+	def showSubtreeStatistics(self, run: "SubtreeStatisticsRun"):
+		import ui
+
+		from .subtreeStats import formatReport, getHotKeys
+
+		total, children = run.result()
+		self.objectTree.setHotKeys(getHotKeys(total, children))
+		# Translators: The title of the subtree statistics report.
+		ui.browseableMessage(formatReport(total, children, run.budget.exhausted), _("Subtree statistics"))
+
+	def onDiagnostics(self, event: wx.CommandEvent):
+		import ui
+
+		from . import ObjectViewerTool
+		from .diagnostics import getDiagnosticsReport
+
+		# Translators: The title of the Object Viewer memory usage report.
+		ui.browseableMessage(getDiagnosticsReport(ObjectViewerTool()), _("Object Viewer memory usage"))
+		event.Skip()
+
+	def onCountObjects(self, event: wx.CommandEvent):
+		import ui
+
+		from .diagnostics import countNVDAObjectsInProcess
+
+		# Translators: Reported after counting the NVDA objects alive in NVDA.
+		ui.message(_("{count} NVDA objects").format(count=countNVDAObjectsInProcess()))
+		event.Skip()
+
+	def onClose(self, event: wx.CloseEvent):
+		if not event.CanVeto():
+			event.Skip()
+			return
+		# Keep the frame so that it can be shown again quickly; the tool releases it after a while.
+		event.Veto()
+		self.Hide()
+		self.objectTree.hoverInspector.disable()
+		self.hoverInspectItem.Check(False)
+		from . import ObjectViewerTool
+
+		ObjectViewerTool().onHide()
+
+	def updateStatusBar(self):
+		stats = self.objectTree.nodeStore.stats
+		stats.update(self.objectTree.prefetcher.stats)
+		stats.update(self.objectTree.pathResolver.stats)
+		self.SetStatusText(
+			# Translators: Memory usage of the object tree, shown in the status bar of the Object Viewer.
+			_(
+				"{nodes} nodes, {nodeBytes} bytes ({bytesPerNode} per node), {liveObjects} live objects, "
+				"prefetch hit rate {prefetchHitRate}, {parentCalls} parent calls "
+				"({parentCallsSaved} saved by known paths, {keyComputations} keys computed)"
+			).format(**stats)
+		)
+
+	def onItemExpanded(self, event: wx.TreeEvent):
+		self.updateStatusBar()
+		event.Skip()
+
 	def onSelectionChanged(self, event: wx.TreeEvent):
 		"""Handle selection changed event."""
-		obj: NVDAObject = self.objectTree.GetItemData(event.GetItem())
+		item: wx.TreeItemId = event.GetItem()
+		obj: NVDAObject | None = self.objectTree.getItemObject(item)
 		self.namespace["obj"] = self.obj = obj
 
 		self.Freeze()
 		self.objectDevInfoList.DeleteAllItems()
-		self.objectPropertieLabel.SetLabel(self.objectTree.getObjectDisplayText(obj))
-		updateDevInfoList(self.objectDevInfoList, obj.devInfo)
+		node: TreeNode = self.objectTree.GetItemData(item)
+		self.objectPropertieLabel.SetLabel(self.objectTree.getNodeDisplayText(node))
+		if obj is not None:
+			updateDevInfoList(self.objectDevInfoList, obj.devInfo)
+		if self.columnView.IsShown():
+			self.columnView.showChildren(item)
 
 		self.Thaw()
+		self.updateStatusBar()
 
 		event.Skip()
 
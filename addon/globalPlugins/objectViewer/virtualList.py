@@ -0,0 +1,19 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+from collections.abc import Callable
+
+import wx
+
+
+class VirtualListCtrl(wx.ListCtrl):
+	"""A virtual report list whose cell texts are provided by a callback."""
+
+	def __init__(self, parent: wx.Window, getItemText: Callable[[int, int], str], style: int = 0):
+		super().__init__(parent, style=wx.LC_REPORT | wx.LC_VIRTUAL | style)
+		self.getItemText = getItemText
+
+	def OnGetItemText(self, item: int, column: int) -> str:
+		return self.getItemText(item, column)
@@ -0,0 +1,101 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+"""
+Times the add-on bundle builder on a synthetic add-on, against a plain zipfile build.
+Usage: python benchmarks/bundle.py [file count]
+"""
+
+import importlib
+import random
+import shutil
+import sys
+import tempfile
+import time
+import types
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+TOOL_DIR = ROOT / "site_scons" / "site_tools" / "NVDATool"
+SOURCES = ROOT / "addon" / "globalPlugins" / "objectViewer"
+EXCLUDE_PATTERNS = ["*.pyc", "__pycache__/*", "*.bak", "doc/*/*.md", "*.tmp", "tests/*", "*.orig", "*.rej"]
+FILES_PER_PACKAGE = 50
+CHANGED_FILES = 30
+
+
+def loadAddonModule():
+	"""Import the bundle builder without the tool package, which needs SCons."""
+	package = types.ModuleType("NVDATool")
+	package.__path__ = [str(TOOL_DIR)]
+	sys.modules["NVDATool"] = package
+	return importlib.import_module("NVDATool.addon")
+
+
+def buildAddon(root: Path, count: int, rng: random.Random) -> list[Path]:
+	texts = [path.read_bytes() for path in SOURCES.glob("*.py")]
+	files: list[Path] = []
+	for index in range(count):
+		directory = root / "globalPlugins" / f"pkg{index // FILES_PER_PACKAGE}" / "sub"
+		if index % FILES_PER_PACKAGE == 0:
+			directory.mkdir(parents=True)
+			(directory / "stale.pyc").write_bytes(b"excluded")
+		path = directory / f"mod{index % FILES_PER_PACKAGE}.py"
+		path.write_bytes(rng.choice(texts) + str(index).encode())
+		files.append(path)
+	return files
+
+
+def zipfileBundle(root: Path, dest: Path):
+	"""The bundle as built before the incremental builder: zipfile, matching each pattern with PurePath.match."""
+	with zipfile.ZipFile(dest, "w", zipfile.ZIP_DEFLATED) as bundle:
+		for path in root.rglob("*"):
+			if path.is_dir():
+				continue
+			relativePath = path.relative_to(root)
+			if not any(relativePath.match(pattern) for pattern in EXCLUDE_PATTERNS):
+				bundle.write(path, relativePath)
+
+
+def timed(func, *args) -> float:
+	start = time.perf_counter()
+	func(*args)
+	return time.perf_counter() - start
+
+
+def main():
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+	rng = random.Random(1)
+	addon = loadAddonModule()
+	workDir = Path(tempfile.mkdtemp())
+	try:
+		root = workDir / "addon"
+		files = buildAddon(root, count, rng)
+		bundle = str(workDir / "incremental.nvda-addon")
+		results = {
+			"zipfile": timed(zipfileBundle, root, workDir / "zipfile.nvda-addon"),
+			"cold": timed(addon.createAddonBundleFromPath, root, bundle, EXCLUDE_PATTERNS),
+			"no change": timed(addon.createAddonBundleFromPath, root, bundle, EXCLUDE_PATTERNS),
+		}
+		for path in rng.sample(files, CHANGED_FILES):
+			path.write_bytes(path.read_bytes() + b"# changed\n")
+		results[f"{CHANGED_FILES} changed"] = timed(
+			addon.createAddonBundleFromPath, root, bundle, EXCLUDE_PATTERNS
+		)
+		fullBundle = str(workDir / "full.nvda-addon")
+		results["non-incremental"] = timed(
+			addon.createAddonBundleFromPath, root, fullBundle, EXCLUDE_PATTERNS, False
+		)
+		print(f"{count} files")
+		for name, seconds in results.items():
+			print(f"{name}: {seconds:.3f} s")
+		reproducible = Path(bundle).read_bytes() == Path(fullBundle).read_bytes()
+		print(f"incremental and full bundles identical: {reproducible}")
+	finally:
+		shutil.rmtree(workDir)
+
+
+if __name__ == "__main__":
+	main()
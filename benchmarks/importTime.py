@@ -0,0 +1,176 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+"""
+Times the first import of the add-on as NVDA extracts it, with and without the bundled bytecode.
+Each import runs in a new process, with NVDA's modules replaced by stand-ins accepting anything.
+Usage: python benchmarks/importTime.py [runs]
+"""
+
+import builtins
+import importlib
+import importlib.abc
+import importlib.machinery
+import os
+import pkgutil
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+TOOL_DIR = ROOT / "site_scons" / "site_tools" / "NVDATool"
+EXCLUDE_PATTERNS = ["*.pyc", "__pycache__/*", "*.bak", "*.tmp"]
+
+
+class _Anything:
+	"""Stands for any object of NVDA: it can be called, subclassed and combined with anything."""
+
+	def __init__(self, *args, **kwargs):
+		pass
+
+	def __call__(self, *args, **kwargs):
+		# Used as a decorator, it keeps the decorated function.
+		if len(args) == 1 and callable(args[0]) and not kwargs:
+			return args[0]
+		return _Anything()
+
+	def __getattr__(self, name: str):
+		if name.startswith("__"):
+			raise AttributeError(name)
+		return _Anything()
+
+	def __mro_entries__(self, bases):
+		return (type("Stub", (), {"__init__": lambda self, *args, **kwargs: None}),)
+
+	def __or__(self, other):
+		return self
+
+	__ror__ = __and__ = __rand__ = __add__ = __radd__ = __sub__ = __mul__ = __or__
+
+	def __getitem__(self, key):
+		return _Anything()
+
+	def __setitem__(self, key, value):
+		pass
+
+	def __index__(self) -> int:
+		return 0
+
+	def __iter__(self):
+		return iter(())
+
+	def __hash__(self) -> int:
+		return id(self)
+
+
+class _StandInFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+	"""Imports a stand-in for every module Python can't find, such as NVDA's."""
+
+	def find_spec(self, name, path, target=None):
+		if name.split(".")[0] == "objectViewer" or name.startswith("_"):
+			return None
+		return importlib.machinery.ModuleSpec(name, self, is_package=True)
+
+	def create_module(self, spec):
+		module = types.ModuleType(spec.name)
+		module.__path__ = []
+
+		def getAttribute(name: str):
+			if name.startswith("__"):
+				raise AttributeError(name)
+			return _Anything()
+
+		module.__getattr__ = getAttribute
+		return module
+
+	def exec_module(self, module):
+		pass
+
+
+def timeImport(addonDir: str):
+	"""Import every module of the extracted add-on, printing the time it took in milliseconds."""
+	for name in ("_", "ngettext", "pgettext", "npgettext"):
+		setattr(builtins, name, lambda *args: args[-2] if len(args) > 1 else args[0])
+	sys.meta_path.append(_StandInFinder())
+	sys.path.insert(0, str(Path(addonDir) / "globalPlugins"))
+	start = time.perf_counter()
+	package = importlib.import_module("objectViewer")
+	for module in pkgutil.iter_modules(package.__path__):
+		importlib.import_module(f"objectViewer.{module.name}")
+	print((time.perf_counter() - start) * 1000)
+
+
+def loadAddonModule():
+	"""Import the bundle builder without the tool package, which needs SCons."""
+	package = types.ModuleType("NVDATool")
+	package.__path__ = [str(TOOL_DIR)]
+	sys.modules["NVDATool"] = package
+	return importlib.import_module("NVDATool.addon")
+
+
+def extractBundle(workDir: Path, name: str, includeBytecode: bool) -> Path:
+	addon = loadAddonModule()
+	bundle = workDir / f"{name}.nvda-addon"
+	addon.createAddonBundleFromPath(
+		ROOT / "addon",
+		str(bundle),
+		EXCLUDE_PATTERNS,
+		incremental=False,
+		includeBytecode=includeBytecode,
+	)
+	extracted = workDir / name
+	with zipfile.ZipFile(bundle) as f:
+		f.extractall(extracted)
+	return extracted
+
+
+def medianImportTime(addonDir: Path, runs: int) -> float:
+	# Let Python cache the bytecode of sources, as it does for NVDA.
+	env = {name: value for name, value in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"}
+	times = [
+		float(
+			subprocess.run(
+				[sys.executable, __file__, "--child", str(addonDir)],
+				check=True,
+				capture_output=True,
+				text=True,
+				env=env,
+			).stdout
+		)
+		for _run in range(runs)
+	]
+	return statistics.median(times)
+
+
+def main():
+	if sys.argv[1:2] == ["--child"]:
+		timeImport(sys.argv[2])
+		return
+	runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+	workDir = Path(tempfile.mkdtemp())
+	try:
+		sources = extractBundle(workDir, "sources", includeBytecode=False)
+		bytecode = extractBundle(workDir, "bytecode", includeBytecode=True)
+		# A bundle without bytecode is compiled on its first import only: time that one.
+		sourceTimes = []
+		for _run in range(runs):
+			shutil.rmtree(workDir / "firstImport", ignore_errors=True)
+			shutil.copytree(sources, workDir / "firstImport")
+			sourceTimes.append(medianImportTime(workDir / "firstImport", 1))
+		print(f"sources, first import: {statistics.median(sourceTimes):.1f} ms")
+		print(f"sources, compiled: {medianImportTime(sources, runs):.1f} ms")
+		print(f"bundled bytecode: {medianImportTime(bytecode, runs):.1f} ms")
+	finally:
+		shutil.rmtree(workDir)
+
+
+if __name__ == "__main__":
+	main()
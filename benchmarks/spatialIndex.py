@@ -0,0 +1,84 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+"""
+Times the queries of the hover inspector spatial index on a synthetic layout.
+Usage: python benchmarks/spatialIndex.py [node count]
+"""
+
+import importlib.util
+import random
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+MODULE_PATH = Path(__file__).parent.parent / "addon" / "globalPlugins" / "objectViewer" / "spatialIndex.py"
+SCREEN = (0, 0, 3840, 2160)
+WINDOWS = 8
+QUERIES = 100_000
+
+
+def loadSpatialIndex():
+	spec = importlib.util.spec_from_file_location("spatialIndex", MODULE_PATH)
+	module = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(module)
+	return module
+
+
+def buildLayout(count: int, rng: random.Random) -> list[tuple[int, int, int, int, int, int]]:
+	"""Split overlapping top-level windows into nested rectangles, as an application would lay them out."""
+	rects: list[tuple[int, int, int, int, int, int]] = []
+	queue: deque[tuple[int, int, int, int, int, int]] = deque()
+	for window in range(1, WINDOWS + 1):
+		width, height = rng.randint(800, 2400), rng.randint(600, 1600)
+		left, top = rng.randint(0, SCREEN[2] - width), rng.randint(0, SCREEN[3] - height)
+		queue.append((left, top, width, height, 0, window))
+	while queue and len(rects) < count:
+		rect = queue.popleft()
+		rects.append(rect)
+		left, top, width, height, depth, window = rect
+		if width < 16 or height < 8:
+			continue
+		children = rng.randint(2, 6)
+		# Children stack vertically or horizontally, as rows and toolbars do.
+		if depth % 2:
+			step = width // children
+			queue.extend((left + i * step, top, step, height, depth + 1, window) for i in range(children))
+		else:
+			step = height // children
+			queue.extend((left, top + i * step, width, step, depth + 1, window) for i in range(children))
+	return rects
+
+
+def main():
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+	rng = random.Random(0)
+	spatialIndex = loadSpatialIndex()
+	index = spatialIndex.GridIndex(bounds=SCREEN)
+	rects = buildLayout(count, rng)
+	start = time.perf_counter()
+	for key, (left, top, width, height, depth, window) in enumerate(rects):
+		index.insert(key, left, top, width, height, depth, window)
+	insertTime = time.perf_counter() - start
+	# The window on top at each point, as the hover inspector gets it from the system.
+	points = [
+		(rng.randrange(SCREEN[2]), rng.randrange(SCREEN[3]), rng.randint(1, WINDOWS)) for _ in range(QUERIES)
+	]
+	# Sort every cell once, as the first queries of a hover session do.
+	for x, y, _window in points:
+		index.query(x, y)
+	start = time.perf_counter()
+	hits = 0
+	for x, y, window in points:
+		if index.query(x, y, window) is not None:
+			hits += 1
+	queryTime = time.perf_counter() - start
+	print(f"{len(rects)} rectangles, inserted in {insertTime:.2f} s")
+	print(f"{queryTime / QUERIES * 1e6:.1f} us per query, {hits / QUERIES:.0%} hits")
+
+
+if __name__ == "__main__":
+	main()
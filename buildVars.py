@@ -69,6 +69,11 @@ i18nSources: list[str] = pythonSources + ["buildVars.py"]
 # or use glob expressions.
 excludedFiles: list[str] = []
 
+# Whether to include the compiled bytecode (.pyc files) of the Python sources in the add-on bundle,
+# so that NVDA does not have to compile the add-on, and write the bytecode, when loading it for the first time.
+# Bytecode is only included when SCons runs on the Python version of an NVDA version the add-on supports.
+includeBytecode: bool = False
+
 # Base language for the NVDA add-on
 # If your add-on is written in a language other than english, modify this variable.
 # For example, set baseLanguage to "es" if your add-on is primarily written in spanish.
@@ -3,10 +3,13 @@ This tool generates NVDA extensions.
 
 Builders:
 
-- NVDAAddon: Creates a .nvda-addon zip file. Requires the `excludePatterns` environment variable.
+- NVDAAddon: Creates a reproducible .nvda-addon zip file, incrementally from the previous one.
+  Requires the `excludePatterns` environment variable.
+  Includes the bytecode of Python sources when the `includeBytecode` environment variable is True.
 - NVDAManifest: Creates the manifest.ini file.
 - NVDATranslatedManifest: Creates the manifest.ini file with only translated information.
-- md2html: Build HTML from Markdown
+- NVDADocs: Builds the HTML of every Markdown document at once,
+  rendering languages in parallel and skipping documents whose inputs did not change.
 
 The following environment variables are required to create the manifest:
 
@@ -17,30 +20,38 @@ The following environment variables are required to create the manifest:
 
 The following environment variables are required to build the HTML:
 
-- moFile: str | pathlib.Path | None
+- moFiles: dict[str, SCons File], the .mo file of each language
 - mdExtensions: list[str]
 - addon_info: .typings.AddonInfo
 
+NVDADocs records the hashes of its inputs in the file named by the `docStampsFile` environment variable.
+
 """
 
+import sys
+
 from SCons.Script import Environment, Builder
 
 from .addon import createAddonBundleFromPath
+from .bytecode import canCompileFor
 from .manifests import generateManifest, generateTranslatedManifest
-from .docs import md2html
+from .docs import buildDocs
 
 
 def generate(env: Environment):
 	env.SetDefault(excludePatterns=tuple())
+	env.SetDefault(includeBytecode=False)
 
 	addonAction = env.Action(
 		lambda target, source, env: createAddonBundleFromPath(
 			source[0].abspath,
 			target[0].abspath,
 			env["excludePatterns"],
+			includeBytecode=env["includeBytecode"] and _canIncludeBytecode(env["addon_info"]),
 		)
 		and None,
 		lambda target, source, env: f"Generating Addon {target[0]}",
+		varlist=["includeBytecode"],
 	)
 	env["BUILDERS"]["NVDAAddon"] = Builder(
 		action=addonAction,
@@ -92,22 +103,47 @@ def generate(env: Environment):
 
 	env.SetDefault(mdExtensions={})
 
-	mdAction = env.Action(
-		lambda target, source, env: md2html(
-			source[0].path,
-			target[0].path,
-			moFile=env["moFile"].path if env["moFile"] else None,
-			mdExtensions=env["mdExtensions"],
-			addon_info=env["addon_info"],
-		)
-		and None,
-		lambda target, source, env: f"Generating {target[0]}",
+	env.SetDefault(moFiles={})
+	env.SetDefault(docStampsFile=".docStamps.json")
+
+	docsAction = env.Action(
+		_buildDocs,
+		lambda target, source, env: f"Generating {len(target)} HTML documents",
+		# Titles are made from the add-on information.
+		varlist=["addon_info", "mdExtensions"],
+	)
+	env["BUILDERS"]["NVDADocs"] = Builder(
+		action=docsAction,
+		emitter=_keepDocs,
 	)
-	env["BUILDERS"]["md2html"] = env.Builder(
-		action=mdAction,
-		suffix=".html",
-		src_suffix=".md",
+
+
+def _canIncludeBytecode(addon_info) -> bool:
+	if canCompileFor(addon_info["addon_minimumNVDAVersion"], addon_info["addon_lastTestedNVDAVersion"]):
+		return True
+	print(
+		f"Warning: not including bytecode, as Python {sys.version_info.major}.{sys.version_info.minor} "
+		"is not the Python of an NVDA version supported by the add-on.",
+		file=sys.stderr,
 	)
+	return False
+
+
+def _buildDocs(target, source, env) -> None:
+	buildDocs(
+		[node.path for node in source],
+		[node.path for node in target],
+		moFiles={lang: moFile.path for lang, moFile in env["moFiles"].items()},
+		mdExtensions=env["mdExtensions"],
+		addon_info=env["addon_info"],
+		stampsFile=env.File(env["docStampsFile"]).path,
+	)
+
+
+def _keepDocs(target, source, env):
+	# SCons deletes targets before building them, which would defeat skipping the unchanged documents.
+	env.Precious(target)
+	return target, source
 
 
 def exists():
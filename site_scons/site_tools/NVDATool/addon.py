@@ -1,23 +1,393 @@
-import zipfile
-from collections.abc import Iterable
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import struct
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
 
+from .bytecode import compileBytecode, getBytecodeName
 
-def matchesNoPatterns(path: Path, patterns: Iterable[str]) -> bool:
-	"""Checks if the path, the first argument, does not match any of the patterns passed as the second argument."""
-	return not any((path.match(pattern) for pattern in patterns))
+# Every entry gets the same timestamp, 1980-01-01 00:00:00 (the earliest zip date), so that bundles built
+# from the same files are identical byte for byte.
+_DOS_TIME = 0
+_DOS_DATE = (0 << 9) | (1 << 5) | 1
+_STORED = 0
+_DEFLATED = 8
+_UTF8_FLAG = 0x800
+_LOCAL_HEADER = struct.Struct("<4sHHHHHLLLHH")
+_CENTRAL_HEADER = struct.Struct("<4sBBHHHHHLLLHHHHHLL")
+_END_OF_CENTRAL_DIRECTORY = struct.Struct("<4sHHHHLLH")
+_MANIFEST_VERSION = 2
+# Changing the compression level invalidates the compressed data kept from previous builds.
+_COMPRESSION_LEVEL = zlib.Z_DEFAULT_COMPRESSION
+# The bundle is written without ZIP64 extensions, which bound its sizes, offsets and number of entries.
+_MAX_ZIP_SIZE = 0xFFFFFFFF
+_MAX_ZIP_ENTRIES = 0xFFFF
 
 
-def createAddonBundleFromPath(path: str | Path, dest: str, excludePatterns: Iterable[str]):
-	"""Creates a bundle from a directory that contains an addon manifest file."""
-	if isinstance(path, str):
-		path = Path(path)
-	basedir = path.absolute()
-	with zipfile.ZipFile(dest, "w", zipfile.ZIP_DEFLATED) as z:
-		for p in basedir.rglob("*"):
-			if p.is_dir():
+class BundleTooLargeError(Exception):
+	"""The add-on would need ZIP64 extensions, which the bundle writer doesn't support."""
+
+
+def _translatePatternPart(part: str) -> str:
+	"""Translates one path component of a glob pattern to a regular expression, as `fnmatch` does."""
+	result: list[str] = []
+	i = 0
+	while i < len(part):
+		char = part[i]
+		i += 1
+		if char == "*":
+			result.append("[^/]*")
+		elif char == "?":
+			result.append("[^/]")
+		elif char == "[":
+			end = part.find("]", i + 1 if part[i : i + 1] in ("!", "]") else i)
+			if end == -1:
+				result.append(re.escape(char))
+				continue
+			# Escape what regular expressions treat specially inside a set, as fnmatch does.
+			content = re.sub(r"([\\&~|\[])", r"\\\1", part[i:end])
+			i = end + 1
+			if content.startswith("!"):
+				content = "^" + content[1:]
+			elif content.startswith("^"):
+				content = "\\" + content
+			result.append(f"[{content}]")
+		else:
+			result.append(re.escape(char))
+	return "".join(result)
+
+
+def compileExcludePatterns(patterns: Iterable[str]) -> Callable[[str], bool]:
+	"""
+	Compiles exclude patterns once into a function telling whether a bundle path (with "/" separators) matches any.
+	Patterns follow `PurePath.match` on the relative bundle path: they match from the right,
+	absolute patterns never match, and matching is case-insensitive on Windows.
+	"""
+	regexes: list[str] = []
+	for pattern in patterns:
+		if os.name == "nt":
+			pattern = pattern.replace("\\", "/")
+			if re.match(r"[A-Za-z]:", pattern):
 				continue
-			pathInBundle = p.relative_to(basedir)
-			if matchesNoPatterns(pathInBundle, excludePatterns):
-				z.write(p, pathInBundle)
+		if pattern.startswith("/"):
+			continue
+		parts = [part for part in pattern.split("/") if part and part != "."]
+		if not parts:
+			raise ValueError(f"Empty exclude pattern: {pattern!r}")
+		body = "/".join(_translatePatternPart(part) for part in parts)
+		regexes.append(f"(?:^|/){body}$")
+	if not regexes:
+		return lambda path: False
+	combined = re.compile("|".join(regexes), re.IGNORECASE if os.name == "nt" else 0)
+	return lambda path: combined.search(path) is not None
+
+
+class _SourceFile(NamedTuple):
+	name: str
+	path: str
+	size: int
+	mtimeNs: int
+	# The name of the Python source, when the entry is the bytecode compiled from it.
+	sourceName: str | None = None
+
+
+def _iterFiles(basedir: str, prefix: str = "") -> Iterator[_SourceFile]:
+	"""Yields the files of the add-on, without the bytecode left by running or testing its sources."""
+	with os.scandir(basedir) as entries:
+		for entry in entries:
+			name = f"{prefix}{entry.name}"
+			if entry.is_dir():
+				if entry.name != "__pycache__":
+					yield from _iterFiles(entry.path, f"{name}/")
+			elif not entry.name.endswith((".pyc", ".pyo")):
+				stat = entry.stat()
+				yield _SourceFile(name, entry.path, stat.st_size, stat.st_mtime_ns)
+
+
+class _Entry(NamedTuple):
+	name: str
+	# The size of the file, which differs from the size of the entry data for compiled bytecode.
+	size: int
+	mtimeNs: int
+	sha256: str
+	crc: int
+	method: int
+	compressedSize: int
+	uncompressedSize: int
+	# Compressed data of a new or changed file, None when it is copied from the previous bundle.
+	data: bytes | None
+	# Where the compressed data of an unchanged file starts in the previous bundle.
+	previousOffset: int
+
+
+def _compress(source: _SourceFile) -> _Entry:
+	data = Path(source.path).read_bytes()
+	# The entry of compiled bytecode is identified by the hash of its source.
+	sha256 = hashlib.sha256(data).hexdigest()
+	if source.sourceName is not None:
+		data = compileBytecode(data, source.sourceName)
+	compressor = zlib.compressobj(_COMPRESSION_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+	compressed = compressor.compress(data) + compressor.flush()
+	method = _DEFLATED
+	if len(compressed) >= len(data):
+		compressed, method = data, _STORED
+	return _Entry(
+		source.name,
+		source.size,
+		source.mtimeNs,
+		sha256,
+		zlib.crc32(data),
+		method,
+		len(compressed),
+		len(data),
+		compressed,
+		-1,
+	)
+
+
+def _hashFile(path: str) -> str:
+	digest = hashlib.sha256()
+	with open(path, "rb") as f:
+		while chunk := f.read(1 << 20):
+			digest.update(chunk)
+	return digest.hexdigest()
+
+
+def _manifestPath(dest: str | Path) -> Path:
+	return Path(f"{dest}.manifest.json")
+
+
+def _loadManifest(dest: str | Path) -> dict[str, dict]:
+	"""Returns the entries of the previous bundle, if it is still the one the manifest describes."""
+	try:
+		manifest = json.loads(_manifestPath(dest).read_text(encoding="utf-8"))
+		stat = os.stat(dest)
+	except (OSError, ValueError):
+		return {}
+	if (
+		manifest.get("version") != _MANIFEST_VERSION
+		or manifest.get("compressionLevel") != _COMPRESSION_LEVEL
+		# Bytecode compiled by another Python version must be compiled again.
+		or manifest.get("bytecodeMagic") != importlib.util.MAGIC_NUMBER.hex()
+		or manifest.get("bundle") != {"size": stat.st_size, "mtimeNs": stat.st_mtime_ns}
+	):
+		return {}
+	return manifest["files"]
+
+
+def _isUntouched(source: _SourceFile, previous: dict | None) -> bool:
+	return previous is not None and previous["size"] == source.size and previous["mtimeNs"] == source.mtimeNs
+
+
+def _getEntry(source: _SourceFile, previous: dict | None) -> _Entry:
+	"""Reuses the previous entry of an unchanged file, or compresses the file."""
+	if previous is None:
+		return _compress(source)
+	if _isUntouched(source, previous):
+		sha256 = previous["sha256"]
+	else:
+		sha256 = _hashFile(source.path)
+		if sha256 != previous["sha256"]:
+			return _compress(source)
+	return _Entry(
+		source.name,
+		source.size,
+		source.mtimeNs,
+		sha256,
+		previous["crc"],
+		previous["method"],
+		previous["compressedSize"],
+		previous["uncompressedSize"],
+		None,
+		previous["offset"],
+	)
+
+
+def createAddonBundleFromPath(
+	path: str | Path,
+	dest: str,
+	excludePatterns: Iterable[str],
+	incremental: bool = True,
+	workers: int | None = None,
+	includeBytecode: bool = False,
+):
+	"""
+	Creates a bundle from a directory that contains an addon manifest file.
+	The bundle is reproducible: entries are sorted and have fixed timestamps.
+	Unless `incremental` is False, a manifest of content hashes is kept next to the bundle, and the compressed
+	data of unchanged files is copied from the previous bundle instead of being compressed again.
+	New and changed files are hashed and compressed in parallel.
+	Bytecode found in the add-on directory is never included, as it may be stale.
+	With `includeBytecode`, the bytecode of every Python source, compiled by the running Python,
+	is added next to it in `__pycache__`.
+	Raises `BundleTooLargeError` for a bundle of more than 65,535 files or of 4 GiB or more.
+	"""
+	basedir = os.path.abspath(path)
+	isExcluded = compileExcludePatterns(excludePatterns)
+	files = {source.name: source for source in _iterFiles(basedir) if not isExcluded(source.name)}
+	if includeBytecode:
+		for source in list(files.values()):
+			if source.name.endswith(".py"):
+				name = getBytecodeName(source.name)
+				files[name] = source._replace(name=name, sourceName=source.name)
+	sources = sorted(files.values(), key=lambda source: source.name)
+	previousFiles = _loadManifest(dest) if incremental else {}
+	touched = [source for source in sources if not _isUntouched(source, previousFiles.get(source.name))]
+	# Hashing and compression release the GIL, so threads work in parallel.
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		touchedEntries = dict(
+			zip(
+				(source.name for source in touched),
+				executor.map(lambda source: _getEntry(source, previousFiles.get(source.name)), touched),
+			)
+		)
+	entries = [
+		touchedEntries.get(source.name) or _getEntry(source, previousFiles[source.name]) for source in sources
+	]
+	manifestPath = _manifestPath(dest)
+	if (
+		previousFiles
+		and all(entry.data is None for entry in entries)
+		and list(previousFiles) == [entry.name for entry in entries]
+	):
+		# Nothing changed, so the bundle would be written again byte for byte.
+		if touched:
+			# Remember the times of the files touched without changing, so as not to hash them next time.
+			manifestFiles = {entry.name: _manifestEntry(entry, entry.previousOffset) for entry in entries}
+			_writeManifest(manifestPath, dest, manifestFiles)
+		return dest
+	manifestFiles = _writeBundle(dest, entries)
+	if incremental:
+		_writeManifest(manifestPath, dest, manifestFiles)
+	elif manifestPath.exists():
+		manifestPath.unlink()
 	return dest
+
+
+def _manifestEntry(entry: _Entry, offset: int) -> dict:
+	return {
+		"size": entry.size,
+		"mtimeNs": entry.mtimeNs,
+		"sha256": entry.sha256,
+		"crc": entry.crc,
+		"method": entry.method,
+		"compressedSize": entry.compressedSize,
+		"uncompressedSize": entry.uncompressedSize,
+		"offset": offset,
+	}
+
+
+def _writeManifest(manifestPath: Path, dest: str, files: dict[str, dict]):
+	stat = os.stat(dest)
+	manifest = {
+		"version": _MANIFEST_VERSION,
+		"compressionLevel": _COMPRESSION_LEVEL,
+		"bytecodeMagic": importlib.util.MAGIC_NUMBER.hex(),
+		"bundle": {"size": stat.st_size, "mtimeNs": stat.st_mtime_ns},
+		"files": files,
+	}
+	manifestPath.write_text(json.dumps(manifest, separators=(",", ":")), encoding="utf-8")
+
+
+def _writeBundle(dest: str, entries: list[_Entry]) -> dict[str, dict]:
+	"""Writes the bundle, copying unchanged entries from the previous one, and returns its manifest entries."""
+	if len(entries) > _MAX_ZIP_ENTRIES:
+		raise BundleTooLargeError(f"{dest}: {len(entries)} files, more than {_MAX_ZIP_ENTRIES}")
+	for entry in entries:
+		if max(entry.compressedSize, entry.uncompressedSize) >= _MAX_ZIP_SIZE:
+			raise BundleTooLargeError(f"{dest}: {entry.name} is 4 GiB or larger")
+	tempDest = f"{dest}.tmp"
+	manifestFiles: dict[str, dict] = {}
+	previousBundle = open(dest, "rb") if any(entry.data is None for entry in entries) else None
+	try:
+		with open(tempDest, "wb") as out:
+			centralDirectory: list[bytes] = []
+			for entry in entries:
+				offset = out.tell()
+				if offset > _MAX_ZIP_SIZE:
+					raise BundleTooLargeError(f"{dest}: the bundle would be 4 GiB or larger")
+				nameBytes = entry.name.encode("utf-8")
+				flags = 0 if nameBytes.isascii() else _UTF8_FLAG
+				version = 20 if entry.method == _DEFLATED else 10
+				out.write(
+					_LOCAL_HEADER.pack(
+						b"PK\x03\x04",
+						version,
+						flags,
+						entry.method,
+						_DOS_TIME,
+						_DOS_DATE,
+						entry.crc,
+						entry.compressedSize,
+						entry.uncompressedSize,
+						len(nameBytes),
+						0,
+					)
+				)
+				out.write(nameBytes)
+				dataOffset = out.tell()
+				if entry.data is not None:
+					out.write(entry.data)
+				else:
+					assert previousBundle is not None
+					previousBundle.seek(entry.previousOffset)
+					data = previousBundle.read(entry.compressedSize)
+					if len(data) != entry.compressedSize:
+						raise OSError(f"Truncated previous bundle {dest}")
+					out.write(data)
+				centralDirectory.append(
+					_CENTRAL_HEADER.pack(
+						b"PK\x01\x02",
+						20,
+						0,
+						version,
+						flags,
+						entry.method,
+						_DOS_TIME,
+						_DOS_DATE,
+						entry.crc,
+						entry.compressedSize,
+						entry.uncompressedSize,
+						len(nameBytes),
+						0,
+						0,
+						0,
+						0,
+						0,
+						offset,
+					)
+					+ nameBytes
+				)
+				manifestFiles[entry.name] = _manifestEntry(entry, dataOffset)
+			centralDirectoryOffset = out.tell()
+			for record in centralDirectory:
+				out.write(record)
+			if out.tell() > _MAX_ZIP_SIZE:
+				raise BundleTooLargeError(f"{dest}: the bundle would be 4 GiB or larger")
+			out.write(
+				_END_OF_CENTRAL_DIRECTORY.pack(
+					b"PK\x05\x06",
+					0,
+					0,
+					len(centralDirectory),
+					len(centralDirectory),
+					out.tell() - centralDirectoryOffset,
+					centralDirectoryOffset,
+					0,
+				)
+			)
+	except BaseException:
+		if os.path.exists(tempDest):
+			os.unlink(tempDest)
+		raise
+	finally:
+		if previousBundle:
+			previousBundle.close()
+	os.replace(tempDest, dest)
+	return manifestFiles
@@ -0,0 +1,63 @@
+import importlib.util
+import marshal
+import sys
+
+# The Python version of NVDA releases, from the first release using it.
+_NVDA_PYTHON_VERSIONS: tuple[tuple[tuple[int, int], tuple[int, int]], ...] = (
+	((2019, 3), (3, 7)),
+	((2024, 1), (3, 11)),
+	((2026, 1), (3, 13)),
+)
+# Flags of a .pyc file checked against the hash of its source, rather than the source modification time,
+# which is lost when NVDA extracts the bundle.
+_CHECKED_HASH_FLAGS = 0b11
+
+
+def _parseNVDAVersion(version: str) -> tuple[int, int]:
+	year, major = version.split(".")[:2]
+	return int(year), int(major)
+
+
+def getTargetPythonVersions(
+	minimumNVDAVersion: str | None,
+	lastTestedNVDAVersion: str | None,
+) -> set[tuple[int, int]]:
+	"""Returns the Python versions of the NVDA releases between the two versions."""
+	first = _parseNVDAVersion(minimumNVDAVersion) if minimumNVDAVersion else _NVDA_PYTHON_VERSIONS[0][0]
+	last = _parseNVDAVersion(lastTestedNVDAVersion) if lastTestedNVDAVersion else (sys.maxsize, 0)
+	# Each Python version is used until the release of the next one.
+	untilReleases = [release for release, pythonVersion in _NVDA_PYTHON_VERSIONS[1:]] + [(sys.maxsize, 0)]
+	return {
+		pythonVersion
+		for (release, pythonVersion), untilRelease in zip(_NVDA_PYTHON_VERSIONS, untilReleases)
+		if release <= last and untilRelease > first
+	}
+
+
+def canCompileFor(minimumNVDAVersion: str | None, lastTestedNVDAVersion: str | None) -> bool:
+	"""Checks that the running Python is the one of an NVDA release supported by the add-on."""
+	return sys.version_info[:2] in getTargetPythonVersions(minimumNVDAVersion, lastTestedNVDAVersion)
+
+
+def getBytecodeName(name: str) -> str:
+	"""Returns the name of the .pyc file the running Python imports instead of the source `name`."""
+	directory, _, fileName = name.rpartition("/")
+	prefix = f"{directory}/" if directory else ""
+	return f"{prefix}__pycache__/{fileName.removesuffix('.py')}.{sys.implementation.cache_tag}.pyc"
+
+
+def compileBytecode(source: bytes, name: str) -> bytes:
+	"""
+	Compiles a Python source file into the content of a hash-checked .pyc file.
+	`name` is the path of the source in the bundle: Python replaces it with the real path when importing.
+	"""
+	# NVDA imports add-ons without -O, so it would not look for optimized (.opt-N.pyc) files.
+	code = compile(source, name, "exec", dont_inherit=True, optimize=0)
+	return b"".join(
+		(
+			importlib.util.MAGIC_NUMBER,
+			_CHECKED_HASH_FLAGS.to_bytes(4, "little"),
+			importlib.util.source_hash(source),
+			marshal.dumps(code),
+		)
+	)
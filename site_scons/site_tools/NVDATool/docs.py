@@ -1,45 +1,51 @@
-import gettext
+import hashlib
+import json
+import multiprocessing
+import site
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
+from typing import NamedTuple
 
 import markdown
 
 from .typings import AddonInfo
+from .utils import loadTranslations
 
+_HEADER_REPLACEMENTS = {
+	'[[!meta title="': "# ",
+	'"]]': " #",
+}
+_STAMPS_VERSION = 1
 
-def md2html(
-	source: str | Path,
-	dest: str | Path,
-	*,
-	moFile: str | Path | None,
-	mdExtensions: list[str],
-	addon_info: AddonInfo,
-):
-	if isinstance(source, str):
-		source = Path(source)
-	if isinstance(dest, str):
-		dest = Path(dest)
-	if isinstance(moFile, str):
-		moFile = Path(moFile)
 
+@lru_cache(maxsize=None)
+def _getMarkdown(mdExtensions: tuple[str, ...]) -> markdown.Markdown:
+	"""Returns a converter per set of extensions, so that extensions are only loaded once per process."""
+	return markdown.Markdown(extensions=list(mdExtensions))
+
+
+def _getTitle(moFile: str | Path | None, addon_info: AddonInfo) -> str:
 	try:
-		with moFile.open("rb") as f:
-			_ = gettext.GNUTranslations(f).gettext
-	except Exception:
+		_ = loadTranslations(moFile)
+	except OSError:
+		# A .mo file which is missing or can't be read.
 		summary = addon_info["addon_summary"]
 	else:
 		summary = _(addon_info["addon_summary"])
 	version = addon_info["addon_version"]
-	title = f"{summary} {version}"
+	return f"{summary} {version}"
+
+
+def _renderDocument(source: Path, dest: Path, title: str, mdExtensions: Iterable[str]):
 	lang = source.parent.name.replace("_", "-")
-	headerDic = {
-		'[[!meta title="': "# ",
-		'"]]': " #",
-	}
 	with source.open("r", encoding="utf-8") as f:
 		mdText = f.read()
-	for k, v in headerDic.items():
+	for k, v in _HEADER_REPLACEMENTS.items():
 		mdText = mdText.replace(k, v, 1)
-	htmlText = markdown.markdown(mdText, extensions=mdExtensions)
+	# The converter keeps state from the previous document until it is reset.
+	htmlText = _getMarkdown(tuple(mdExtensions)).reset().convert(mdText)
 	# Optimization: build resulting HTML text in one go instead of writing parts separately.
 	docText = "\n".join(
 		(
@@ -57,3 +63,99 @@ def md2html(
 	)
 	with dest.open("w", encoding="utf-8") as f:
 		f.write(docText)  # type: ignore
+
+
+class _Document(NamedTuple):
+	source: Path
+	dest: Path
+	title: str
+	stamp: str
+
+
+def _renderDocuments(documents: list[_Document], mdExtensions: tuple[str, ...]):
+	"""Renders the documents of one language, possibly in a worker process."""
+	for document in documents:
+		_renderDocument(document.source, document.dest, document.title, mdExtensions)
+
+
+def _digest(path: str | Path) -> str:
+	return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _loadStamps(stampsFile: Path) -> dict[str, str]:
+	try:
+		stamps = json.loads(stampsFile.read_text(encoding="utf-8"))
+	except (OSError, ValueError):
+		return {}
+	if stamps.get("version") != _STAMPS_VERSION:
+		return {}
+	return stamps["documents"]
+
+
+def _writeStamps(stampsFile: Path, documents: dict[str, str]):
+	stamps = {"version": _STAMPS_VERSION, "documents": documents}
+	stampsFile.write_text(json.dumps(stamps, sort_keys=True, separators=(",", ":")), encoding="utf-8")
+
+
+def buildDocs(
+	sources: Iterable[str | Path],
+	dests: Iterable[str | Path],
+	*,
+	moFiles: Mapping[str, str | Path],
+	mdExtensions: list[str],
+	addon_info: AddonInfo,
+	stampsFile: str | Path,
+	workers: int | None = None,
+):
+	"""
+	Builds the HTML of many Markdown documents, `moFiles` giving the .mo file of each language.
+	The translations of each language are loaded once, and languages are rendered in parallel processes.
+	A document is skipped when its HTML exists and the hashes of its source, .mo file, add-on information
+	and Markdown extensions match the stamp recorded in `stampsFile` by the previous build.
+	"""
+	stampsFile = Path(stampsFile)
+	extensions = tuple(mdExtensions)
+	common = hashlib.sha256(
+		json.dumps([addon_info, extensions], sort_keys=True, default=str).encode("utf-8")
+	).hexdigest()
+	moDigests = {lang: _digest(moFile) for lang, moFile in moFiles.items() if Path(moFile).is_file()}
+	previousStamps = _loadStamps(stampsFile)
+	stamps: dict[str, str] = {}
+	staleByLang: dict[str, list[_Document]] = {}
+	for source, dest in zip(sources, dests):
+		source, dest = Path(source), Path(dest)
+		lang = source.parent.name
+		stamp = hashlib.sha256(
+			f"{_digest(source)}:{moDigests.get(lang, '')}:{common}".encode("utf-8")
+		).hexdigest()
+		key = dest.as_posix()
+		if previousStamps.get(key) == stamp and dest.is_file():
+			stamps[key] = stamp
+			continue
+		title = _getTitle(moFiles.get(lang), addon_info)
+		staleByLang.setdefault(lang, []).append(_Document(source, dest, title, stamp))
+	try:
+		if len(staleByLang) > 1 and workers != 1:
+			# Worker processes are spawned as on Windows, where they can't be forked, on every platform:
+			# they only run the functions of this module, which they import as SCons did.
+			siteTools = str(Path(__file__).resolve().parents[1])
+			with ProcessPoolExecutor(
+				workers,
+				mp_context=multiprocessing.get_context("spawn"),
+				initializer=site.addsitedir,
+				initargs=(siteTools,),
+			) as executor:
+				futures = {
+					executor.submit(_renderDocuments, documents, extensions): documents
+					for documents in staleByLang.values()
+				}
+				for future in as_completed(futures):
+					future.result()
+					stamps.update((document.dest.as_posix(), document.stamp) for document in futures[future])
+		else:
+			for documents in staleByLang.values():
+				_renderDocuments(documents, extensions)
+				stamps.update((document.dest.as_posix(), document.stamp) for document in documents)
+	finally:
+		# Only the documents known to be up to date are stamped, so that failed ones are built again.
+		_writeStamps(stampsFile, stamps)
@@ -1,9 +1,8 @@
 import codecs
-import gettext
 from functools import partial
 
 from .typings import AddonInfo, BrailleTables, SymbolDictionaries, SpeechDictionaries
-from .utils import format_nested_section
+from .utils import format_nested_section, loadTranslations
 
 
 def generateManifest(
@@ -45,8 +44,7 @@ def generateTranslatedManifest(
 	symbolDictionaries: SymbolDictionaries,
 	speechDictionaries: SpeechDictionaries,
 ):
-	with open(mo, "rb") as f:
-		_ = gettext.GNUTranslations(f).gettext
+	_ = loadTranslations(mo)
 	vars: dict[str, str] = {}
 	for var in ("addon_summary", "addon_description", "addon_changelog"):
 		vars[var] = _(addon_info[var])
@@ -1,4 +1,8 @@
+import gettext
+import os
 from collections.abc import Callable, Container, Mapping
+from functools import lru_cache
+from pathlib import Path
 
 from .typings import Strable
 
@@ -25,3 +29,20 @@ def format_nested_section(
 				continue
 			lines.append(f"{key} = {_(str(val))}")
 	return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=None)
+def _loadTranslations(path: str, size: int, mtimeNs: int) -> Callable[[str], str]:
+	with open(path, "rb") as f:
+		return gettext.GNUTranslations(f).gettext
+
+
+def loadTranslations(moFile: str | Path | None) -> Callable[[str], str]:
+	"""
+	Returns the gettext function of a .mo file, or a function returning strings untranslated without one.
+	Each file is parsed once per build, and again only if it changes, however many targets use it.
+	"""
+	if moFile is None:
+		return gettext.NullTranslations().gettext
+	stat = os.stat(moFile)
+	return _loadTranslations(os.path.abspath(moFile), stat.st_size, stat.st_mtime_ns)
@@ -0,0 +1,112 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+"""
+Runs the modules of the add-on outside NVDA.
+The NVDA modules they import are replaced by minimal stand-ins, and the add-on package is registered
+without running its `__init__`, which needs NVDA's GUI.
+"""
+
+import builtins
+import enum
+import sys
+import types
+from pathlib import Path
+
+# The add-on is imported from its sources: don't leave bytecode there for the bundle to pick up.
+sys.dont_write_bytecode = True
+
+ADDON_PACKAGE_DIR = Path(__file__).parent.parent / "addon" / "globalPlugins" / "objectViewer"
+
+
+class Role(enum.IntEnum):
+	UNKNOWN = 0
+	WINDOW = 1
+	TITLEBAR = 2
+	PANE = 3
+	DIALOG = 4
+	CHECKBOX = 5
+	RADIOBUTTON = 6
+	STATICTEXT = 7
+	EDITABLETEXT = 8
+	BUTTON = 9
+	MENUBAR = 10
+	MENUITEM = 11
+	POPUPMENU = 12
+	LIST = 14
+	LISTITEM = 15
+	GRAPHIC = 16
+	LINK = 19
+	TREEVIEW = 20
+	TREEVIEWITEM = 21
+	TAB = 22
+	TABCONTROL = 23
+	DOCUMENT = 52
+	GROUPING = 56
+	TOOLBAR = 60
+	DESKTOP = 82
+
+	@property
+	def displayString(self) -> str:
+		return self.name.lower()
+
+
+class State(enum.IntEnum):
+	UNAVAILABLE = 0x1
+	FOCUSED = 0x2
+	SELECTED = 0x4
+	BUSY = 0x8
+	PRESSED = 0x10
+	CHECKED = 0x20
+	COLLAPSED = 0x200
+	EXPANDED = 0x400
+	INVISIBLE = 0x800
+	FOCUSABLE = 0x8000
+	OFFSCREEN = 0x100000
+
+	@property
+	def displayString(self) -> str:
+		return self.name.lower()
+
+
+class _Log:
+	def _ignore(self, *args, **kwargs):
+		pass
+
+	debug = info = warning = debugWarning = error = exception = _ignore
+
+
+class NVDAObject:
+	pass
+
+
+def _module(name: str, **attributes) -> types.ModuleType:
+	module = types.ModuleType(name)
+	module.__dict__.update(attributes)
+	sys.modules[name] = module
+	return module
+
+
+builtins._ = lambda message: message
+builtins.pgettext = lambda context, message: message
+builtins.ngettext = lambda singular, plural, count: singular if count == 1 else plural
+builtins.npgettext = lambda context, singular, plural, count: singular if count == 1 else plural
+
+_module("controlTypes", Role=Role, State=State)
+_module("logHandler", log=_Log())
+_module("NVDAObjects", NVDAObject=NVDAObject)
+_module("config", conf={"objectViewer": {}, "reviewCursor": {"simpleReviewMode": False}})
+_module(
+	"api",
+	getDesktopObject=lambda: None,
+	getFocusObject=lambda: None,
+	getFocusAncestors=lambda: [],
+	getNavigatorObject=lambda: None,
+	getMouseObject=lambda: None,
+)
+_module("eventHandler", executeEvent=lambda eventName, obj, **kwargs: None)
+_module("winUser", isDescendantWindow=lambda parent, child: False, getCursorPos=lambda: (0, 0))
+
+_module("objectViewer", __path__=[str(ADDON_PACKAGE_DIR)])
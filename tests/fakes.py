@@ -0,0 +1,78 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+from controlTypes import Role
+from NVDAObjects import NVDAObject
+
+
+class FakeObject(NVDAObject):
+	"""An object of a fake accessibility tree, identified by an IA2 unique ID unless given another one."""
+
+	appModule = None
+
+	def __init__(
+		self,
+		name: str = "",
+		role: Role = Role.PANE,
+		children: list["FakeObject"] | None = None,
+		windowHandle: int = 1,
+		uniqueID: int | None = None,
+		states: set | None = None,
+	):
+		self.name = name
+		self.role = role
+		self.windowHandle = windowHandle
+		self.states = states or set()
+		self.processID = 1
+		if uniqueID is not None:
+			self.IA2UniqueID = uniqueID
+		self.parent: FakeObject | None = None
+		self.children = children or []
+		for index, child in enumerate(self.children):
+			child.parent = self
+			child.indexInParent = index
+		self.indexInParent = 0
+
+	@property
+	def childCount(self) -> int:
+		return len(self.children)
+
+	@property
+	def firstChild(self) -> "FakeObject | None":
+		return self.children[0] if self.children else None
+
+	@property
+	def lastChild(self) -> "FakeObject | None":
+		return self.children[-1] if self.children else None
+
+	@property
+	def next(self) -> "FakeObject | None":
+		return self._sibling(1)
+
+	@property
+	def previous(self) -> "FakeObject | None":
+		return self._sibling(-1)
+
+	def getChild(self, index: int) -> "FakeObject":
+		return self.children[index]
+
+	def _sibling(self, offset: int) -> "FakeObject | None":
+		if self.parent is None:
+			return None
+		index = self.indexInParent + offset
+		siblings = self.parent.children
+		return siblings[index] if 0 <= index < len(siblings) else None
+
+	simpleFirstChild = firstChild
+	simpleLastChild = lastChild
+	simpleNext = next
+	simplePrevious = previous
+
+	@property
+	def simpleParent(self) -> "FakeObject | None":
+		return self.parent
+
+	def __repr__(self) -> str:
+		return f"FakeObject({self.name!r})"
@@ -0,0 +1,102 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+from controlTypes import Role
+from fakes import FakeObject
+from objectViewer.eventRecorder import EventRecorder
+from objectViewer.objectKey import getObjectKey, isUniqueKey
+
+BUTTON = ("IA2", 1, 10)
+LIST = ("IA2", 1, 11)
+
+
+def _names(events) -> list[str]:
+	return [record.eventName for record in events]
+
+
+def test_recordKey_returnsSequenceNumbers():
+	recorder = EventRecorder(capacity=8)
+	assert [recorder.recordKey("focus", BUTTON, 1) for _i in range(3)] == [0, 1, 2]
+	assert recorder.nextSeq == 3
+	assert len(recorder) == 3
+
+
+def test_ringBuffer_keepsMostRecentEvents():
+	recorder = EventRecorder(capacity=4)
+	for index in range(10):
+		recorder.recordKey(f"event{index}", BUTTON)
+	assert _names(recorder.events()) == ["event6", "event7", "event8", "event9"]
+	assert recorder.totals["event0"] == 1
+
+
+def test_eventTypeFilter_usesOnlyBufferedEvents():
+	recorder = EventRecorder(capacity=4)
+	for eventName in ("focus", "nameChange", "focus", "stateChange", "focus", "nameChange"):
+		recorder.recordKey(eventName, BUTTON)
+	events = list(recorder.events(eventTypes={"focus"}))
+	assert [record.seq for record in events] == [2, 4]
+	assert _names(recorder.events(eventTypes={"focus", "nameChange"})) == ["focus", "focus", "nameChange"]
+
+
+def test_since_onlyYieldsNewEvents():
+	recorder = EventRecorder(capacity=16)
+	recorder.recordKey("focus", BUTTON)
+	recorder.recordKey("nameChange", BUTTON)
+	since = recorder.nextSeq
+	recorder.recordKey("focus", LIST)
+	assert [record.key for record in recorder.events(since=since)] == [LIST]
+	assert [record.key for record in recorder.events(eventTypes={"focus"}, since=since)] == [LIST]
+
+
+def test_keyAndWindowFilters():
+	recorder = EventRecorder(capacity=16)
+	recorder.recordKey("focus", BUTTON, windowHandle=1)
+	recorder.recordKey("focus", LIST, windowHandle=2)
+	recorder.recordKey("focus", ("IA2", 3, 12), windowHandle=3)
+	assert [record.key for record in recorder.events(keys={BUTTON})] == [BUTTON]
+	events = recorder.events(keys={BUTTON}, windowFilter=lambda windowHandle: windowHandle == 3)
+	assert [record.windowHandle for record in events] == [1, 3]
+
+
+def test_sharedKeys_onlyMatchThroughWindows():
+	sharedKey = ("obj", 1, int(Role.STATICTEXT))
+	assert not isUniqueKey(sharedKey)
+	assert not isUniqueKey(("IA", 1, 0))
+	assert isUniqueKey(("IA", 1, 3))
+	recorder = EventRecorder(capacity=16)
+	recorder.recordKey("nameChange", sharedKey, windowHandle=1)
+	assert list(recorder.events(keys={sharedKey})) == []
+	assert len(list(recorder.events(keys={sharedKey}, windowFilter=lambda windowHandle: True))) == 1
+
+
+def test_record_computesKeysLazily():
+	obj = FakeObject("OK", Role.BUTTON, windowHandle=5, uniqueID=42)
+	recorder = EventRecorder(capacity=16)
+	recorder.record("focus", obj)
+	assert recorder._keys[0] is None
+	(record,) = recorder.events()
+	assert record.key == getObjectKey(obj) == ("IA2", 5, 42)
+	assert record.windowHandle == 5
+	assert record.role == Role.BUTTON
+
+
+class _FewPendingKeysRecorder(EventRecorder):
+	MAX_PENDING_KEYS = 2
+
+
+def test_record_keepsKeyUnknownWhenPendingObjectsOverflow():
+	recorder = _FewPendingKeysRecorder(capacity=16)
+	for uniqueID in range(3):
+		recorder.record("focus", FakeObject(uniqueID=uniqueID))
+	assert [record.key for record in recorder.events()] == [None, ("IA2", 1, 1), ("IA2", 1, 2)]
+
+
+def test_clear():
+	recorder = EventRecorder(capacity=4)
+	recorder.recordKey("focus", BUTTON)
+	recorder.clear()
+	assert recorder.nextSeq == 0
+	assert list(recorder.events()) == []
+	assert recorder.eventTypes == []
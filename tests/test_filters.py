@@ -0,0 +1,44 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+from controlTypes import Role
+from fakes import FakeObject
+from objectViewer.filters import ChildEnumerator, NodeFilter
+
+
+def _enumerate(nodeFilter: NodeFilter, parent: FakeObject) -> tuple[list[str], int]:
+	enumerator = ChildEnumerator(nodeFilter)
+	children = ((obj, bool(obj.firstChild)) for obj in parent.children)
+	names = [child.obj.name for child in enumerator.enumerate(children)]
+	return names, enumerator.hidden
+
+
+def _buildParent() -> FakeObject:
+	return FakeObject(
+		"parent",
+		children=[
+			FakeObject("toolbar", Role.TOOLBAR, [FakeObject("OK", Role.BUTTON)]),
+			FakeObject("Cancel", Role.BUTTON),
+			FakeObject("label", Role.STATICTEXT),
+		],
+	)
+
+
+def test_roleAllowListKeepsContainers():
+	names, hidden = _enumerate(NodeFilter(roleAllowList=["button"]), _buildParent())
+	assert names == ["toolbar", "Cancel"]
+	assert hidden == 1
+
+
+def test_namePatternKeepsContainers():
+	names, hidden = _enumerate(NodeFilter(namePattern="^ok$"), _buildParent())
+	assert names == ["toolbar"]
+	assert hidden == 2
+
+
+def test_roleDenyListHidesContainers():
+	names, hidden = _enumerate(NodeFilter(roleDenyList=["toolbar"]), _buildParent())
+	assert names == ["Cancel", "label"]
+	assert hidden == 1
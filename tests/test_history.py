@@ -0,0 +1,81 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+from controlTypes import Role
+from fakes import FakeObject
+from objectViewer.history import HistoryRecorder
+
+
+def _buildTree() -> tuple[FakeObject, FakeObject, FakeObject]:
+	status = FakeObject("Ready", Role.STATICTEXT, uniqueID=3)
+	toolbar = FakeObject("toolbar", Role.TOOLBAR, [FakeObject("OK", Role.BUTTON, uniqueID=5)], uniqueID=4)
+	pane = FakeObject("pane", Role.PANE, [status], uniqueID=2)
+	root = FakeObject("window", Role.WINDOW, [pane, toolbar], uniqueID=1)
+	return root, status, toolbar
+
+
+def _capture(recorder: HistoryRecorder):
+	# A zero interval lets every slice start a new capture.
+	capture = recorder.runSlice(duration=10.0, interval=0.0)
+	assert capture is not None
+	return capture
+
+
+def test_unchangedSubtreesAreShared():
+	root, _status, _toolbar = _buildTree()
+	recorder = HistoryRecorder()
+	recorder.start(root)
+	first = _capture(recorder)
+	second = _capture(recorder)
+	assert first.nodeCount == second.nodeCount == 5
+	assert first.newNodes == 5
+	assert second.newNodes == 0
+	assert second.root is first.root
+
+
+def test_changesCreateNewNodesUpToTheRoot():
+	root, status, _toolbar = _buildTree()
+	recorder = HistoryRecorder()
+	recorder.start(root)
+	first = _capture(recorder)
+	status.name = "Busy"
+	second = _capture(recorder)
+	# The changed text, its pane and the window are new; the toolbar subtree is shared.
+	assert second.newNodes == 3
+	pane, toolbar = second.root.children
+	assert pane.children[0].name == "Busy"
+	assert pane.children[0].generation == second.generation
+	assert toolbar is first.root.children[1]
+	assert toolbar.generation == first.generation
+
+
+def test_oldestCapturesAreDropped():
+	root, status, _toolbar = _buildTree()
+	recorder = HistoryRecorder(maxCaptures=2)
+	recorder.start(root)
+	generations = []
+	for name in ("a", "b", "c"):
+		status.name = name
+		generations.append(_capture(recorder).generation)
+	assert [capture.generation for capture in recorder.captures] == generations[1:]
+	assert recorder.usedBytes == sum(capture.newBytes for capture in recorder.captures)
+
+
+def test_memoryBudgetKeepsTheLatestCapture():
+	root, _status, _toolbar = _buildTree()
+	recorder = HistoryRecorder(memoryBudget=1)
+	recorder.start(root)
+	_capture(recorder)
+	latest = _capture(recorder)
+	assert list(recorder.captures) == [latest]
+
+
+def test_maxNodesTruncatesTheCapture():
+	root, _status, _toolbar = _buildTree()
+	recorder = HistoryRecorder(maxNodes=2)
+	recorder.start(root)
+	capture = _capture(recorder)
+	assert capture.truncated
+	assert capture.nodeCount == 2
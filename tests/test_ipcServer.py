@@ -0,0 +1,137 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+import sys
+from multiprocessing import AuthenticationError
+
+import api
+import config
+import pytest
+from controlTypes import Role
+from fakes import FakeObject
+from objectViewer import ipcServer
+from objectViewer.ipcServer import (
+	INTERNAL_ERROR,
+	INVALID_REQUEST,
+	INVALID_PARAMS,
+	DictObjectProvider,
+	InspectionClient,
+	NVDAObjectProvider,
+	RPCError,
+	readKeyFile,
+)
+
+TREE = {
+	"name": "desktop",
+	"role": "desktop",
+	"children": [
+		{"name": "window", "role": "window", "children": [{"name": "OK", "role": "button"}]},
+		{"name": "taskbar", "role": "pane"},
+	],
+}
+
+
+class FailingProvider(DictObjectProvider):
+	def children(self, ids):
+		# A bug in the provider, not a mistake of the client.
+		raise TypeError("unsupported operand")
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+	if sys.platform == "win32":
+		address = rf"\\.\pipe\objectViewerTest{id(tmp_path)}"
+	else:
+		address = str(tmp_path / "ipc.sock")
+	monkeypatch.setitem(
+		config.conf, "objectViewer", {"ipcAddress": address, "ipcAuthKey": "", "ipcWorkers": 2}
+	)
+	keyFile = tmp_path / "objectViewer-ipc.key"
+	monkeypatch.setattr(ipcServer, "getKeyFilePath", lambda: str(keyFile))
+
+	def start(provider):
+		ipcServer.startServer(provider)
+		return address, readKeyFile(str(keyFile))
+
+	yield start
+	ipcServer.stopServer()
+	assert not keyFile.exists()
+
+
+def test_clientQueriesTheTree(server):
+	address, authkey = server(DictObjectProvider(TREE))
+	with InspectionClient(address, authkey) as client:
+		root = client.call("root")
+		[entry] = client.call("children", ids=[root])
+		children = entry["children"]
+		names, ancestors = client.batch(
+			[("properties", {"ids": children, "names": ["name"]}), ("ancestors", {"ids": children})]
+		)
+		assert [entry["properties"]["name"] for entry in names] == ["window", "taskbar"]
+		assert [entry["ancestors"] for entry in ancestors] == [[root], [root]]
+		chunks = client.stream("subtree", id=root, names=["name"], chunkSize=2)
+		nodes = [node for chunk in chunks for node in chunk]
+		assert [node["properties"]["name"] for node in nodes] == ["desktop", "window", "taskbar", "OK"]
+
+
+def test_invalidParamsAreToldFromInternalErrors(server):
+	address, authkey = server(FailingProvider(TREE))
+	with InspectionClient(address, authkey) as client:
+		with pytest.raises(RPCError) as error:
+			client.call("properties", ids=[0])
+		assert error.value.code == INVALID_PARAMS
+		with pytest.raises(RPCError) as error:
+			client.call("children", ids=[0])
+		assert error.value.code == INTERNAL_ERROR
+
+
+def test_wrongKeyIsRejected(server):
+	address, authkey = server(DictObjectProvider(TREE))
+	with pytest.raises(AuthenticationError):
+		InspectionClient(address, bytes(len(authkey)))
+
+
+def test_serverRequiresAKey():
+	with pytest.raises(ValueError):
+		ipcServer.InspectionServer(DictObjectProvider(TREE), None, b"")
+
+
+def test_NVDAProviderKeepsTheIdOfAnObject(monkeypatch):
+	button = FakeObject("OK", Role.BUTTON, uniqueID=2)
+	desktop = FakeObject("desktop", Role.DESKTOP, [button], uniqueID=1)
+	monkeypatch.setattr(api, "getDesktopObject", lambda: desktop)
+	monkeypatch.setitem(config.conf, "objectViewer", {"simpleReviewMode": False})
+	provider = NVDAObjectProvider()
+	root = provider.root()
+	[children] = provider.children([root])
+	assert provider.root() == root
+	assert provider.children([root]) == [children]
+	assert provider.properties(children, ["name", "role"]) == [{"name": "OK", "role": "BUTTON"}]
+	with pytest.raises(RPCError):
+		provider.properties(children, ["__class__"])
+
+
+@pytest.mark.parametrize("params", [{"chunkSize": 0}, {"chunkSize": -1}, {"maxDepth": -1}, {"maxDepth": "2"}])
+def test_subtreeRejectsInvalidBounds(server, params):
+	address, authkey = server(DictObjectProvider(TREE))
+	with InspectionClient(address, authkey) as client:
+		with pytest.raises(RPCError) as error:
+			list(client.stream("subtree", id=0, **params))
+		assert error.value.code == INVALID_PARAMS
+		# The connection is still served.
+		assert client.call("root") == 0
+
+
+def test_iterSubtreeRejectsEmptyChunks():
+	with pytest.raises(ValueError):
+		next(DictObjectProvider(TREE).iterSubtree(0, ["name"], chunkSize=0))
+
+
+def test_batchReportsUnreadableRequests(server):
+	address, authkey = server(DictObjectProvider(TREE))
+	with InspectionClient(address, authkey) as client:
+		with pytest.raises(RPCError) as error:
+			client.batch([("root", {}), (5, {})])
+		assert error.value.code == INVALID_REQUEST
@@ -0,0 +1,44 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+from controlTypes import Role
+from fakes import FakeObject
+from objectViewer.nodeStore import NodeStore, TreeNode
+
+
+def _buildParent() -> FakeObject:
+	return FakeObject(
+		"parent",
+		children=[FakeObject(f"button {index}", Role.BUTTON, uniqueID=index) for index in range(3)],
+	)
+
+
+def test_resolveFindsTheChildAtItsIndex():
+	parent = _buildParent()
+	store = NodeStore(maxLiveObjects=0)
+	node = store.add(TreeNode.fromObject(parent.children[2], 2))
+	assert store.resolve(node, lambda: parent) is parent.children[2]
+	assert store.stats["indexMisses"] == 0
+
+
+def test_resolveScansTheChildrenWhenTheIndexChanged():
+	parent = _buildParent()
+	store = NodeStore(maxLiveObjects=0)
+	node = store.add(TreeNode.fromObject(parent.children[2], 2))
+	moved = parent.children.pop(2)
+	parent.children.insert(0, moved)
+	for index, child in enumerate(parent.children):
+		child.indexInParent = index
+	assert store.resolve(node, lambda: parent) is moved
+	assert store.stats["indexMisses"] == 1
+
+
+def test_resolveFollowsCollapsedChains():
+	leaf = FakeObject("leaf", Role.BUTTON, uniqueID=10)
+	parent = FakeObject("parent", children=[FakeObject("first"), FakeObject("chain", children=[leaf])])
+	store = NodeStore(maxLiveObjects=0)
+	node = store.add(TreeNode.fromObject(leaf, 1, chainLength=1))
+	assert store.resolve(node, lambda: parent) is leaf
+	assert store.stats["indexMisses"] == 0
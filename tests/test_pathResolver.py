@@ -0,0 +1,77 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+import api
+import pytest
+from controlTypes import Role
+from fakes import FakeObject
+from objectViewer.pathResolver import KnownPath, ObjectPathResolver
+
+
+@pytest.fixture(autouse=True)
+def _focusOutsideTheTree(monkeypatch):
+	focus = FakeObject("focus", Role.WINDOW, windowHandle=2)
+	monkeypatch.setattr(api, "getFocusObject", lambda: focus)
+
+
+def _buildTree() -> tuple[FakeObject, FakeObject, FakeObject]:
+	leaf = FakeObject("leaf", Role.BUTTON, uniqueID=3)
+	sibling = FakeObject("sibling", Role.BUTTON, uniqueID=4)
+	pane = FakeObject("pane", Role.PANE, [leaf, sibling], uniqueID=2)
+	root = FakeObject("root", Role.DESKTOP, [pane], uniqueID=1)
+	return root, pane, leaf
+
+
+def test_resolveWalksUpToTheRoot():
+	root, pane, leaf = _buildTree()
+	resolver = ObjectPathResolver()
+	assert resolver.resolve(leaf) == [root, pane, leaf]
+	assert resolver.stats["parentCalls"] == 3
+	assert resolver.stats["parentCallsSaved"] == 0
+	# The three objects of the path, and the focus.
+	assert resolver.stats["keyComputations"] == 4
+
+
+def test_resolveReusesKnownPathsByKey():
+	root, pane, leaf = _buildTree()
+	sibling = pane.children[1]
+	resolver = ObjectPathResolver()
+	path = resolver.resolvePath(sibling, extraPaths=(KnownPath.fromObjects([root, pane, leaf]),))
+	assert path.objects == [root, pane, sibling]
+	assert path.keys == [("IA2", 1, 1), ("IA2", 1, 2), ("IA2", 1, 4)]
+	# Only the parent of the sibling was fetched, and unique keys needed no object comparison.
+	assert resolver.stats["parentCalls"] == 1
+	assert resolver.stats["parentCallsSaved"] == 2
+	assert resolver.stats["objectComparisons"] == 0
+
+
+def test_resolveComparesObjectsSharingAKey():
+	# Without a unique ID, both panes share the key of their window and role.
+	other = FakeObject("other", Role.PANE)
+	leaf = FakeObject("leaf", Role.BUTTON, uniqueID=3)
+	pane = FakeObject("pane", Role.PANE, [leaf])
+	root = FakeObject("root", Role.DESKTOP, [pane], uniqueID=1)
+	resolver = ObjectPathResolver()
+	resolver.remember(KnownPath.fromObjects([root, other]))
+	assert resolver.resolve(leaf) == [root, pane, leaf]
+	assert resolver.stats["objectComparisons"] == 1
+
+
+def test_focusPathKeysAreComputedOncePerFocus(monkeypatch):
+	root, pane, leaf = _buildTree()
+	resolver = ObjectPathResolver()
+	resolver.resolve(leaf)
+	keyComputations = resolver.keyComputations
+	resolver.forget()
+	resolver.resolve(leaf)
+	# The focus path is forgotten with the known paths, so it is keyed again along with the path.
+	assert resolver.keyComputations - keyComputations == 4
+	resolver.resolve(pane)
+	# The focus didn't change and the pane is on a known path.
+	assert resolver.keyComputations - keyComputations == 5
+	monkeypatch.setattr(api, "getFocusObject", lambda: leaf)
+	monkeypatch.setattr(api, "getFocusAncestors", lambda: [root, pane])
+	resolver.resolve(pane)
+	assert resolver.keyComputations - keyComputations == 9
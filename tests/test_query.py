@@ -0,0 +1,68 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+import pytest
+from controlTypes import Role
+from fakes import FakeObject
+from objectViewer import query
+
+
+def _buildTree() -> FakeObject:
+	return FakeObject(
+		"root",
+		children=[
+			FakeObject(
+				"toolbar", Role.TOOLBAR, [FakeObject("OK", Role.BUTTON), FakeObject("Cancel", Role.BUTTON)]
+			),
+			FakeObject("Other", Role.BUTTON),
+		],
+	)
+
+
+def test_pathMatchesPredicates():
+	root = _buildTree()
+	assert [obj.name for obj in query.path(root, "//button[name~='^O']")] == ["OK", "Other"]
+	assert [obj.name for obj in query.path(root, "toolbar/button[2]")] == ["Cancel"]
+
+
+@pytest.mark.parametrize(
+	"path",
+	[
+		"//button[name='OK'][bogus]",
+		"//button[role='button']",
+		"//button[2x]",
+	],
+)
+def test_parsePathRejectsInvalidPredicates(path: str):
+	with pytest.raises(ValueError, match="Invalid predicate"):
+		query.parsePath(path)
+
+
+def test_findYieldsMatchingDescendants():
+	root = _buildTree()
+	assert [obj.name for obj in query.find(root, Role.BUTTON)] == ["OK", "Cancel", "Other"]
+	assert [obj.name for obj in query.find(root, "button", maxDepth=1)] == ["Other"]
+	assert [obj.name for obj in query.find(root, "button", name="^C")] == ["Cancel"]
+	assert [obj.name for obj in query.find(root, "button", pruneRoles="toolbar")] == ["Other"]
+	assert [obj.name for obj in query.find(root, "button", limit=2)] == ["OK", "Cancel"]
+	assert query.findFirst(root, "toolbar").name == "toolbar"
+
+
+def test_pathYieldsNestedDescendantsOnce():
+	button = FakeObject("b", Role.BUTTON)
+	root = FakeObject(
+		"root", children=[FakeObject("outer", Role.TOOLBAR, [FakeObject("inner", Role.TOOLBAR, [button])])]
+	)
+	assert [obj.name for obj in query.path(root, "//toolbar//button")] == ["b"]
+
+
+def test_unknownRolesAndStatesAreRejected():
+	root = _buildTree()
+	with pytest.raises(ValueError, match="Unknown role"):
+		query.parsePath("//buton")
+	with pytest.raises(ValueError, match="Unknown role"):
+		query.find(root, "buton")
+	with pytest.raises(ValueError, match="Unknown state"):
+		query.find(root, states=["focussed"])
@@ -0,0 +1,37 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+from objectViewer.spatialIndex import GridIndex
+
+
+def test_queryReturnsTheDeepestRectangle():
+	index: GridIndex[str] = GridIndex()
+	index.insert("window", 0, 0, 200, 200, 0)
+	index.insert("button", 10, 10, 20, 20, 1)
+	assert index.query(15, 15) == "button"
+	assert index.query(100, 100) == "window"
+	assert index.query(300, 300) is None
+
+
+def test_queryOnlyConsidersTheWindowOnTop():
+	index: GridIndex[str] = GridIndex()
+	index.insert("front", 0, 0, 100, 100, 0, window=1)
+	index.insert("back item", 10, 10, 20, 20, 3, window=2)
+	# The deeper rectangle belongs to a window hidden below the front one.
+	assert index.query(15, 15, topWindow=1) == "front"
+	assert index.query(15, 15, topWindow=2) == "back item"
+	assert index.query(15, 15, topWindow=3) is None
+
+
+def test_rectanglesAreClippedToTheScreen():
+	index: GridIndex[str] = GridIndex(cellSize=10, bounds=(0, 0, 100, 100))
+	index.insert("document", -1000, -1000, 100_000, 100_000, 0)
+	index.insert("offscreen", 500, 500, 10, 10, 0)
+	assert index.query(99, 99) == "document"
+	assert index.query(0, 0) == "document"
+	assert index.query(505, 505) is None
+	assert "offscreen" in index
+	index.remove("document")
+	assert index.query(50, 50) is None
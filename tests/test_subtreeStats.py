@@ -0,0 +1,50 @@
+# objectViewer add-on for NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING.txt for more details.
+# Copyright (C) 2025 hwf1324 <1398969445@qq.com>
+
+from controlTypes import Role
+from fakes import FakeObject
+from objectViewer.subtreeStats import SubtreeStatisticsRun, formatReport
+
+
+def _buildTree() -> FakeObject:
+	return FakeObject(
+		"root",
+		children=[
+			FakeObject("list", Role.LIST, [FakeObject(str(index), Role.LISTITEM) for index in range(5)]),
+			FakeObject("OK", Role.BUTTON),
+		],
+	)
+
+
+def _finish(run: SubtreeStatisticsRun):
+	while not run.done:
+		run.runSlice()
+
+
+def test_runWalksTheWholeSubtree():
+	run = SubtreeStatisticsRun(_buildTree(), maxNodes=100, timeLimit=10)
+	_finish(run)
+	total, children = run.result()
+	assert total.nodeCount == 8
+	assert total.maxDepth == 2
+	assert [stats.nodeCount for stats in children] == [6, 1]
+	assert [container.childCount for container in total.widest] == [5, 2]
+	assert not run.budget.exhausted
+	assert "Nodes: 8" in formatReport(total, children, run.budget.exhausted)
+
+
+def test_runStopsAtTheNodeBudget():
+	run = SubtreeStatisticsRun(_buildTree(), maxNodes=4, timeLimit=10)
+	_finish(run)
+	total, _children = run.result()
+	assert total.nodeCount == 4
+	assert run.budget.exhausted
+
+
+def test_cancelledRunIsDone():
+	run = SubtreeStatisticsRun(_buildTree(), maxNodes=100, timeLimit=10)
+	run.cancel()
+	_finish(run)
+	assert run.visitedNodes == 1